@@ -0,0 +1,53 @@
+"""
+sync outbox table for background Blinko sync
+
+Revision ID: 20261018_0002
+Revises: 20250918_0001
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_0002'
+down_revision = '20250918_0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('syncoutbox'):
+        op.create_table(
+            'syncoutbox',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('provider', sa.String(length=50), nullable=False),
+            sa.Column('op', sa.String(length=20), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('task_id', sa.Integer(), nullable=True),
+            sa.Column('note_id', sa.String(length=64), nullable=True),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+        )
+        op.create_index('ix_syncoutbox_id', 'syncoutbox', ['id'], unique=False)
+        op.create_index('ix_syncoutbox_user_id', 'syncoutbox', ['user_id'], unique=False)
+        op.create_index('ix_syncoutbox_task_id', 'syncoutbox', ['task_id'], unique=False)
+        op.create_index('ix_syncoutbox_next_attempt_at', 'syncoutbox', ['next_attempt_at'], unique=False)
+        op.create_foreign_key('fk_syncoutbox_user_id_user', 'syncoutbox', 'user', ['user_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    try:
+        op.drop_constraint('fk_syncoutbox_user_id_user', 'syncoutbox', type_='foreignkey')
+    except Exception:
+        pass
+    op.drop_index('ix_syncoutbox_next_attempt_at', table_name='syncoutbox')
+    op.drop_index('ix_syncoutbox_task_id', table_name='syncoutbox')
+    op.drop_index('ix_syncoutbox_user_id', table_name='syncoutbox')
+    op.drop_index('ix_syncoutbox_id', table_name='syncoutbox')
+    op.drop_table('syncoutbox')
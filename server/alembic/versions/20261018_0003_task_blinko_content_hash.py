@@ -0,0 +1,34 @@
+"""
+task.blinko_content_hash to skip re-sending unchanged notes
+
+Revision ID: 20261018_0003
+Revises: 20261018_0002
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_0003'
+down_revision = '20261018_0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_cols = {c['name'] for c in inspector.get_columns('task')}
+    if 'blinko_content_hash' not in existing_cols:
+        with op.batch_alter_table('task') as batch_op:
+            batch_op.add_column(sa.Column('blinko_content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('task') as batch_op:
+        try:
+            batch_op.drop_column('blinko_content_hash')
+        except Exception:
+            pass
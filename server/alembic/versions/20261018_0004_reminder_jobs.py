@@ -0,0 +1,42 @@
+"""
+reminderjob table for the persistent reminder scheduler
+
+Revision ID: 20261018_0004
+Revises: 20261018_0003
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_0004'
+down_revision = '20261018_0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table('reminderjob'):
+        op.create_table(
+            'reminderjob',
+            sa.Column('task_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('fire_at', sa.DateTime(), nullable=False),
+            sa.Column('lease_until', sa.DateTime(), nullable=True),
+            sa.Column('lease_owner', sa.String(length=64), nullable=True),
+            sa.PrimaryKeyConstraint('task_id', name='pk_reminderjob'),
+            sa.ForeignKeyConstraint(['task_id'], ['task.id'], name='fk_reminderjob_task_id_task', ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['user_id'], ['user.id'], name='fk_reminderjob_user_id_user', ondelete='CASCADE'),
+        )
+        op.create_index('ix_reminderjob_user_id', 'reminderjob', ['user_id'], unique=False)
+        op.create_index('ix_reminderjob_fire_at', 'reminderjob', ['fire_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reminderjob_fire_at', table_name='reminderjob')
+    op.drop_index('ix_reminderjob_user_id', table_name='reminderjob')
+    op.drop_table('reminderjob')
@@ -0,0 +1,36 @@
+"""
+composite (parent, created_at, id) indexes for cursor-paginated lists
+
+Revision ID: 20261018_0005
+Revises: 20261018_0004
+Create Date: 2026-10-18
+"""
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261018_0005'
+down_revision = '20261018_0004'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_task_board_id_created_at_id', 'task', ['board_id', 'created_at', 'id']),
+    ('ix_subtask_task_id_created_at_id', 'subtask', ['task_id', 'created_at', 'id']),
+    ('ix_project_owner_id_created_at_id', 'project', ['owner_id', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for name, table, columns in INDEXES:
+        if name not in {ix['name'] for ix in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -7,9 +7,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.db.session import get_db
+from app.db.returning import insert_returning
 from app.models.user import User
 from app.schemas.user import UserCreate, UserOut, Token
-from app.utils.security import create_access_token, get_password_hash, verify_password
+from app.utils.security import create_access_token, password_hasher
 from app.core.config import get_settings
 
 
@@ -23,17 +24,16 @@ async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     existing = await db.scalar(select(User).where(User.email == user_in.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = User(email=user_in.email, hashed_password=get_password_hash(user_in.password))
-    db.add(user)
+    hashed = await password_hasher.hash(user_in.password)
+    user = await insert_returning(db, User, {"email": user_in.email, "hashed_password": hashed})
     await db.commit()
-    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     user = await db.scalar(select(User).where(User.email == form_data.username))
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     token = create_access_token(user.id, expires_delta=access_token_expires)
@@ -5,73 +5,57 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.utils.deps import get_current_user
-from app.models.user import User
+from app.db.returning import insert_returning, update_returning
+from app.core.redis import get_redis
+from app.utils.access import check_board, owned_project, owned_task
+from app.utils.deps import get_current_user, get_read_db
+from app.services.user_cache import UserPrincipal
 from app.models.integration import IntegrationSetting
-from app.schemas.common import IntegrationSettingCreate, IntegrationSettingOut
+from app.schemas.common import IntegrationSettingCreate, IntegrationSettingOut, BlinkoSyncRequest, BlinkoSyncResult
 from app.models.task import Task
-from app.services.blinko import get_note_detail, trash_notes, delete_notes, upsert_todo
+from app.models.board import Board
+from app.services.blinko import get_note_detail, trash_notes, delete_notes
+from app.services.integration_settings import get_integration, invalidate_integration
+from app.services.outbox import push_tasks_now
+from app.services import today_index
+from app.utils.response_cache import response_cache
 
 
 router = APIRouter(prefix="/integrations", tags=["integrations"])
 
 
 @router.get("/blinko", response_model=IntegrationSettingOut | None)
-async def get_blinko(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    row = (
-        await db.execute(
-            select(IntegrationSetting).where(
-                IntegrationSetting.user_id == current_user.id,
-                IntegrationSetting.provider == 'blinko'
-            )
-        )
-    ).scalars().first()
-    return row
+async def get_blinko(db: AsyncSession = Depends(get_read_db), current_user: UserPrincipal = Depends(get_current_user)):
+    return await get_integration(db, current_user.id, 'blinko')
 
 
 @router.post("/blinko", response_model=IntegrationSettingOut)
 async def set_blinko(
     data: IntegrationSettingCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
     if data.provider != 'blinko':
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="provider must be 'blinko'")
     # upsert by (user, provider)
-    row = (
-        await db.execute(
-            select(IntegrationSetting).where(
-                IntegrationSetting.user_id == current_user.id,
-                IntegrationSetting.provider == 'blinko'
-            )
-        )
-    ).scalars().first()
+    values = {"base_url": data.base_url, "token": data.token}
+    row = await update_returning(
+        db, IntegrationSetting, values,
+        IntegrationSetting.user_id == current_user.id, IntegrationSetting.provider == 'blinko',
+    )
     if row is None:
-        row = IntegrationSetting(provider='blinko', base_url=data.base_url, token=data.token, user_id=current_user.id)
-        db.add(row)
-    else:
-        row.base_url = data.base_url
-        row.token = data.token
+        row = await insert_returning(db, IntegrationSetting, {**values, "provider": 'blinko', "user_id": current_user.id})
     await db.commit()
-    await db.refresh(row)
+    await invalidate_integration(current_user.id, 'blinko')
     return row
 
 
 @router.get("/blinko/notes/{task_id}")
-async def get_blinko_note_by_task(task_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    task = await db.get(Task, task_id)
-    if not task or task.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+async def get_blinko_note_by_task(task_id: int, db: AsyncSession = Depends(get_read_db), current_user: UserPrincipal = Depends(get_current_user)):
+    task = await owned_task(db, current_user.id, task_id)
     if not task.blinko_note_id:
         return {"note": None}
-    integ = (
-        await db.execute(
-            select(IntegrationSetting).where(
-                IntegrationSetting.user_id == current_user.id,
-                IntegrationSetting.provider == 'blinko'
-            )
-        )
-    ).scalars().first()
+    integ = await get_integration(db, current_user.id, 'blinko')
     if not integ:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Blinko not configured")
     note = await get_note_detail(integ.base_url, integ.token, task.blinko_note_id)
@@ -79,20 +63,11 @@ async def get_blinko_note_by_task(task_id: int, db: AsyncSession = Depends(get_d
 
 
 @router.delete("/blinko/notes/{task_id}")
-async def delete_blinko_note_by_task(task_id: int, hard: bool = False, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    task = await db.get(Task, task_id)
-    if not task or task.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+async def delete_blinko_note_by_task(task_id: int, hard: bool = False, db: AsyncSession = Depends(get_db), r=Depends(get_redis), current_user: UserPrincipal = Depends(get_current_user)):
+    task = await owned_task(db, current_user.id, task_id)
     if not task.blinko_note_id:
         return {"message": "no blinko mapping"}
-    integ = (
-        await db.execute(
-            select(IntegrationSetting).where(
-                IntegrationSetting.user_id == current_user.id,
-                IntegrationSetting.provider == 'blinko'
-            )
-        )
-    ).scalars().first()
+    integ = await get_integration(db, current_user.id, 'blinko')
     if not integ:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Blinko not configured")
     try:
@@ -102,48 +77,60 @@ async def delete_blinko_note_by_task(task_id: int, hard: bool = False, db: Async
             await trash_notes(integ.base_url, integ.token, [task.blinko_note_id])
         task.blinko_note_id = None
         await db.commit()
-        await db.refresh(task)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    await response_cache.invalidate(current_user.id)
+    if task.is_today:
+        await today_index.put_tasks(r, [task])
     return {"message": "ok"}
 
 
 @router.post("/blinko/sync/{task_id}")
-async def sync_blinko_note_by_task(task_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    task = await db.get(Task, task_id)
-    if not task or task.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    integ = (
-        await db.execute(
-            select(IntegrationSetting).where(
-                IntegrationSetting.user_id == current_user.id,
-                IntegrationSetting.provider == 'blinko'
-            )
-        )
-    ).scalars().first()
+async def sync_blinko_note_by_task(task_id: int, db: AsyncSession = Depends(get_db), current_user: UserPrincipal = Depends(get_current_user)):
+    await owned_task(db, current_user.id, task_id)
+    integ = await get_integration(db, current_user.id, 'blinko')
     if not integ:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Blinko not configured")
-    # Compose markdown content similar to projects routes
-    lines = [f"**{task.title}**"]
-    if task.description:
-        lines.append(task.description)
-    meta: list[str] = []
-    if task.status:
-        meta.append(f"状态: {task.status}")
-    if task.priority:
-        meta.append(f"优先级: {task.priority}")
-    if task.due_date:
-        meta.append(f"截止: {task.due_date}")
-    if task.remind_at:
-        meta.append(f"提醒: {task.remind_at} UTC")
-    if task.is_today:
-        meta.append("今日")
-    if meta:
-        lines.append("\n" + " | ".join(meta))
-    content = "\n\n".join(lines)
-    note_id = await upsert_todo(integ.base_url, integ.token, content, note_id=task.blinko_note_id, title=task.title)
-    if note_id and note_id != task.blinko_note_id:
-        task.blinko_note_id = note_id
-        await db.commit()
-        await db.refresh(task)
-    return {"note_id": task.blinko_note_id}
+    # end the request's transaction before calling Blinko
+    await db.close()
+    result = await push_tasks_now(current_user.id, integ, [task_id], force=True)
+    if task_id in result.errors:
+        raise HTTPException(status_code=500, detail=result.errors[task_id])
+    if task_id not in result.synced:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Task is being synced, try again shortly")
+    return {"note_id": result.synced[task_id]}
+
+
+@router.post("/blinko/sync", response_model=BlinkoSyncResult)
+async def sync_blinko_notes(
+    data: BlinkoSyncRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    """Re-sync every task of a board or a project in one pass.
+
+    Tasks the outbox worker is pushing at the same moment count as skipped.
+    """
+    if (data.board_id is None) == (data.project_id is None):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="exactly one of board_id or project_id is required")
+    if data.board_id is not None:
+        await check_board(db, current_user.id, data.board_id)
+        scope = Task.board_id == data.board_id
+    else:
+        await owned_project(db, current_user.id, data.project_id)
+        scope = Task.board_id.in_(select(Board.id).where(Board.project_id == data.project_id))
+    integ = await get_integration(db, current_user.id, 'blinko')
+    if not integ:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Blinko not configured")
+    task_ids = (
+        await db.execute(select(Task.id).where(scope, Task.owner_id == current_user.id).order_by(Task.id))
+    ).scalars().all()
+    # end the request's transaction before calling Blinko
+    await db.close()
+    result = await push_tasks_now(current_user.id, integ, task_ids, force=data.force)
+    return {
+        "synced": len(result.synced),
+        "skipped": len(result.skipped),
+        "failed": len(result.errors),
+        "errors": result.errors,
+    }
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import secrets
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.db.session import get_replica_db
+from app.utils.deps import get_current_user, oauth2_scheme
+
+
+router = APIRouter(tags=["metrics"])
+settings = get_settings()
+
+
+async def require_metrics_access(
+    request: Request,
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_replica_db),
+) -> None:
+    """A scraper presenting ``METRICS_TOKEN`` as its bearer token, or a signed-in superuser."""
+    if settings.METRICS_TOKEN and secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        return
+    user = await get_current_user(request, token, db)
+    if not user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_access)])
+async def read_metrics():
+    return metrics.snapshot()
@@ -2,14 +2,17 @@ from __future__ import annotations
 
 from typing import List
 import logging
-from datetime import timezone
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy import select
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select, update
+from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_db
-from app.core.redis import get_redis
+from app.db.returning import insert_many_returning, insert_returning, update_returning
+from app.core.config import get_settings
+from app.core.redis import get_redis, get_redis_raw
 from app.models.project import Project
 from app.models.board import Board
 from app.models.task import Task
@@ -19,76 +22,149 @@ from app.schemas.project import (
     BoardCreate, BoardOut, BoardUpdate,
     TaskCreate, TaskOut, TaskUpdate,
     SubtaskCreate, SubtaskOut, SubtaskUpdate,
+    ProjectSnapshot, TaskBatchCreate, TaskBatchUpdate,
+)
+from app.utils.deps import get_current_user, get_read_db
+from app.services.user_cache import UserPrincipal
+from app.services.outbox import outbox, enqueue_task_sync, enqueue_task_syncs, enqueue_note_trash
+from app.services.reminders import (
+    reminders, schedule_reminder, schedule_reminders, cancel_reminder, cancel_reminders,
+)
+from app.services import today_index
+from app.utils.access import check_board, check_task, owned_board, owned_project, owned_subtask, owned_task
+from app.utils.pagination import ListParams, fetch_page
+from app.utils.response_cache import (
+    cached_response, conditional_response, json_response, response_cache, schema_columns,
 )
-from app.utils.deps import get_current_user
-from app.models.user import User
-from app.utils.scheduler import start_scheduler, schedule_datetime
-from app.api.routes.ws import manager
-from app.models.integration import IntegrationSetting
-from app.services.blinko import upsert_todo, trash_notes
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
-def today_cache_key(user_id: int) -> str:
-    return f"today:{user_id}"
-
-
-async def _compose_blinko_content(db: AsyncSession, task: Task) -> str:
-    """构建用于 Blinko 的简洁 Markdown 内容，包含子任务清单。
-    规则：
-    - 第一行：粗体标题
-    - 第二段（可选）：任务描述
-    - 第三段（可选）：元信息（状态/优先级/截止/提醒/今日）以 | 分隔
-    - 其后：子任务清单，每行 "- [ ] 标题"；若已完成则 "- [x] 标题"
-    """
-    lines: list[str] = [f"**{task.title}**"]
-    if task.description:
-        lines.append(task.description)
-    meta: list[str] = []
-    if getattr(task, "status", None):
-        meta.append(f"状态: {task.status}")
-    if getattr(task, "priority", None):
-        meta.append(f"优先级: {task.priority}")
-    if getattr(task, "due_date", None):
-        meta.append(f"截止: {task.due_date}")
-    if getattr(task, "remind_at", None):
-        meta.append(f"提醒: {task.remind_at} UTC")
-    if getattr(task, "is_today", None):
-        meta.append("今日")
-    if meta:
-        lines.append("\n" + " | ".join(meta))
-    # 子任务清单
-    subs = (
-        await db.execute(select(Subtask).where(Subtask.task_id == task.id))
-    ).scalars().all()
-    if subs:
-        checklist = [f"- [{'x' if s.done else ' '}] {s.title}" for s in subs]
-        lines.append("")
-        lines.extend(checklist)
-    return "\n\n".join(lines)
+def _remind_utc(value: datetime) -> datetime:
+    """UTC naive for TIMESTAMP WITHOUT TIME ZONE; naive input is in the configured TIMEZONE."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=ZoneInfo(settings.TIMEZONE))
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 @router.post("/", response_model=ProjectOut)
 async def create_project(
     data: ProjectCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    project = Project(name=data.name, description=data.description, owner_id=current_user.id)
-    db.add(project)
+    project = await insert_returning(
+        db, Project, {"name": data.name, "description": data.description, "owner_id": current_user.id},
+    )
     await db.commit()
-    await db.refresh(project)
+    await response_cache.invalidate(current_user.id)
     return project
 
 
 @router.get("/", response_model=List[ProjectOut])
+@cached_response(
+    "projects", List[ProjectOut],
+    key=lambda kw: (kw["current_user"].id, "all") if kw["params"].plain else None,
+)
 async def list_projects(
+    params: ListParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    return await fetch_page(db, Project, ProjectOut, params, Project.owner_id == current_user.id)
+
+
+# Batch task mutations (declared before "/{project_id}" so "tasks:batch" is not taken for a project id).
+# One transaction and one bulk statement, then a single cache / reminder / outbox / Today index pass.
+@router.patch("/tasks:batch", response_model=List[TaskOut])
+@json_response(List[TaskOut])
+async def update_tasks_batch(
+    data: TaskBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+    r=Depends(get_redis),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    ids = [item.id for item in data.items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Duplicate task id in batch")
+    # items carrying the same changes share one UPDATE ... WHERE id IN (...)
+    groups: dict[tuple, list[int]] = {}
+    remind: dict[int, datetime | None] = {}
+    for item in data.items:
+        payload = item.model_dump(exclude_unset=True, exclude={"id"})
+        if "remind_at" in payload:
+            if payload["remind_at"] is not None:
+                payload["remind_at"] = _remind_utc(payload["remind_at"])
+            remind[item.id] = payload["remind_at"]
+        groups.setdefault(tuple(sorted(payload.items())), []).append(item.id)
+    columns = schema_columns(Task, TaskOut)
+    rows = {}
+    for changes, group_ids in groups.items():
+        owned = (Task.id.in_(group_ids), Task.owner_id == current_user.id)
+        if changes:
+            stmt = (
+                update(Task).where(*owned).values(dict(changes)).returning(*columns)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            stmt = select(*columns).where(*owned)
+        rows.update((row.id, row) for row in (await db.execute(stmt)).all())
+    missing = [i for i in ids if i not in rows]
+    if missing:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Task not found: {missing}")
+    await enqueue_task_syncs(db, current_user.id, ids)
+    await schedule_reminders(db, current_user.id, [(t, f) for t, f in remind.items() if f is not None])
+    await cancel_reminders(db, [t for t, f in remind.items() if f is None])
+    await db.commit()
+    await response_cache.invalidate(current_user.id)
+    outbox.wake()
+    for task_id, fire_at in remind.items():
+        if fire_at is None:
+            reminders.untrack(task_id)
+        else:
+            reminders.track(task_id, current_user.id, fire_at)
+    # tasks that are no longer Today are removed from the index by the same call
+    await today_index.put_tasks(r, rows.values())
+    return [rows[i] for i in ids]
+
+
+@router.post("/boards/{board_id}/tasks:batch", response_model=List[TaskOut])
+@json_response(List[TaskOut])
+async def create_tasks_batch(
+    board_id: int,
+    data: TaskBatchCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    r=Depends(get_redis),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    rows = (await db.execute(select(Project).where(Project.owner_id == current_user.id))).scalars().all()
+    await check_board(db, current_user.id, board_id)
+    values = [
+        {
+            "title": item.title,
+            "description": item.description,
+            "status": item.status or "todo",
+            "priority": item.priority or "normal",
+            "due_date": item.due_date,
+            "remind_at": _remind_utc(item.remind_at) if item.remind_at is not None else None,
+            "is_today": item.is_today or False,
+            "board_id": board_id,
+            "owner_id": current_user.id,
+        }
+        for item in data.items
+    ]
+    rows = await insert_many_returning(db, Task, values, *schema_columns(Task, TaskOut))
+    remind = [(row.id, row.remind_at) for row in rows if row.remind_at is not None]
+    await enqueue_task_syncs(db, current_user.id, [row.id for row in rows])
+    await schedule_reminders(db, current_user.id, remind)
+    await db.commit()
+    await response_cache.invalidate(current_user.id)
+    outbox.wake()
+    for task_id, fire_at in remind:
+        reminders.track(task_id, current_user.id, fire_at)
+    await today_index.put_tasks(r, [row for row in rows if row.is_today])
     return rows
 
 
@@ -97,15 +173,16 @@ async def update_project(
     project_id: int,
     data: ProjectUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    proj = await db.get(Project, project_id)
-    if not proj or proj.owner_id != current_user.id:
+    proj = await update_returning(
+        db, Project, data.model_dump(exclude_unset=True),
+        Project.id == project_id, Project.owner_id == current_user.id,
+    )
+    if not proj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    for k, v in data.model_dump(exclude_unset=True).items():
-        setattr(proj, k, v)
     await db.commit()
-    await db.refresh(proj)
+    await response_cache.invalidate(current_user.id)
     return proj
 
 
@@ -113,44 +190,82 @@ async def update_project(
 async def delete_project(
     project_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    r=Depends(get_redis),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    proj = await db.get(Project, project_id)
-    if not proj or proj.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+    proj = await owned_project(db, current_user.id, project_id)
     await db.delete(proj)
     await db.commit()
+    await response_cache.invalidate(current_user.id)
+    # cascaded task deletes: let the next read rebuild the Today index
+    await today_index.drop_index(r, current_user.id)
     return {"message": "deleted"}
 
 
+def _by_created(items: list) -> list:
+    return sorted(items, key=lambda x: (x.created_at, x.id))
+
+
+@router.get("/{project_id}/snapshot", response_model=ProjectSnapshot)
+async def project_snapshot(
+    project_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
+):
+    # 整个项目树（看板 → 任务 → 子任务）：固定 4 次查询，按用户缓存，ETag 为响应体哈希
+    async def compute() -> bytes:
+        proj = (
+            await db.execute(
+                select(Project)
+                .where(Project.id == project_id, Project.owner_id == current_user.id)
+                .options(selectinload(Project.boards).selectinload(Board.tasks).selectinload(Task.subtasks))
+            )
+        ).scalar_one_or_none()
+        if not proj:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
+        snap = ProjectSnapshot.model_validate(proj)
+        # stable order, so an unchanged tree always hashes to the same ETag
+        snap.boards = _by_created(snap.boards)
+        for board in snap.boards:
+            board.tasks = _by_created(board.tasks)
+            for task in board.tasks:
+                task.subtasks = _by_created(task.subtasks)
+        return snap.model_dump_json().encode()
+
+    if settings.RESPONSE_CACHE_ENABLED:
+        body = await response_cache.get_or_compute("snapshot", current_user.id, f"snapshot:{project_id}", compute)
+    else:
+        body = await compute()
+    return conditional_response(request, body)
+
+
 # Boards
 @router.post("/{project_id}/boards", response_model=BoardOut)
 async def create_board(
     project_id: int,
     data: BoardCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    proj = await db.get(Project, project_id)
-    if not proj or proj.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    board = Board(name=data.name, project_id=project_id)
-    db.add(board)
+    await owned_project(db, current_user.id, project_id)
+    board = await insert_returning(db, Board, {"name": data.name, "project_id": project_id})
     await db.commit()
-    await db.refresh(board)
+    await response_cache.invalidate(current_user.id)
     return board
 
 
 @router.get("/{project_id}/boards", response_model=List[BoardOut])
+@cached_response("boards", List[BoardOut], key=lambda kw: (kw["current_user"].id, str(kw["project_id"])))
 async def list_boards(
     project_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    proj = await db.get(Project, project_id)
-    if not proj or proj.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
-    rows = (await db.execute(select(Board).where(Board.project_id == project_id))).scalars().all()
+    await owned_project(db, current_user.id, project_id)
+    rows = (
+        await db.execute(select(*schema_columns(Board, BoardOut)).where(Board.project_id == project_id))
+    ).all()
     return rows
 
 
@@ -159,18 +274,17 @@ async def update_board(
     board_id: int,
     data: BoardUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    board = await db.get(Board, board_id)
+    owned_projects = select(Project.id).where(Project.owner_id == current_user.id)
+    board = await update_returning(
+        db, Board, data.model_dump(exclude_unset=True),
+        Board.id == board_id, Board.project_id.in_(owned_projects),
+    )
     if not board:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
-    proj = await db.get(Project, board.project_id)
-    if not proj or proj.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
-    for k, v in data.model_dump(exclude_unset=True).items():
-        setattr(board, k, v)
     await db.commit()
-    await db.refresh(board)
+    await response_cache.invalidate(current_user.id)
     return board
 
 
@@ -178,16 +292,15 @@ async def update_board(
 async def delete_board(
     board_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    r=Depends(get_redis),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    board = await db.get(Board, board_id)
-    if not board:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
-    proj = await db.get(Project, board.project_id)
-    if not proj or proj.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
+    board = await owned_board(db, current_user.id, board_id)
     await db.delete(board)
     await db.commit()
+    await response_cache.invalidate(current_user.id)
+    # cascaded task deletes: let the next read rebuild the Today index
+    await today_index.drop_index(r, current_user.id)
     return {"message": "deleted"}
 
 
@@ -198,87 +311,51 @@ async def create_task(
     data: TaskCreate,
     db: AsyncSession = Depends(get_db),
     r=Depends(get_redis),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    board = await db.get(Board, board_id)
-    if not board:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
-    proj = await db.get(Project, board.project_id)
-    if not proj or proj.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
+    await check_board(db, current_user.id, board_id)
     # normalize remind_at for storage: convert to UTC naive to match TIMESTAMP WITHOUT TIME ZONE
-    raw_remind = data.remind_at
-    persist_remind = None
-    if raw_remind is not None:
-        persist_remind = (raw_remind.astimezone(timezone.utc).replace(tzinfo=None)
-                          if raw_remind.tzinfo is not None else raw_remind)
-    task = Task(
-        title=data.title,
-        description=data.description,
-        status=data.status or "todo",
-        priority=data.priority or "normal",
-        due_date=data.due_date,
-        remind_at=persist_remind,
-        is_today=data.is_today or False,
-        board_id=board_id,
-        owner_id=current_user.id,
-    )
-    db.add(task)
+    persist_remind = _remind_utc(data.remind_at) if data.remind_at is not None else None
+    task = await insert_returning(db, Task, {
+        "title": data.title,
+        "description": data.description,
+        "status": data.status or "todo",
+        "priority": data.priority or "normal",
+        "due_date": data.due_date,
+        "remind_at": persist_remind,
+        "is_today": data.is_today or False,
+        "board_id": board_id,
+        "owner_id": current_user.id,
+    })
+    # Sync to Blinko (if configured) happens in the outbox worker after commit
+    await enqueue_task_sync(db, current_user.id, task.id)
+    # reminder job is persisted in the same transaction
+    if persist_remind is not None:
+        await schedule_reminder(db, task.id, current_user.id, persist_remind)
     await db.commit()
-    await db.refresh(task)
-    # Sync to Blinko if user configured integration
-    try:
-        integ = (
-            await db.execute(
-                select(IntegrationSetting).where(
-                    IntegrationSetting.user_id == current_user.id,
-                    IntegrationSetting.provider == 'blinko'
-                )
-            )
-        ).scalars().first()
-        if integ:
-            # Compose compact markdown content (with subtasks)
-            content = await _compose_blinko_content(db, task)
-            note_id = await upsert_todo(integ.base_url, integ.token, content, title=task.title)
-            if note_id:
-                task.blinko_note_id = note_id
-                await db.commit()
-                await db.refresh(task)
-    except Exception:
-        # ignore external integration errors
-        pass
-    # schedule reminder if needed
-    if raw_remind is not None:
-        try:
-            job_id = f"remind-task-{task.id}"
-            async def _notify():
-                await manager.send_to_user(current_user.id, f"提醒：{task.title}")
-            schedule_datetime(job_id, raw_remind, _notify)
-            logger.info("Scheduled reminder %s at %s for user %s", job_id, raw_remind, current_user.id)
-        except Exception:
-            pass
-    await r.delete(today_cache_key(current_user.id))
+    await response_cache.invalidate(current_user.id)
+    outbox.wake()
+    if persist_remind is not None:
+        reminders.track(task.id, current_user.id, persist_remind)
+        logger.info("Scheduled reminder for task %s at %s UTC for user %s", task.id, persist_remind, current_user.id)
+    if task.is_today:
+        await today_index.put_tasks(r, [task])
     return task
 
 
 @router.get("/boards/{board_id}/tasks", response_model=List[TaskOut])
+@cached_response(
+    "tasks", List[TaskOut],
+    key=lambda kw: (kw["current_user"].id, str(kw["board_id"])) if kw["params"].plain else None,
+)
 async def list_tasks(
     board_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    params: ListParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    board = await db.get(Board, board_id)
-    if not board:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
-    proj = await db.get(Project, board.project_id)
-    if not proj or proj.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found")
-    rows = (
-        await db.execute(
-            select(Task).where(Task.board_id == board_id, Task.owner_id == current_user.id)
-        )
-    ).scalars().all()
-    return rows
+    await check_board(db, current_user.id, board_id)
+    return await fetch_page(db, Task, TaskOut, params, Task.board_id == board_id, Task.owner_id == current_user.id)
 
 
 @router.patch("/tasks/{task_id}", response_model=TaskOut)
@@ -287,59 +364,35 @@ async def update_task(
     data: TaskUpdate,
     db: AsyncSession = Depends(get_db),
     r=Depends(get_redis),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    task = await db.get(Task, task_id)
-    if not task or task.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
     payload = data.model_dump(exclude_unset=True)
     # normalize remind_at for storage: UTC naive for TIMESTAMP WITHOUT TIME ZONE
     if "remind_at" in payload:
-        v = payload["remind_at"]
-        if v is not None and getattr(v, "tzinfo", None) is not None:
-            payload["remind_at"] = v.astimezone(timezone.utc).replace(tzinfo=None)
-    for k, v in payload.items():
-        setattr(task, k, v)
+        if payload["remind_at"] is not None:
+            payload["remind_at"] = _remind_utc(payload["remind_at"])
+    task = await update_returning(db, Task, payload, Task.id == task_id, Task.owner_id == current_user.id)
+    if not task:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    await enqueue_task_sync(db, current_user.id, task.id)
+    # reschedule reminder (title is read when it fires, so only remind_at matters)
+    if "remind_at" in payload:
+        if payload["remind_at"] is None:
+            await cancel_reminder(db, task.id)
+        else:
+            await schedule_reminder(db, task.id, current_user.id, payload["remind_at"])
     await db.commit()
-    await db.refresh(task)
-    # Sync update to Blinko if configured
-    try:
-        integ = (
-            await db.execute(
-                select(IntegrationSetting).where(
-                    IntegrationSetting.user_id == current_user.id,
-                    IntegrationSetting.provider == 'blinko'
-                )
-            )
-        ).scalars().first()
-        if integ:
-            content = await _compose_blinko_content(db, task)
-            note_id = await upsert_todo(integ.base_url, integ.token, content, note_id=task.blinko_note_id, title=task.title)
-            if note_id and note_id != task.blinko_note_id:
-                task.blinko_note_id = note_id
-                await db.commit()
-                await db.refresh(task)
-    except Exception:
-        pass
-    # reschedule reminder
-    try:
-        sch = start_scheduler()
-        job_id = f"remind-task-{task.id}"
-        if sch.get_job(job_id):
-            sch.remove_job(job_id)
-        # prefer request payload remind_at (keeps tzinfo); fallback to stored value (naive UTC -> make aware UTC)
-        when_req = data.model_dump(exclude_unset=True).get("remind_at")
-        when = when_req
-        if when is None and task.remind_at is not None:
-            when = task.remind_at.replace(tzinfo=timezone.utc)
-        if when is not None:
-            async def _notify():
-                await manager.send_to_user(current_user.id, f"提醒：{task.title}")
-            schedule_datetime(job_id, when, _notify)
-            logger.info("Rescheduled reminder %s at %s for user %s", job_id, when, current_user.id)
-    except Exception:
-        pass
-    await r.delete(today_cache_key(current_user.id))
+    await response_cache.invalidate(current_user.id)
+    outbox.wake()
+    if "remind_at" in payload:
+        if payload["remind_at"] is None:
+            reminders.untrack(task.id)
+        else:
+            reminders.track(task.id, current_user.id, payload["remind_at"])
+            logger.info("Rescheduled reminder for task %s at %s UTC for user %s", task.id, payload["remind_at"], current_user.id)
+    # a task leaving Today is removed from the index by the same call
+    if task.is_today or "is_today" in payload:
+        await today_index.put_tasks(r, [task])
     return task
 
 
@@ -348,38 +401,20 @@ async def delete_task(
     task_id: int,
     db: AsyncSession = Depends(get_db),
     r=Depends(get_redis),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    task = await db.get(Task, task_id)
-    if not task or task.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    # sync removal to Blinko first (best effort)
-    try:
-        if task.blinko_note_id:
-            integ = (
-                await db.execute(
-                    select(IntegrationSetting).where(
-                        IntegrationSetting.user_id == current_user.id,
-                        IntegrationSetting.provider == 'blinko'
-                    )
-                )
-            ).scalars().first()
-            if integ:
-                # Prefer trash to respect recycle bin; hard delete can be added via param later
-                await trash_notes(integ.base_url, integ.token, [task.blinko_note_id])
-    except Exception:
-        pass
+    task = await owned_task(db, current_user.id, task_id)
+    # Blinko removal goes through the outbox; prefer trash to respect recycle bin
+    if task.blinko_note_id:
+        await enqueue_note_trash(db, current_user.id, task.id, task.blinko_note_id)
+    # the reminder job goes with the task (ON DELETE CASCADE)
     await db.delete(task)
     await db.commit()
-    # cancel reminder
-    try:
-        sch = start_scheduler()
-        job_id = f"remind-task-{task_id}"
-        if sch.get_job(job_id):
-            sch.remove_job(job_id)
-    except Exception:
-        pass
-    await r.delete(today_cache_key(current_user.id))
+    await response_cache.invalidate(current_user.id)
+    outbox.wake()
+    reminders.untrack(task_id)
+    if task.is_today:
+        await today_index.remove_task(r, current_user.id, task_id)
     return {"message": "deleted"}
 
 
@@ -389,32 +424,16 @@ async def create_subtask(
     task_id: int,
     data: SubtaskCreate,
     db: AsyncSession = Depends(get_db),
-    r=Depends(get_redis),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    parent = await db.get(Task, task_id)
-    if not parent or parent.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    sub = Subtask(title=data.title, done=data.done, task_id=task_id)
-    db.add(sub)
+    parent = await owned_task(db, current_user.id, task_id)
+    sub = await insert_returning(db, Subtask, {"title": data.title, "done": data.done, "task_id": task_id})
+    # 父任务 Blinko 重同步（经由 outbox，随本事务提交）
+    if parent.blinko_note_id:
+        await enqueue_task_sync(db, current_user.id, parent.id)
     await db.commit()
-    await db.refresh(sub)
-    # 触发父任务的 Blinko 同步（最佳努力）
-    try:
-        integ = (
-            await db.execute(
-                select(IntegrationSetting).where(
-                    IntegrationSetting.user_id == current_user.id,
-                    IntegrationSetting.provider == 'blinko'
-                )
-            )
-        ).scalars().first()
-        if integ and parent.blinko_note_id:
-            content = await _compose_blinko_content(db, parent)
-            await upsert_todo(integ.base_url, integ.token, content, note_id=parent.blinko_note_id, title=parent.title)
-    except Exception:
-        pass
-    await r.delete(today_cache_key(current_user.id))
+    await response_cache.invalidate(current_user.id)
+    outbox.wake()
     return sub
 
 
@@ -423,105 +442,59 @@ async def update_subtask(
     subtask_id: int,
     data: SubtaskUpdate,
     db: AsyncSession = Depends(get_db),
-    r=Depends(get_redis),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    sub = await db.get(Subtask, subtask_id)
+    owned_tasks = select(Task.id).where(Task.owner_id == current_user.id)
+    sub = await update_returning(
+        db, Subtask, data.model_dump(exclude_unset=True),
+        Subtask.id == subtask_id, Subtask.task_id.in_(owned_tasks),
+    )
     if not sub:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subtask not found")
-    parent = await db.get(Task, sub.task_id)
-    if not parent or parent.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subtask not found")
-    for k, v in data.model_dump(exclude_unset=True).items():
-        setattr(sub, k, v)
+    # 父任务 Blinko 重同步（经由 outbox，随本事务提交）
+    note_id = await db.scalar(select(Task.blinko_note_id).where(Task.id == sub.task_id))
+    if note_id:
+        await enqueue_task_sync(db, current_user.id, sub.task_id)
     await db.commit()
-    await db.refresh(sub)
-    # 触发父任务的 Blinko 同步（最佳努力）
-    try:
-        integ = (
-            await db.execute(
-                select(IntegrationSetting).where(
-                    IntegrationSetting.user_id == current_user.id,
-                    IntegrationSetting.provider == 'blinko'
-                )
-            )
-        ).scalars().first()
-        if integ and parent.blinko_note_id:
-            content = await _compose_blinko_content(db, parent)
-            await upsert_todo(integ.base_url, integ.token, content, note_id=parent.blinko_note_id, title=parent.title)
-    except Exception:
-        pass
-    await r.delete(today_cache_key(current_user.id))
+    await response_cache.invalidate(current_user.id)
+    outbox.wake()
     return sub
 
 
 @router.get("/tasks/{task_id}/subtasks", response_model=List[SubtaskOut])
+@json_response(List[SubtaskOut])
 async def list_subtasks(
     task_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    params: ListParams = Depends(),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    parent = await db.get(Task, task_id)
-    if not parent or parent.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
-    rows = (
-        await db.execute(select(Subtask).where(Subtask.task_id == task_id))
-    ).scalars().all()
-    return rows
+    await check_task(db, current_user.id, task_id)
+    return await fetch_page(db, Subtask, SubtaskOut, params, Subtask.task_id == task_id)
 
 
 @router.delete("/subtasks/{subtask_id}")
 async def delete_subtask(
     subtask_id: int,
     db: AsyncSession = Depends(get_db),
-    r=Depends(get_redis),
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    sub = await db.get(Subtask, subtask_id)
-    if not sub:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subtask not found")
-    parent = await db.get(Task, sub.task_id)
-    if not parent or parent.owner_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Subtask not found")
+    sub, parent = await owned_subtask(db, current_user.id, subtask_id)
     await db.delete(sub)
+    # 父任务 Blinko 重同步（经由 outbox，随本事务提交）
+    if parent.blinko_note_id:
+        await enqueue_task_sync(db, current_user.id, parent.id)
     await db.commit()
-    # 父任务 Blinko 重同步（最佳努力）
-    try:
-        integ = (
-            await db.execute(
-                select(IntegrationSetting).where(
-                    IntegrationSetting.user_id == current_user.id,
-                    IntegrationSetting.provider == 'blinko'
-                )
-            )
-        ).scalars().first()
-        if integ and parent.blinko_note_id:
-            content = await _compose_blinko_content(db, parent)
-            await upsert_todo(integ.base_url, integ.token, content, note_id=parent.blinko_note_id, title=parent.title)
-    except Exception:
-        pass
-    await r.delete(today_cache_key(current_user.id))
+    await response_cache.invalidate(current_user.id)
+    outbox.wake()
     return {"message": "deleted"}
 
 
 @router.get("/today", response_model=List[TaskOut])
 async def list_today(
-    db: AsyncSession = Depends(get_db),
-    r=Depends(get_redis),
-    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    r=Depends(get_redis_raw),
+    current_user: UserPrincipal = Depends(get_current_user),
 ):
-    key = today_cache_key(current_user.id)
-    cached = await r.get(key)
-    if cached:
-        import json
-        return json.loads(cached)
-    rows = (
-        await db.execute(
-            select(Task).where(Task.is_today == True, Task.owner_id == current_user.id)  # noqa: E712
-        )
-    ).scalars().all()
-    out = [TaskOut.model_validate(row) for row in rows]
-    payload = jsonable_encoder(out)
-    import json
-    await r.setex(key, 60, json.dumps(payload))
-    return out
+    # entries are stored as serialized TaskOut, so the body is assembled without re-validation
+    return Response(await today_index.read_today(r, db, current_user.id), media_type="application/json")
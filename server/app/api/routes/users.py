@@ -4,12 +4,12 @@ from fastapi import APIRouter, Depends
 
 from app.schemas.user import UserOut
 from app.utils.deps import get_current_user
-from app.models.user import User
+from app.services.user_cache import UserPrincipal
 
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.get("/me", response_model=UserOut)
-async def read_me(current_user: User = Depends(get_current_user)):
+async def read_me(current_user: UserPrincipal = Depends(get_current_user)):
     return current_user
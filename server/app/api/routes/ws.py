@@ -1,37 +1,272 @@
 from __future__ import annotations
 
-from typing import Dict, Set
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Coroutine, Dict
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
-from jose import jwt, JWTError
+from jose import JWTError
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError
+
 from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.redis import redis
+from app.utils.security import verify_access_token
 
 
 router = APIRouter()
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_JSON_PING = '{"type":"ping"}'
+HEARTBEAT_JSON_PONG = '{"type":"pong"}'
+
+
+class ClientConnection:
+    """One socket with its own bounded outgoing queue drained by a writer task."""
+
+    __slots__ = ("user_id", "websocket", "queue", "writer", "closed", "last_seen", "heartbeats")
+
+    def __init__(self, user_id: int, websocket: WebSocket, maxsize: int) -> None:
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=maxsize)
+        self.writer: asyncio.Task[None] | None = None
+        self.closed = False
+        self.last_seen = time.monotonic()
+        # set by the first app-level ping; only such clients are held to the idle timeout
+        self.heartbeats = False
 
 
 class ConnectionManager:
-    def __init__(self) -> None:
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+    """Tracks this process's sockets per user.
+
+    Sending only enqueues: every socket has a bounded queue drained by its own
+    writer task, so one slow client never delays the others or the caller.
+    With ``distributed=True`` ``send_to_user`` publishes to a per-user Redis
+    channel and every process subscribes only to the users connected to it,
+    so a message sent from any worker reaches all of the user's sockets.
+    """
+
+    def __init__(
+        self,
+        distributed: bool = False,
+        queue_size: int = 100,
+        full_policy: str = "drop_oldest",
+        send_timeout: float = 10.0,
+        idle_timeout: float = 0.0,
+        reap_interval: float = 15.0,
+    ) -> None:
+        self.active_connections: Dict[int, Dict[WebSocket, ClientConnection]] = {}
+        self.distributed = distributed
+        self.queue_size = queue_size
+        self.full_policy = full_policy
+        self.send_timeout = send_timeout
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        self.dropped_messages = 0
+        self.slow_disconnects = 0
+        self.pongs_sent = 0
+        self.reaped = 0
+        self._pubsub: PubSub | None = None
+        self._listener: asyncio.Task[None] | None = None
+        self._reaper: asyncio.Task[None] | None = None
+        # fire-and-forget closes/unsubscribes, referenced until done (the loop keeps only weak refs)
+        self._background: set[asyncio.Task[None]] = set()
+        # per-process channel keeps the pubsub connection open while no user is connected
+        self._node_channel = f"{settings.WS_CHANNEL_PREFIX}node:{uuid.uuid4().hex}"
 
-    async def connect(self, user_id: int, websocket: WebSocket) -> None:
+    def _channel(self, user_id: int) -> str:
+        return f"{settings.WS_CHANNEL_PREFIX}{user_id}"
+
+    async def start(self) -> None:
+        if self.idle_timeout > 0 and self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap(), name="ws-idle-reaper")
+        if not self.distributed or self._listener is not None:
+            return
+        self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self._node_channel)
+        for user_id in self.active_connections:
+            await self._pubsub.subscribe(self._channel(user_id))
+        self._listener = asyncio.create_task(self._listen(), name="ws-pubsub-listener")
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._reaper):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._listener = self._reaper = None
+        pubsub, self._pubsub = self._pubsub, None
+        if pubsub is not None:
+            await pubsub.aclose()
+        for conns in list(self.active_connections.values()):
+            for conn in list(conns.values()):
+                self._drop(conn)
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    async def connect(self, user_id: int, websocket: WebSocket) -> ClientConnection:
         await websocket.accept()
-        self.active_connections.setdefault(user_id, set()).add(websocket)
+        conn = ClientConnection(user_id, websocket, self.queue_size)
+        conn.writer = asyncio.create_task(self._write(conn), name=f"ws-writer-{user_id}")
+        conns = self.active_connections.setdefault(user_id, {})
+        conns[websocket] = conn
+        if self._pubsub is not None and len(conns) == 1:
+            await self._pubsub.subscribe(self._channel(user_id))
+        return conn
 
     def disconnect(self, user_id: int, websocket: WebSocket) -> None:
         conns = self.active_connections.get(user_id)
-        if conns and websocket in conns:
-            conns.remove(websocket)
+        conn = conns.get(websocket) if conns else None
+        if conn is not None:
+            self._drop(conn)
+
+    def _drop(self, conn: ClientConnection) -> None:
+        conn.closed = True
+        conns = self.active_connections.get(conn.user_id)
+        if conns is not None:
+            conns.pop(conn.websocket, None)
+            if not conns:
+                del self.active_connections[conn.user_id]
+                if self._pubsub is not None:
+                    self._spawn(self._unsubscribe(conn.user_id))
+        writer = conn.writer
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _unsubscribe(self, user_id: int) -> None:
+        # a new socket may have arrived while this was scheduled
+        if self._pubsub is None or self.active_connections.get(user_id):
+            return
+        try:
+            await self._pubsub.unsubscribe(self._channel(user_id))
+        except RedisError as e:
+            logger.warning("WS unsubscribe for user %s failed: %s", user_id, e)
 
     async def send_to_user(self, user_id: int, message: str) -> None:
-        for ws in list(self.active_connections.get(user_id, set())):
+        if self._pubsub is not None:
             try:
-                await ws.send_text(message)
+                await redis.publish(self._channel(user_id), message)
+                return
+            except RedisError as e:
+                logger.warning("WS publish for user %s failed, delivering locally: %s", user_id, e)
+        self.deliver_local(user_id, message)
+
+    def deliver_local(self, user_id: int, message: str) -> None:
+        for conn in list(self.active_connections.get(user_id, {}).values()):
+            self.enqueue(conn, message)
+
+    def enqueue(self, conn: ClientConnection, message: str) -> None:
+        if conn.closed:
+            return
+        try:
+            conn.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.full_policy == "disconnect":
+            self.slow_disconnects += 1
+            self._drop(conn)
+            self._spawn(self._close(conn, status.WS_1013_TRY_AGAIN_LATER))
+            return
+        conn.queue.get_nowait()
+        self.dropped_messages += 1
+        conn.queue.put_nowait(message)
+
+    def touch(self, conn: ClientConnection) -> None:
+        conn.last_seen = time.monotonic()
+
+    def pong(self, conn: ClientConnection, message: str = "pong") -> None:
+        """Answer a heartbeat on the socket that sent it only."""
+        conn.heartbeats = True
+        self.pongs_sent += 1
+        self.enqueue(conn, message)
+
+    async def _reap(self) -> None:
+        # uvicorn answers protocol-level pings without telling the app, so a client that never
+        # sends an app-level ping looks idle here; those are left to --ws-ping-timeout
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            deadline = time.monotonic() - self.idle_timeout
+            for conns in list(self.active_connections.values()):
+                for conn in list(conns.values()):
+                    if conn.heartbeats and conn.last_seen < deadline:
+                        self.reaped += 1
+                        self._drop(conn)
+                        self._spawn(self._close(conn, status.WS_1001_GOING_AWAY))
+
+    async def _write(self, conn: ClientConnection) -> None:
+        while True:
+            message = await conn.queue.get()
+            try:
+                await asyncio.wait_for(conn.websocket.send_text(message), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
             except Exception:
-                self.disconnect(user_id, ws)
+                self._drop(conn)
+                await self._close(conn, status.WS_1011_INTERNAL_ERROR)
+                return
+
+    async def _close(self, conn: ClientConnection, code: int) -> None:
+        try:
+            await conn.websocket.close(code=code)
+        except Exception:
+            pass
+
+    def stats(self) -> dict[str, int]:
+        conns = [c for by_ws in self.active_connections.values() for c in by_ws.values()]
+        return {
+            "users": len(self.active_connections),
+            "connections": len(conns),
+            "queued_messages": sum(c.queue.qsize() for c in conns),
+            "dropped_messages": self.dropped_messages,
+            "slow_disconnects": self.slow_disconnects,
+            "pongs_sent": self.pongs_sent,
+            "reaped_idle": self.reaped,
+        }
+
+    async def _listen(self) -> None:
+        assert self._pubsub is not None
+        prefix = settings.WS_CHANNEL_PREFIX
+        while True:
+            try:
+                msg = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("WS pubsub listener error: %s", e)
+                await asyncio.sleep(1.0)
+                continue
+            if not msg or msg.get("type") != "message":
+                continue
+            channel = msg["channel"]
+            try:
+                user_id = int(channel[len(prefix):])
+            except ValueError:
+                continue
+            self.deliver_local(user_id, msg["data"])
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(
+    distributed=settings.WS_DISTRIBUTED,
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    full_policy=settings.WS_QUEUE_FULL_POLICY,
+    send_timeout=settings.WS_SEND_TIMEOUT,
+    idle_timeout=settings.WS_IDLE_TIMEOUT,
+    reap_interval=settings.WS_REAP_INTERVAL,
+)
+metrics.register("websocket", manager.stats)
 
 
 @router.websocket("/ws")
@@ -46,16 +281,26 @@ async def websocket_endpoint(websocket: WebSocket):
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        sub = payload.get("sub")
-        user_id = int(sub)
-    except (JWTError, ValueError, TypeError):
+        user_id = verify_access_token(token)
+    except JWTError:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
-    await manager.connect(user_id, websocket)
+    # the app's own manager (see create_app), so several apps can run in one process
+    connections: ConnectionManager = websocket.app.state.ws_manager
+    conn = await connections.connect(user_id, websocket)
     try:
         while True:
-            _ = await websocket.receive_text()
-            await manager.send_to_user(user_id, "pong")
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            # any frame counts as activity; heartbeats are answered on this socket only
+            connections.touch(conn)
+            text = message.get("text")
+            if text == "ping":
+                connections.pong(conn)
+            elif text == HEARTBEAT_JSON_PING:
+                connections.pong(conn, HEARTBEAT_JSON_PONG)
     except WebSocketDisconnect:
-        manager.disconnect(user_id, websocket)
+        pass
+    finally:
+        connections.disconnect(user_id, websocket)
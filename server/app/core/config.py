@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,10 +20,53 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "change-me"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    # bcrypt runs on a dedicated thread pool of this size
+    PASSWORD_HASH_WORKERS: int = 2
+    # Verified bearer tokens kept in memory (token -> sub, exp)
+    TOKEN_CACHE_SIZE: int = 10000
 
     DATABASE_URL: str
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # SQLAlchemy pool per process: up to DB_POOL_SIZE kept open plus DB_MAX_OVERFLOW extra under load;
+    # a checkout beyond that waits up to DB_POOL_TIMEOUT seconds. Connections older than
+    # DB_POOL_RECYCLE seconds are replaced (-1 never); keep it below any server/proxy idle timeout.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    # Test every connection with a round trip on checkout; can be turned off when DB_POOL_RECYCLE covers stale connections
+    DB_POOL_PRE_PING: bool = True
+    # Prepared statements cached per connection by the asyncpg dialect (0 disables)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Connect through PgBouncer in transaction mode: no local pool, no statement caches, unique statement names
+    DB_PGBOUNCER: bool = False
+
+    # Optional read replica (same pool settings) for read-only routes. A user's reads go to the primary
+    # for READ_AFTER_WRITE_SECONDS after each of their write requests; keep it above the replication lag.
+    DATABASE_READ_URL: str | None = None
+    READ_AFTER_WRITE_SECONDS: float = 5.0
+    # After failing to reach the replica, every read uses the primary for this long before retrying it
+    REPLICA_RETRY_SECONDS: float = 10.0
+
+    # Deliver WebSocket messages through Redis pub/sub so any worker can reach any user
+    WS_DISTRIBUTED: bool = False
+    WS_CHANNEL_PREFIX: str = "ws:user:"
+    # Per-socket outgoing queue; when full either drop the oldest message or disconnect the client
+    WS_SEND_QUEUE_SIZE: int = 100
+    WS_QUEUE_FULL_POLICY: Literal["drop_oldest", "disconnect"] = "drop_oldest"
+    WS_SEND_TIMEOUT: float = 10.0
+    # Sockets that have sent an app-level ping and then stay silent for longer than this are
+    # closed (0 disables); checked every WS_REAP_INTERVAL. Protocol-level ping frames are answered
+    # by uvicorn, so sockets using only those are closed by --ws-ping-interval / --ws-ping-timeout.
+    WS_IDLE_TIMEOUT: float = 90.0
+    WS_REAP_INTERVAL: float = 15.0
+
+    # Expose GET /metrics (JSON snapshot of internal counters) to superusers, and to
+    # scrapers sending "Authorization: Bearer <METRICS_TOKEN>" when that is set
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: str | None = None
+
     # Timezone for scheduler & datetime interpretation (IANA TZ, e.g., "UTC", "Asia/Shanghai")
     TIMEZONE: str = "UTC"
 
@@ -32,6 +75,72 @@ class Settings(BaseSettings):
     BLINKO_BASE_URL: str | None = None
     BLINKO_TOKEN: str | None = None
 
+    # Outbound HTTP pool for integrations (one pooled client per base URL)
+    HTTP_POOL_MAX_CONNECTIONS: int = 100
+    HTTP_POOL_MAX_KEEPALIVE: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_TIMEOUT: float = 10.0
+    HTTP2_ENABLED: bool = True
+
+    # Authenticated-user snapshot cache used by get_current_user
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_LOCAL_TTL: float = 30.0
+    USER_CACHE_REDIS_ENABLED: bool = True
+    USER_CACHE_REDIS_TTL: int = 300
+
+    # Integration settings cache: short in-process TTL, longer shared Redis TTL
+    INTEGRATION_CACHE_SIZE: int = 10000
+    INTEGRATION_CACHE_LOCAL_TTL: float = 30.0
+    INTEGRATION_CACHE_REDIS_TTL: int = 300
+
+    # Board -> owner and task -> owner lookups used by ownership checks, cached in-process.
+    # A board or task deleted through another worker still passes the check there until the TTL expires.
+    ACCESS_CACHE_ENABLED: bool = False
+    ACCESS_CACHE_SIZE: int = 50000
+    ACCESS_CACHE_TTL: float = 60.0
+
+    # Per-user Today index (Redis hash task id -> TaskOut JSON) maintained by the write paths
+    TODAY_INDEX_TTL: int = 86400
+
+    # Cached list responses: fresh for TTL (+/- jitter fraction), then served stale for
+    # STALE_TTL while one caller recomputes; misses are coalesced behind a Redis lock
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: float = 30.0
+    RESPONSE_CACHE_TTL_JITTER: float = 0.1
+    RESPONSE_CACHE_STALE_TTL: float = 60.0
+    RESPONSE_CACHE_LOCK_TTL: float = 5.0
+    RESPONSE_CACHE_LOCK_WAIT: float = 2.0
+    RESPONSE_CACHE_STATS: bool = True
+
+    # Upper bound for ?limit= on cursor-paginated lists
+    LIST_MAX_LIMIT: int = 500
+
+    # Max in-flight Blinko upserts during bulk sync
+    BLINKO_SYNC_CONCURRENCY: int = 8
+
+    # Background outbox worker for integration sync
+    OUTBOX_POLL_INTERVAL: float = 5.0
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_LEASE_SECONDS: int = 120
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_BACKOFF_BASE: float = 2.0
+    OUTBOX_BACKOFF_MAX: float = 600.0
+
+    # Persistent reminders: jobs live in Postgres and are claimed with a lease by any worker;
+    # those due within REMINDER_LOOKAHEAD seconds are mirrored into an in-process heap
+    REMINDER_POLL_INTERVAL: float = 5.0
+    REMINDER_LOOKAHEAD: float = 300.0
+    REMINDER_LEASE_SECONDS: int = 60
+    # Due reminders are coalesced into one message per user; at most this many users per tick
+    REMINDER_FANOUT_PER_TICK: int = 1000
+    REMINDER_TICK_SECONDS: float = 1.0
+
+    # Daily summary pushed to Memos/Blinko at 21:00 (TIMEZONE): users per chunk, parallel pushes
+    DAILY_SUMMARY_CHUNK_SIZE: int = 1000
+    DAILY_SUMMARY_CONCURRENCY: int = 32
+    DAILY_SUMMARY_LOCK_TTL: int = 900
+
     @property
     def frontend_origins(self) -> List[str]:
         return [o.strip() for o in self.FRONTEND_ORIGINS.split(",") if o.strip()]
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable
+
+
+class TimingStats:
+    """Count/total/max plus percentiles over a bounded window of recent samples (seconds in, ms out)."""
+
+    def __init__(self, window: int = 1024) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self._recent.append(seconds)
+
+    def _percentile(self, ordered: list[float], q: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict[str, Any]:
+        ordered = sorted(self._recent)
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 3),
+            "p99_ms": round(self._percentile(ordered, 0.99) * 1000, 3),
+        }
+
+
+class MetricsRegistry:
+    """Named snapshot callables exposed together on ``GET /metrics``."""
+
+    def __init__(self) -> None:
+        self._sources: dict[str, Callable[[], dict[str, Any]]] = {}
+
+    def register(self, name: str, source: Callable[[], dict[str, Any]]) -> None:
+        self._sources[name] = source
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        return {name: source() for name, source in self._sources.items()}
+
+
+metrics = MetricsRegistry()
@@ -8,7 +8,13 @@ from app.core.config import get_settings
 
 settings = get_settings()
 redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+# Same server without decoding, for cached response bodies that are returned as stored bytes
+redis_raw = aioredis.from_url(settings.REDIS_URL)
 
 
 async def get_redis() -> AsyncIterator[aioredis.Redis]:
     yield redis
+
+
+async def get_redis_raw() -> AsyncIterator[aioredis.Redis]:
+    yield redis_raw
@@ -7,3 +7,5 @@ from app.models.board import Board  # noqa: F401
 from app.models.task import Task  # noqa: F401
 from app.models.subtask import Subtask  # noqa: F401
 from app.models.integration import IntegrationSetting  # noqa: F401
+from app.models.outbox import SyncOutbox  # noqa: F401
+from app.models.reminder import ReminderJob  # noqa: F401
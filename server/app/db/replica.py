@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.redis import redis
+from app.db.session import AsyncSessionLocal, ReadSessionLocal
+from app.utils.cache import MISSING, TTLCache
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Users remembered in-process as having written recently
+_LOCAL_SIZE = 10000
+# Raised when the replica can't be reached (refused, unknown host, rejected, timed out)
+REPLICA_ERRORS = (OSError, asyncio.TimeoutError, DBAPIError)
+
+
+def recent_write_key(user_id: int) -> str:
+    return f"rw:user:{user_id}"
+
+
+class ReadAfterWrite:
+    """Which users wrote within ``READ_AFTER_WRITE_SECONDS`` (read-your-writes with a lagging replica).
+
+    A write marks the user in-process and in Redis, so every worker sends that
+    user's reads to the primary until the window has passed and the replica
+    has caught up. While the replica is unreachable (``replica_failed``) all
+    reads go to the primary for ``REPLICA_RETRY_SECONDS``. Without
+    ``DATABASE_READ_URL`` everything is a no-op.
+    """
+
+    def __init__(self) -> None:
+        self._local: TTLCache[int, bool] = TTLCache(_LOCAL_SIZE, settings.READ_AFTER_WRITE_SECONDS)
+        self._replica_down_until = 0.0
+        self.counters = {"replica": 0, "primary": 0, "replica_failures": 0}
+
+    async def mark(self, user_id: int) -> None:
+        if not settings.DATABASE_READ_URL:
+            return
+        self._local.set(user_id, True)
+        try:
+            await redis.set(recent_write_key(user_id), 1, px=int(settings.READ_AFTER_WRITE_SECONDS * 1000))
+        except RedisError as e:
+            logger.warning("Read-after-write mark failed: %s", e)
+
+    async def use_primary(self, user_id: int) -> bool:
+        """Whether this user's reads must go to the primary right now (counted for ``/metrics``)."""
+        if not settings.DATABASE_READ_URL:
+            return True
+        if time.monotonic() < self._replica_down_until:
+            self.counters["primary"] += 1
+            return True
+        sticky = self._local.get(user_id) is not MISSING
+        if not sticky:
+            try:
+                sticky = bool(await redis.exists(recent_write_key(user_id)))
+            except RedisError as e:
+                logger.warning("Read-after-write check failed: %s", e)
+                sticky = True  # can't tell: the primary is always current
+        self.counters["primary" if sticky else "replica"] += 1
+        return sticky
+
+    def replica_failed(self, error: BaseException) -> None:
+        """Send every read to the primary for a while; the replica is tried again afterwards."""
+        logger.warning("Read replica unavailable, using the primary for %ss: %r", settings.REPLICA_RETRY_SECONDS, error)
+        self.counters["replica_failures"] += 1
+        self._replica_down_until = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+    @property
+    def replica_down(self) -> bool:
+        return time.monotonic() < self._replica_down_until
+
+    def stats(self) -> dict[str, Any]:
+        return {"enabled": bool(settings.DATABASE_READ_URL), "replica_down": self.replica_down, **self.counters}
+
+
+read_after_write = ReadAfterWrite()
+metrics.register("read_routing", read_after_write.stats)
+
+
+async def open_read_session(user_id: int) -> AsyncSession:
+    """A session for the user's reads: the replica if it is reachable and they haven't written recently."""
+    if await read_after_write.use_primary(user_id):
+        return AsyncSessionLocal()
+    session = ReadSessionLocal()
+    try:
+        await session.connection()  # connect now, so an unreachable replica still leaves the primary
+    except REPLICA_ERRORS as e:
+        await session.close()
+        read_after_write.replica_failed(e)
+        return AsyncSessionLocal()
+    return session
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from typing import Any, Mapping, Sequence
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def insert_returning(db: AsyncSession, entity: Any, values: Mapping[str, Any]) -> Any:
+    """``INSERT ... RETURNING``: the persisted row (id, defaults) in one round trip, no refresh needed."""
+    stmt = insert(entity).values(**values).returning(entity)
+    return (await db.execute(stmt)).scalar_one()
+
+
+async def insert_many_returning(
+    db: AsyncSession, entity: Any, values: Sequence[Mapping[str, Any]], *columns: Any,
+) -> list[Any]:
+    """Bulk ``INSERT ... RETURNING`` of ``columns``; the rows come back in the order of ``values``.
+
+    ``sort_by_parameter_order`` makes SQLAlchemy correlate the returned rows
+    with the parameter sets (or insert row by row where the backend can't).
+    """
+    stmt = insert(entity).returning(*columns, sort_by_parameter_order=True)
+    return list((await db.execute(stmt, values)).all())
+
+
+async def update_returning(db: AsyncSession, entity: Any, values: Mapping[str, Any], *criteria: Any) -> Any | None:
+    """``UPDATE ... WHERE criteria RETURNING``: the updated row, or None when nothing matched.
+
+    Put the ownership check in ``criteria`` so lookup, check and write are one
+    statement. With no ``values`` the row is only selected. An instance of the
+    row already in the session is overwritten with the returned values.
+    """
+    if values:
+        stmt = (
+            update(entity).where(*criteria).values(**values).returning(entity)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        stmt = select(entity).where(*criteria)
+    stmt = stmt.execution_options(populate_existing=True)
+    return (await db.execute(stmt)).scalars().first()
@@ -1,9 +1,13 @@
-from typing import AsyncGenerator
+import time
+import uuid
+from typing import Any, AsyncGenerator
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, declared_attr
-from sqlalchemy import MetaData
+from sqlalchemy import MetaData, event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
 
 from app.core.config import get_settings
+from app.core.metrics import TimingStats, metrics
 
 
 NAMING_CONVENTIONS = {
@@ -25,10 +29,107 @@ class Base(DeclarativeBase):
 
 settings = get_settings()
 
-engine: AsyncEngine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True)
+
+class PoolStats:
+    """Connection checkouts of one engine: time spent obtaining a connection and how full the pool is."""
+
+    def __init__(self, capacity: int | None) -> None:
+        self.capacity = capacity
+        self.wait = TimingStats()
+        self.in_use = 0
+        self.peak = 0
+        self.timeouts = 0
+
+    def checked_out(self) -> None:
+        self.in_use += 1
+        self.peak = max(self.peak, self.in_use)
+
+    def checked_in(self) -> None:
+        self.in_use = max(self.in_use - 1, 0)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "peak": self.peak,
+            # 1.0 means every further checkout waits (up to DB_POOL_TIMEOUT)
+            "saturation": round(self.in_use / self.capacity, 3) if self.capacity else None,
+            "timeouts": self.timeouts,
+            "wait": self.wait.snapshot(),
+        }
+
+
+class _MeteredPool:
+    """Mixin timing ``_do_get``: waiting for a free connection, or opening a new one."""
+
+    pool_stats: PoolStats
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.pool_stats.timeouts += 1
+            raise
+        finally:
+            self.pool_stats.wait.observe(time.perf_counter() - started)
+
+
+def _engine_options(stats: PoolStats) -> dict[str, Any]:
+    base: type[Pool]
+    if settings.DB_PGBOUNCER:
+        # PgBouncer (transaction pooling) does the pooling and may hand each transaction a
+        # different server connection: prepared statements must not be cached or reused by name
+        base = NullPool
+        options: dict[str, Any] = {
+            "connect_args": {
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            },
+        }
+    else:
+        base = AsyncAdaptedQueuePool
+        options = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "connect_args": {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+        }
+    # a class per engine keeps the stats across pool.recreate() (engine.dispose())
+    options["poolclass"] = type(f"Metered{base.__name__}", (_MeteredPool, base), {"pool_stats": stats})
+    return options
+
+
+def make_engine(url: str, name: str) -> AsyncEngine:
+    """Engine with the configured pool; its pool stats are published on ``/metrics`` as ``name``."""
+    capacity = None if settings.DB_PGBOUNCER else settings.DB_POOL_SIZE + max(settings.DB_MAX_OVERFLOW, 0)
+    stats = PoolStats(capacity)
+    engine = create_async_engine(url, **_engine_options(stats))
+    event.listen(engine.sync_engine, "checkout", lambda *_: stats.checked_out())
+    event.listen(engine.sync_engine, "checkin", lambda *_: stats.checked_in())
+    metrics.register(name, stats.stats)
+    return engine
+
+
+engine: AsyncEngine = make_engine(settings.DATABASE_URL, "db_pool")
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Without DATABASE_READ_URL the "replica" is the primary itself
+read_engine: AsyncEngine = (
+    make_engine(settings.DATABASE_READ_URL, "db_read_pool") if settings.DATABASE_READ_URL else engine
+)
+ReadSessionLocal = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+async def get_replica_db() -> AsyncGenerator[AsyncSession, None]:
+    """Replica session regardless of recent writes; prefer ``get_read_db`` for user data."""
+    async with ReadSessionLocal() as session:
+        yield session
@@ -1,66 +1,112 @@
 from __future__ import annotations
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
- 
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
 from app.core.config import get_settings
+from app.utils.pagination import NEXT_CURSOR_HEADER
 from app.utils.scheduler import add_daily_job, start_scheduler
 from app.db.session import engine
 from app.db import base  # noqa: F401
+from app.services.outbox import outbox
+from app.services.reminders import ReminderWorker, reminders
+from app.services.daily_summary import daily_summary
+from app.services.http import http_clients
 from app.api.routes.auth import router as auth_router
 from app.api.routes.projects import router as projects_router
-from app.api.routes.ws import router as ws_router
+from app.api.routes.ws import ConnectionManager, router as ws_router, manager as ws_manager
 from app.api.routes.integrations import router as integrations_router
 from app.api.routes.users import router as users_router
+from app.api.routes.metrics import router as metrics_router
+from app.utils.security import password_hasher
 
 
 settings = get_settings()
+SCHEMA_LOCK_KEY = 0x70D0
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # create tables if not exist
+    connections: ConnectionManager = app.state.ws_manager
+    reminder_worker: ReminderWorker = app.state.reminders
+    # create tables if not exist (advisory lock serializes workers starting together)
     async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
         await conn.run_sync(base.Base.metadata.create_all)
-    # start scheduler and add daily summary job placeholder
+    # start scheduler and add daily summary job (one worker runs it, resumable via checkpoint)
     start_scheduler()
-    def _daily_job():
-        # TODO: aggregate today's tasks and push to memos/blinko
-        pass
-    add_daily_job(_daily_job, hour=21, minute=0)
+    add_daily_job(daily_summary.run, hour=21, minute=0)
+    resume_task = asyncio.create_task(daily_summary.resume_pending())
+    # drain pending integration sync operations in the background
+    outbox.start()
+    # subscribe to cross-worker WebSocket fan-out (no-op unless WS_DISTRIBUTED)
+    await connections.start()
+    # rebuild and fire persisted reminders (each job claimed by exactly one worker)
+    await reminder_worker.start(connections.send_to_user)
     yield
     # graceful shutdown
+    resume_task.cancel()
+    await reminder_worker.stop()
+    await connections.stop()
+    await outbox.stop()
+    await http_clients.aclose()
+    password_hasher.shutdown()
 
 
-app = FastAPI(title=settings.APP_NAME, debug=settings.APP_DEBUG, lifespan=lifespan)
+def create_app(
+    ws_manager: ConnectionManager = ws_manager,
+    reminder_worker: ReminderWorker = reminders,
+) -> FastAPI:
+    """Build the application around a WebSocket manager and a reminder worker.
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.frontend_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    The defaults are this process's instances; tests pass their own to run
+    several apps (as if several workers) in one process.
+    """
+    app = FastAPI(title=settings.APP_NAME, debug=settings.APP_DEBUG, lifespan=lifespan)
+    app.state.ws_manager = ws_manager
+    app.state.reminders = reminder_worker
 
-app.include_router(auth_router)
-app.include_router(projects_router)
-app.include_router(ws_router)
-app.include_router(users_router)
-app.include_router(integrations_router)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.frontend_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
+    )
 
+    app.include_router(auth_router)
+    app.include_router(projects_router)
+    app.include_router(ws_router)
+    app.include_router(users_router)
+    app.include_router(integrations_router)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics_router)
 
-@app.get("/")
-async def root(req: Request):
-    # If no Authorization header (unauthenticated browser hit), redirect to frontend login
-    auth = req.headers.get("authorization") or req.headers.get("Authorization")
-    if not auth:
+    @app.exception_handler(PoolTimeoutError)
+    async def pool_exhausted(_: Request, exc: PoolTimeoutError):
+        # no connection freed up within DB_POOL_TIMEOUT: let the client retry instead of a 500
+        return JSONResponse({"detail": "Database busy, retry later"}, status_code=503, headers={"Retry-After": "1"})
+
+    @app.get("/")
+    async def root(req: Request):
+        # If no Authorization header (unauthenticated browser hit), redirect to frontend login
+        auth = req.headers.get("authorization") or req.headers.get("Authorization")
+        if not auth:
+            return RedirectResponse(settings.frontend_login_url, status_code=302)
+        return {"message": "Todolist Server running"}
+
+    @app.get("/auth/redirect")
+    async def auth_redirect(_: Request):
+        # Explicit endpoint to redirect browsers to login
         return RedirectResponse(settings.frontend_login_url, status_code=302)
-    return {"message": "Todolist Server running"}
 
-@app.get("/auth/redirect")
-async def auth_redirect(_: Request):
-    # Explicit endpoint to redirect browsers to login
-    return RedirectResponse(settings.frontend_login_url, status_code=302)
+    return app
+
+
+app = create_app()
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class SyncOutbox(Base):
+    """Pending sync operation for an external integration (written with the task change)."""
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    provider: Mapped[str] = mapped_column(String(50), default="blinko", nullable=False)
+    op: Mapped[str] = mapped_column(String(20), nullable=False)  # upsert | trash
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
+    # No FK on purpose: trash operations must outlive the deleted task
+    task_id: Mapped[int | None] = mapped_column(Integer, nullable=True, index=True)
+    note_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from typing import List, TYPE_CHECKING
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Text
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -13,6 +13,9 @@ if TYPE_CHECKING:  # pragma: no cover
 
 
 class Project(Base):
+    # list_projects pages by (created_at, id) within an owner
+    __table_args__ = (Index("ix_project_owner_id_created_at_id", "owner_id", "created_at", "id"),)
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from datetime import datetime
+from sqlalchemy import String, DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class ReminderJob(Base):
+    """Pending reminder for a task; only primitives so any worker can fire it."""
+
+    task_id: Mapped[int] = mapped_column(ForeignKey("task.id", ondelete="CASCADE"), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
+    # UTC naive, same as Task.remind_at
+    fire_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+    # Set while a worker is firing the reminder; an expired lease makes the job claimable again
+    lease_until: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    lease_owner: Mapped[str | None] = mapped_column(String(64), nullable=True)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, date
 from typing import List, TYPE_CHECKING
 from enum import Enum
-from sqlalchemy import String, Integer, DateTime, Date, ForeignKey, Text, Enum as SAEnum, Boolean
+from sqlalchemy import String, Integer, DateTime, Date, ForeignKey, Text, Enum as SAEnum, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -27,6 +27,9 @@ class TaskPriorityEnum(str, Enum):
 
 
 class Task(Base):
+    # keyset pagination of list endpoints: (parent, created_at, id)
+    __table_args__ = (Index("ix_task_board_id_created_at_id", "board_id", "created_at", "id"),)
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -38,6 +41,8 @@ class Task(Base):
     is_today: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, index=True)
     # Blinko note id mapping (optional). Requires DB migration for existing DB.
     blinko_note_id: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    # Hash of the content last pushed to Blinko; unchanged tasks are not re-sent
+    blinko_content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     board_id: Mapped[int] = mapped_column(ForeignKey("board.id", ondelete="CASCADE"), index=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("user.id", ondelete="CASCADE"), index=True)
@@ -20,3 +20,18 @@ class IntegrationSettingOut(IntegrationSettingBase):
 
 class Message(BaseModel):
 	message: str
+
+
+class BlinkoSyncRequest(BaseModel):
+	# exactly one of board_id / project_id
+	board_id: int | None = None
+	project_id: int | None = None
+	# push even when the stored content hash says the note is unchanged
+	force: bool = False
+
+
+class BlinkoSyncResult(BaseModel):
+	synced: int
+	skipped: int = 0
+	failed: int
+	errors: dict[int, str] = {}
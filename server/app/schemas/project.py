@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ProjectBase(BaseModel):
@@ -82,6 +82,22 @@ class TaskOut(TaskBase):
         from_attributes = True
 
 
+# Max items per tasks:batch request
+BATCH_MAX_ITEMS = 500
+
+
+class TaskBatchCreate(BaseModel):
+    items: list[TaskCreate] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class TaskBatchItem(TaskUpdate):
+    id: int
+
+
+class TaskBatchUpdate(BaseModel):
+    items: list[TaskBatchItem] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
 class SubtaskBase(BaseModel):
     title: str
     done: bool = False
@@ -103,3 +119,17 @@ class SubtaskOut(SubtaskBase):
 
     class Config:
         from_attributes = True
+
+
+class TaskTree(TaskOut):
+    subtasks: list[SubtaskOut] = []
+
+
+class BoardTree(BoardOut):
+    tasks: list[TaskTree] = []
+
+
+class ProjectSnapshot(ProjectOut):
+    """Whole project tree returned by ``GET /projects/{id}/snapshot``."""
+
+    boards: list[BoardTree] = []
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Mapping, Sequence
+
+from sqlalchemy import case, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.config import get_settings
+from app.models.task import Task
+from app.services.blinko import upsert_todo
+
+
+settings = get_settings()
+
+# Bump when the note layout changes so every task is pushed again once
+_RENDER_VERSION = 1
+
+
+def _enum_value(v: Any) -> Any:
+    return getattr(v, "value", v)
+
+
+def content_fields(task: Task) -> tuple:
+    """Everything the note depends on; ``task.subtasks`` must already be loaded
+    (e.g. via ``selectinload(Task.subtasks)``)."""
+    subs = tuple((s.title, bool(s.done)) for s in sorted(task.subtasks, key=lambda s: s.id))
+    return (
+        task.title,
+        task.description,
+        _enum_value(task.status),
+        _enum_value(task.priority),
+        task.due_date,
+        task.remind_at,
+        bool(task.is_today),
+        subs,
+    )
+
+
+def content_hash(fields: tuple) -> str:
+    return hashlib.sha256(repr((_RENDER_VERSION, fields)).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def _render(fields: tuple) -> str:
+    """构建用于 Blinko 的简洁 Markdown 内容，包含子任务清单。
+    规则：
+    - 第一行：粗体标题
+    - 第二段（可选）：任务描述
+    - 第三段（可选）：元信息（状态/优先级/截止/提醒/今日）以 | 分隔
+    - 其后：子任务清单，每行 "- [ ] 标题"；若已完成则 "- [x] 标题"
+    """
+    title, description, status, priority, due_date, remind_at, is_today, subs = fields
+    lines: list[str] = [f"**{title}**"]
+    if description:
+        lines.append(description)
+    meta: list[str] = []
+    if status:
+        meta.append(f"状态: {status}")
+    if priority:
+        meta.append(f"优先级: {priority}")
+    if due_date:
+        meta.append(f"截止: {due_date}")
+    if remind_at:
+        meta.append(f"提醒: {remind_at} UTC")
+    if is_today:
+        meta.append("今日")
+    if meta:
+        lines.append("\n" + " | ".join(meta))
+    # 子任务清单
+    if subs:
+        checklist = [f"- [{'x' if done else ' '}] {sub_title}" for sub_title, done in subs]
+        lines.append("")
+        lines.extend(checklist)
+    return "\n\n".join(lines)
+
+
+def render_blinko_content(task: Task) -> str:
+    return _render(content_fields(task))
+
+
+async def write_back_notes(db: AsyncSession, tasks: Sequence[Task], synced: Mapping[int, tuple[str, str]]) -> None:
+    """Store ``task_id -> (note_id, content_hash)`` with one UPDATE (``updated_at`` is left untouched)."""
+    if not synced:
+        return
+    await db.execute(
+        update(Task)
+        .where(Task.id.in_(list(synced)))
+        .values(
+            blinko_note_id=case({k: v[0] for k, v in synced.items()}, value=Task.id),
+            blinko_content_hash=case({k: v[1] for k, v in synced.items()}, value=Task.id),
+            updated_at=Task.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    for task in tasks:
+        if task.id in synced:
+            set_committed_value(task, "blinko_note_id", synced[task.id][0])
+            set_committed_value(task, "blinko_content_hash", synced[task.id][1])
+
+
+@dataclass
+class SyncResult:
+    synced: dict[int, str | None] = field(default_factory=dict)
+    skipped: list[int] = field(default_factory=list)
+    errors: dict[int, str] = field(default_factory=dict)
+    # task_id -> (note_id, content_hash) for ``write_back_notes``
+    notes: dict[int, tuple[str, str]] = field(default_factory=dict)
+
+
+async def push_notes(
+    base_url: str,
+    token: str,
+    tasks: Sequence[Task],
+    concurrency: int | None = None,
+    force: bool = False,
+) -> SyncResult:
+    """Upsert notes for ``tasks`` with bounded concurrency, without touching the database.
+
+    ``tasks`` must have ``subtasks`` loaded. Tasks whose rendered content hash
+    matches the one stored at the last push are skipped unless ``force``.
+    Store ``result.notes`` with ``write_back_notes`` afterwards.
+    """
+    result = SyncResult()
+    pending: list[tuple[Task, str, str]] = []
+    for task in tasks:
+        fields = content_fields(task)
+        digest = content_hash(fields)
+        if not force and task.blinko_note_id and task.blinko_content_hash == digest:
+            result.skipped.append(task.id)
+            continue
+        pending.append((task, _render(fields), digest))
+    if not pending:
+        return result
+    sem = asyncio.Semaphore(concurrency or settings.BLINKO_SYNC_CONCURRENCY)
+
+    async def _one(task: Task, content: str) -> str | None:
+        async with sem:
+            return await upsert_todo(base_url, token, content, note_id=task.blinko_note_id, title=task.title)
+
+    outcomes = await asyncio.gather(*(_one(t, c) for t, c, _ in pending), return_exceptions=True)
+    for (task, _, digest), outcome in zip(pending, outcomes):
+        if isinstance(outcome, BaseException):
+            result.errors[task.id] = repr(outcome)
+            continue
+        note_id = outcome or task.blinko_note_id
+        result.synced[task.id] = note_id
+        if note_id:
+            result.notes[task.id] = (note_id, digest)
+    return result
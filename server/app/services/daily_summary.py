@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Sequence
+from zoneinfo import ZoneInfo
+
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.redis import redis
+from app.db.session import AsyncSessionLocal
+from app.models.integration import IntegrationSetting
+from app.models.task import Task, TaskStatusEnum
+from app.services.integrations import BlinkoClient, MemosClient
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PROVIDERS = ("memos", "blinko")
+# Pending titles listed in a summary
+_MAX_TITLES = 10
+# Checkpoint and done marker expire on their own once the day is over
+_KEY_TTL = 2 * 24 * 3600
+
+
+@dataclass
+class UserSummary:
+    user_id: int
+    total: int
+    done: int
+    doing: int
+    todo: int
+    overdue: int
+    pending_titles: list[str]
+
+
+def render_summary(day: date, s: UserSummary) -> str:
+    lines = [
+        f"**今日总结 {day.isoformat()}**",
+        f"完成 {s.done}/{s.total} | 进行中 {s.doing} | 待办 {s.todo} | 逾期 {s.overdue}",
+    ]
+    if s.pending_titles:
+        lines.append("未完成：\n" + "\n".join(f"- {t}" for t in s.pending_titles))
+    return "\n\n".join(lines)
+
+
+async def summarize_users(db: AsyncSession, user_ids: Sequence[int], day: date) -> dict[int, UserSummary]:
+    """One grouped aggregate for a chunk of users: today's tasks plus overdue ones still open."""
+    not_done = Task.status != TaskStatusEnum.done
+    today = Task.is_today == True  # noqa: E712
+    overdue = (Task.due_date < day) & not_done
+    stmt = (
+        select(
+            Task.owner_id,
+            func.count().filter(today),
+            func.count().filter(today & (Task.status == TaskStatusEnum.done)),
+            func.count().filter(today & (Task.status == TaskStatusEnum.doing)),
+            func.count().filter(today & (Task.status == TaskStatusEnum.todo)),
+            func.count().filter(overdue),
+            func.array_agg(aggregate_order_by(Task.title, Task.priority.desc(), Task.id)).filter(not_done),
+        )
+        .where(Task.owner_id.in_(user_ids), today | overdue)
+        .group_by(Task.owner_id)
+    )
+    out: dict[int, UserSummary] = {}
+    for owner_id, total, done, doing, todo, late, titles in (await db.execute(stmt)).all():
+        out[owner_id] = UserSummary(owner_id, total, done, doing, todo, late, list(titles or [])[:_MAX_TITLES])
+    return out
+
+
+@dataclass
+class RunStats:
+    day: str | None = None
+    users: int = 0
+    pushed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    resumed_from: int = 0
+    errors: list[str] = field(default_factory=list)
+
+
+class DailySummaryJob:
+    """Pushes each user's daily summary to their Memos/Blinko integrations.
+
+    Users are streamed in keyset-paginated chunks (``user_id > cursor``); each
+    chunk costs two queries and its pushes run with bounded concurrency. The
+    cursor is checkpointed in Redis after every chunk, so a run interrupted by
+    a crash or restart continues where it stopped (at worst the last chunk is
+    sent twice). A Redis lock keeps the other workers from running it too.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self.last = RunStats()
+
+    @staticmethod
+    def _keys(day: date) -> tuple[str, str, str]:
+        base = f"daily-summary:{day.isoformat()}"
+        return f"{base}:lock", f"{base}:cursor", f"{base}:done"
+
+    @staticmethod
+    def today() -> date:
+        return datetime.now(ZoneInfo(settings.TIMEZONE)).date()
+
+    async def run(self, day: date | None = None) -> RunStats | None:
+        day = day or self.today()
+        lock_key, cursor_key, done_key = self._keys(day)
+        token = uuid.uuid4().hex
+        try:
+            if await redis.exists(done_key):
+                return None
+            if not await redis.set(lock_key, token, nx=True, ex=settings.DAILY_SUMMARY_LOCK_TTL):
+                logger.info("Daily summary for %s is running elsewhere", day)
+                return None
+            cursor = int(await redis.get(cursor_key) or 0)
+        except RedisError as e:
+            logger.error("Daily summary for %s not started, Redis unavailable: %s", day, e)
+            return None
+
+        stats = RunStats(day=day.isoformat(), resumed_from=cursor)
+        started = time.perf_counter()
+        try:
+            while True:
+                async with self._session_factory() as db:
+                    user_ids = (
+                        await db.execute(
+                            select(IntegrationSetting.user_id)
+                            .where(IntegrationSetting.provider.in_(PROVIDERS), IntegrationSetting.user_id > cursor)
+                            .group_by(IntegrationSetting.user_id)
+                            .order_by(IntegrationSetting.user_id)
+                            .limit(settings.DAILY_SUMMARY_CHUNK_SIZE)
+                        )
+                    ).scalars().all()
+                    if not user_ids:
+                        break
+                    integrations = (
+                        await db.execute(
+                            select(
+                                IntegrationSetting.user_id, IntegrationSetting.provider,
+                                IntegrationSetting.base_url, IntegrationSetting.token,
+                            ).where(IntegrationSetting.user_id.in_(user_ids), IntegrationSetting.provider.in_(PROVIDERS))
+                        )
+                    ).all()
+                    summaries = await summarize_users(db, user_ids, day)
+                await self._push_chunk(day, summaries, integrations, stats)
+                stats.users += len(user_ids)
+                cursor = user_ids[-1]
+                async with redis.pipeline(transaction=False) as pipe:
+                    pipe.set(cursor_key, cursor, ex=_KEY_TTL)
+                    pipe.expire(lock_key, settings.DAILY_SUMMARY_LOCK_TTL)
+                    await pipe.execute()
+            await redis.set(done_key, 1, ex=_KEY_TTL)
+        finally:
+            stats.seconds = round(time.perf_counter() - started, 3)
+            self.last = stats
+            try:
+                if await redis.get(lock_key) == token:
+                    await redis.delete(lock_key)
+            except RedisError:
+                pass
+        logger.info("Daily summary %s: %s users, %s pushed, %s failed in %.1fs",
+                    day, stats.users, stats.pushed, stats.failed, stats.seconds)
+        return stats
+
+    async def resume_pending(self, retry_interval: float = 60.0) -> None:
+        """Finish today's run if a previous process died in the middle of it.
+
+        The dead process's lock has to expire first, so keep retrying until the
+        run is marked done (by this worker or another one).
+        """
+        day = self.today()
+        _, cursor_key, done_key = self._keys(day)
+        while True:
+            try:
+                pending = await redis.exists(cursor_key) and not await redis.exists(done_key)
+            except RedisError:
+                return
+            if not pending:
+                return
+            logger.info("Resuming interrupted daily summary for %s", day)
+            if await self.run(day) is not None:
+                return
+            await asyncio.sleep(retry_interval)
+
+    async def _push_chunk(self, day: date, summaries: dict[int, UserSummary], integrations: Sequence[Any], stats: RunStats) -> None:
+        sem = asyncio.Semaphore(settings.DAILY_SUMMARY_CONCURRENCY)
+        title = f"今日总结 {day.isoformat()}"
+
+        async def _one(row: Any, content: str) -> None:
+            async with sem:
+                if row.provider == "memos":
+                    await MemosClient(row.base_url, row.token).post_memo(content)
+                else:
+                    await BlinkoClient(row.base_url, row.token).post_note(title, content)
+
+        jobs = []
+        for row in integrations:
+            summary = summaries.get(row.user_id)
+            if summary is None:
+                # nothing planned today and nothing overdue: no summary
+                stats.skipped += 1
+                continue
+            jobs.append((row, _one(row, render_summary(day, summary))))
+        outcomes = await asyncio.gather(*(coro for _, coro in jobs), return_exceptions=True)
+        for (row, _), outcome in zip(jobs, outcomes):
+            if isinstance(outcome, BaseException):
+                stats.failed += 1
+                if len(stats.errors) < 20:
+                    stats.errors.append(f"user {row.user_id} {row.provider}: {outcome!r}")
+                logger.warning("Daily summary push to %s for user %s failed: %s", row.provider, row.user_id, outcome)
+            else:
+                stats.pushed += 1
+
+    def stats(self) -> dict[str, Any]:
+        s = self.last
+        return {
+            "day": s.day, "users": s.users, "pushed": s.pushed, "failed": s.failed,
+            "skipped": s.skipped, "seconds": s.seconds, "resumed_from": s.resumed_from,
+        }
+
+
+daily_summary = DailySummaryJob()
+metrics.register("daily_summary", daily_summary.stats)
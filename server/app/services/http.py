@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import importlib.util
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+# HTTP/2 needs the optional ``h2`` package (``pip install httpx[http2]``)
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _origin(base_url: str) -> str:
+    parts = urlsplit(base_url.strip())
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def _no_cookies() -> CookieJar:
+    # a jar that refuses every Set-Cookie: clients are shared by all users of an origin
+    return CookieJar(DefaultCookiePolicy(allowed_domains=[]))
+
+
+class HttpClientPool:
+    """Keeps one keep-alive ``httpx.AsyncClient`` per integration origin.
+
+    Clients are created lazily on first use and closed together by
+    :meth:`aclose` (called from the app lifespan). A client serves every
+    user and token of its origin, so it never stores cookies.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._transport = transport
+
+    def _create(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT)
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=timeout,
+            http2=settings.HTTP2_ENABLED and HTTP2_AVAILABLE,
+            cookies=_no_cookies(),
+            transport=self._transport,
+        )
+
+    def get(self, base_url: str) -> httpx.AsyncClient:
+        key = _origin(base_url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = self._clients[key] = self._create()
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+http_clients = HttpClientPool()
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    return http_clients.get(base_url)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from redis.exceptions import RedisError, WatchError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.redis import redis
+from app.models.integration import IntegrationSetting
+from app.utils.cache import MISSING, TTLCache
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True, slots=True)
+class IntegrationConfig:
+    """Detached snapshot of an ``IntegrationSetting`` row."""
+
+    id: int
+    user_id: int
+    provider: str
+    base_url: str
+    token: str
+    created_at: datetime
+
+
+# (user_id, provider) -> IntegrationConfig. Only configured integrations are kept
+# here: a cached "none" on another worker would skip syncs after the user sets
+# one up, since invalidation only reaches this process and Redis.
+_local: TTLCache[tuple[int, str], IntegrationConfig] = TTLCache(
+    settings.INTEGRATION_CACHE_SIZE, settings.INTEGRATION_CACHE_LOCAL_TTL
+)
+
+
+def integration_cache_key(user_id: int, provider: str) -> str:
+    return f"integ:{user_id}:{provider}"
+
+
+def _generation_key(user_id: int, provider: str) -> str:
+    # bumped by every invalidation; fills WATCH it so a read that raced a write is not stored
+    return f"integ:{user_id}:{provider}:gen"
+
+
+def _dumps(cfg: IntegrationConfig | None) -> str:
+    if cfg is None:
+        return "null"
+    data = asdict(cfg)
+    data["created_at"] = cfg.created_at.isoformat()
+    return json.dumps(data)
+
+
+def _loads(raw: str) -> IntegrationConfig | None:
+    data = json.loads(raw)
+    if data is None:
+        return None
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return IntegrationConfig(**data)
+
+
+async def get_integration(db: AsyncSession, user_id: int, provider: str = 'blinko') -> IntegrationConfig | None:
+    """Look up a user's integration through the LRU, then Redis, then the database.
+
+    Misses are cached in Redis only, so write paths learn "not configured"
+    without a query and every worker sees the invalidation.
+    """
+    key = (user_id, provider)
+    hit = _local.get(key)
+    if hit is not MISSING:
+        return hit  # type: ignore[return-value]
+    rkey = integration_cache_key(user_id, provider)
+    try:
+        raw = await redis.get(rkey)
+    except RedisError as e:
+        logger.warning("Integration cache read failed: %s", e)
+        return _remember(key, await _load(db, user_id, provider))
+    if raw is not None:
+        return _remember(key, _loads(raw))
+    loaded = False
+    cfg = None
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            await pipe.watch(_generation_key(user_id, provider))
+            cfg, loaded = await _load(db, user_id, provider), True
+            pipe.multi()
+            pipe.setex(rkey, settings.INTEGRATION_CACHE_REDIS_TTL, _dumps(cfg))
+            await pipe.execute()
+    except WatchError:
+        pass  # invalidated while loading: return what we read, don't cache it
+    except RedisError as e:
+        logger.warning("Integration cache write failed: %s", e)
+    if not loaded:
+        cfg = await _load(db, user_id, provider)
+    return _remember(key, cfg)
+
+
+def _remember(key: tuple[int, str], cfg: IntegrationConfig | None) -> IntegrationConfig | None:
+    if cfg is not None:
+        _local.set(key, cfg)
+    return cfg
+
+
+async def _load(db: AsyncSession, user_id: int, provider: str) -> IntegrationConfig | None:
+    row = (
+        await db.execute(
+            select(IntegrationSetting).where(
+                IntegrationSetting.user_id == user_id,
+                IntegrationSetting.provider == provider
+            )
+        )
+    ).scalars().first()
+    if row is None:
+        return None
+    return IntegrationConfig(
+        id=row.id, user_id=row.user_id, provider=row.provider,
+        base_url=row.base_url, token=row.token, created_at=row.created_at,
+    )
+
+
+async def invalidate_integration(user_id: int, provider: str = 'blinko') -> None:
+    """Drop cached settings after they change (committed).
+
+    Other workers' in-process copies of a configured integration catch up
+    within ``INTEGRATION_CACHE_LOCAL_TTL``.
+    """
+    _local.pop((user_id, provider))
+    gen = _generation_key(user_id, provider)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.incr(gen)
+            pipe.expire(gen, settings.INTEGRATION_CACHE_REDIS_TTL)
+            pipe.delete(integration_cache_key(user_id, provider))
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Integration cache invalidation failed: %s", e)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import httpx
 from typing import Any
 
+from app.services.http import get_http_client
+
 
 class MemosClient:
     def __init__(self, base_url: str, token: str) -> None:
@@ -11,10 +12,10 @@ class MemosClient:
 
     async def post_memo(self, content: str) -> Any:
         headers = {"Authorization": f"Bearer {self.token}"}
-        async with httpx.AsyncClient(base_url=self.base_url, headers=headers, timeout=20.0) as client:
-            resp = await client.post("/api/v1/memos", json={"content": content})
-            resp.raise_for_status()
-            return resp.json()
+        client = get_http_client(self.base_url)
+        resp = await client.post(self.base_url + "/api/v1/memos", headers=headers, json={"content": content}, timeout=20.0)
+        resp.raise_for_status()
+        return resp.json()
 
 
 class BlinkoClient:
@@ -24,7 +25,7 @@ class BlinkoClient:
 
     async def post_note(self, title: str, content: str) -> Any:
         headers = {"Authorization": f"Bearer {self.token}"}
-        async with httpx.AsyncClient(base_url=self.base_url, headers=headers, timeout=20.0) as client:
-            resp = await client.post("/api/notes", json={"title": title, "content": content})
-            resp.raise_for_status()
-            return resp.json()
+        client = get_http_client(self.base_url)
+        resp = await client.post(self.base_url + "/api/notes", headers=headers, json={"title": title, "content": content}, timeout=20.0)
+        resp.raise_for_status()
+        return resp.json()
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Sequence
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.core.config import get_settings
+from app.core.redis import redis
+from app.db.replica import read_after_write
+from app.db.session import AsyncSessionLocal
+from app.models.outbox import SyncOutbox
+from app.models.task import Task
+from app.services.blinko import trash_notes
+from app.services.blinko_sync import SyncResult, push_notes, write_back_notes
+from app.services.integration_settings import IntegrationConfig, get_integration
+from app.services import today_index
+from app.utils.response_cache import acquire_lock, release_lock, response_cache
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+OP_UPSERT = "upsert"
+OP_TRASH = "trash"
+
+
+def task_push_lock_key(task_id: int) -> str:
+    # held from loading a task until its new note id is committed, so two
+    # workers never push the same task (and create two notes) at once
+    return f"outbox:push:{task_id}"
+
+
+async def _take_push_locks(task_ids: Sequence[int]) -> tuple[list[tuple[str, str]], list[int]]:
+    """Push locks of ``task_ids``: ``(key, token)`` of those taken, and the ids another worker holds."""
+    locks: list[tuple[str, str]] = []
+    busy: list[int] = []
+    for task_id in task_ids:
+        key = task_push_lock_key(task_id)
+        token = await acquire_lock(key, settings.OUTBOX_LEASE_SECONDS)
+        if token is None:
+            busy.append(task_id)
+        else:
+            locks.append((key, token))
+    return locks, busy
+
+
+async def _release_push_locks(locks: Sequence[tuple[str, str]]) -> None:
+    for key, token in locks:
+        await release_lock(key, token)
+
+
+async def _after_push(user_id: int, synced: Sequence[Task]) -> None:
+    """Refresh what caches the pushed tasks once their note ids are committed."""
+    if not synced:
+        return
+    await read_after_write.mark(user_id)
+    await response_cache.invalidate(user_id)
+    await today_index.put_tasks(redis, [t for t in synced if t.is_today])
+
+
+async def push_tasks_now(
+    user_id: int, integ: IntegrationConfig, task_ids: Sequence[int], force: bool = False,
+) -> SyncResult:
+    """Push the user's ``task_ids`` to Blinko right away (manual sync), the way the worker does.
+
+    Tasks the worker is pushing at the moment (push lock held) are reported as
+    skipped; their queued upsert covers them. Tasks are read in one short
+    session and the note ids stored in another, so no transaction is open
+    while Blinko is called. The caller must not hold one either.
+    """
+    locks, busy = await _take_push_locks(task_ids)
+    try:
+        if not locks:
+            return SyncResult(skipped=busy)
+        held = set(busy)
+        locked = [task_id for task_id in task_ids if task_id not in held]
+        async with AsyncSessionLocal() as db:
+            tasks = (
+                await db.execute(
+                    select(Task)
+                    .where(Task.id.in_(locked), Task.owner_id == user_id)
+                    .options(selectinload(Task.subtasks))
+                    .order_by(Task.id)
+                )
+            ).scalars().all()
+        result = await push_notes(integ.base_url, integ.token, tasks, force=force)
+        async with AsyncSessionLocal() as db:
+            await write_back_notes(db, tasks, result.notes)
+            await db.commit()
+    finally:
+        await _release_push_locks(locks)
+    result.skipped.extend(busy)
+    await _after_push(user_id, [t for t in tasks if t.id in result.synced])
+    return result
+
+
+async def _blinko_enabled(db: AsyncSession, user_id: int) -> bool:
+    return await get_integration(db, user_id, 'blinko') is not None
+
+
+async def enqueue_task_sync(db: AsyncSession, user_id: int, task_id: int) -> bool:
+    """Queue an upsert of the task's note; commit it together with the task change."""
+    if not await _blinko_enabled(db, user_id):
+        return False
+    db.add(SyncOutbox(op=OP_UPSERT, user_id=user_id, task_id=task_id))
+    return True
+
+
+async def enqueue_task_syncs(db: AsyncSession, user_id: int, task_ids: Sequence[int]) -> bool:
+    """``enqueue_task_sync`` for many tasks with a single INSERT (batch endpoints)."""
+    if not task_ids or not await _blinko_enabled(db, user_id):
+        return False
+    await db.execute(insert(SyncOutbox), [{"op": OP_UPSERT, "user_id": user_id, "task_id": t} for t in task_ids])
+    return True
+
+
+async def enqueue_note_trash(db: AsyncSession, user_id: int, task_id: int, note_id: str) -> bool:
+    """Queue moving a note to the Blinko recycle bin (used when its task is deleted)."""
+    if not await _blinko_enabled(db, user_id):
+        return False
+    db.add(SyncOutbox(op=OP_TRASH, user_id=user_id, task_id=task_id, note_id=note_id))
+    return True
+
+
+def backoff_delay(attempts: int) -> float:
+    delay = min(settings.OUTBOX_BACKOFF_BASE * (2 ** max(attempts - 1, 0)), settings.OUTBOX_BACKOFF_MAX)
+    # full jitter keeps retries of a failing Blinko instance from lining up
+    return random.uniform(delay / 2, delay)
+
+
+@dataclass
+class _UserBatch:
+    user_id: int
+    ops: list[Any] = field(default_factory=list)
+    done: list[int] = field(default_factory=list)
+    deferred: list[int] = field(default_factory=list)
+    failed: list[tuple[list[Any], str]] = field(default_factory=list)
+    # pushed tasks whose note id may have changed (cached lists are refreshed after commit)
+    synced: list[Task] = field(default_factory=list)
+    # task_id -> (note_id, content_hash) to store with the outcome
+    notes: dict[int, tuple[str, str]] = field(default_factory=dict)
+    # (key, token) of the task push locks held
+    locks: list[tuple[str, str]] = field(default_factory=list)
+
+
+class OutboxWorker:
+    """Drains ``SyncOutbox`` in the background.
+
+    Rows are claimed with a lease (``FOR UPDATE SKIP LOCKED``) so several
+    processes can run a worker; repeated upserts of one task within a batch
+    collapse into a single call, and failures are retried with backoff.
+    No transaction is open while Blinko is called: tasks are read in one
+    short session, and the outcome is recorded in another.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._task: asyncio.Task[None] | None = None
+        self._wakeup = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="outbox-worker")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def wake(self) -> None:
+        """Signal that new rows were committed so they are pushed without waiting for the poll."""
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                claimed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox drain failed")
+                claimed = 0
+            if claimed >= settings.OUTBOX_BATCH_SIZE:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain_once(self) -> int:
+        rows = await self._claim()
+        if not rows:
+            return 0
+        batches: dict[int, _UserBatch] = {}
+        for row in rows:
+            batches.setdefault(row.user_id, _UserBatch(row.user_id)).ops.append(row)
+        for batch in batches.values():
+            try:
+                await self._sync_user(batch)
+            except Exception as e:
+                logger.warning("Outbox sync for user %s failed: %s", batch.user_id, e)
+                batch.done, batch.deferred, batch.synced, batch.notes = [], [], [], {}
+                batch.failed = [(batch.ops, repr(e))]
+            try:
+                async with self._session_factory() as db:
+                    await write_back_notes(db, batch.synced, batch.notes)
+                    await self._finish(db, batch)
+                    await db.commit()
+            finally:
+                await _release_push_locks(batch.locks)
+            await _after_push(batch.user_id, batch.synced)
+        return len(rows)
+
+    async def _claim(self) -> Sequence[Any]:
+        now = datetime.utcnow()
+        due = (
+            select(SyncOutbox.id)
+            .where(SyncOutbox.next_attempt_at <= now)
+            .order_by(SyncOutbox.id)
+            .limit(settings.OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(SyncOutbox)
+            .where(SyncOutbox.id.in_(due))
+            .values(next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS))
+            .returning(
+                SyncOutbox.id, SyncOutbox.op, SyncOutbox.user_id,
+                SyncOutbox.task_id, SyncOutbox.note_id, SyncOutbox.attempts,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        async with self._session_factory() as db:
+            rows = (await db.execute(stmt)).all()
+            await db.commit()
+        return sorted(rows, key=lambda r: r.id)
+
+    async def _sync_user(self, batch: _UserBatch) -> None:
+        async with self._session_factory() as db:
+            integ = await get_integration(db, batch.user_id, 'blinko')
+            if integ is None:
+                # integration removed after the rows were queued: nothing to push
+                batch.done.extend(op.id for op in batch.ops)
+                return
+            trash_ops = [op for op in batch.ops if op.op == OP_TRASH]
+            trashed_tasks = {op.task_id for op in trash_ops}
+            upserts: dict[int, list[Any]] = {}
+            for op in batch.ops:
+                if op.op != OP_UPSERT:
+                    continue
+                if op.task_id is None or op.task_id in trashed_tasks:
+                    batch.done.append(op.id)
+                else:
+                    upserts.setdefault(op.task_id, []).append(op)
+            tasks = await self._lock_and_load(db, batch, upserts) if upserts else []
+
+        # Blinko calls: no session, connection or transaction held from here on
+        if trash_ops:
+            note_ids = sorted({op.note_id for op in trash_ops if op.note_id})
+            try:
+                if note_ids:
+                    await trash_notes(integ.base_url, integ.token, note_ids)
+                batch.done.extend(op.id for op in trash_ops)
+            except Exception as e:
+                batch.failed.append((trash_ops, repr(e)))
+        if not tasks:
+            return
+        result = await push_notes(integ.base_url, integ.token, tasks)
+        batch.synced = [t for t in tasks if t.id in result.synced]
+        batch.notes = result.notes
+        for task in tasks:
+            ops = upserts[task.id]
+            if task.id in result.errors:
+                batch.failed.append((ops, result.errors[task.id]))
+            else:
+                batch.done.extend(op.id for op in ops)
+
+    async def _lock_and_load(self, db: AsyncSession, batch: _UserBatch, upserts: dict[int, list[Any]]) -> Sequence[Task]:
+        """Take the push lock of each task (deferring the ones another worker holds) and load them."""
+        batch.locks, busy = await _take_push_locks(list(upserts))
+        for task_id in busy:
+            batch.deferred.extend(op.id for op in upserts[task_id])
+        held = set(busy)
+        acquired = [task_id for task_id in upserts if task_id not in held]
+        if not acquired:
+            return []
+        tasks = (
+            await db.execute(
+                select(Task).where(Task.id.in_(acquired)).options(selectinload(Task.subtasks))
+            )
+        ).scalars().all()
+        loaded = {t.id for t in tasks}
+        for task_id in acquired:
+            if task_id not in loaded:
+                batch.done.extend(op.id for op in upserts[task_id])  # task deleted meanwhile
+        return tasks
+
+    async def _finish(self, db: AsyncSession, batch: _UserBatch) -> None:
+        now = datetime.utcnow()
+        if batch.done:
+            await db.execute(delete(SyncOutbox).where(SyncOutbox.id.in_(batch.done)))
+        if batch.deferred:
+            await db.execute(
+                update(SyncOutbox)
+                .where(SyncOutbox.id.in_(batch.deferred))
+                .values(next_attempt_at=now + timedelta(seconds=1))
+                .execution_options(synchronize_session=False)
+            )
+        for ops, error in batch.failed:
+            for op in ops:
+                attempts = op.attempts + 1
+                if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    logger.error("Dropping outbox row %s (%s task=%s) after %s attempts: %s",
+                                 op.id, op.op, op.task_id, attempts, error)
+                    await db.execute(delete(SyncOutbox).where(SyncOutbox.id == op.id))
+                    continue
+                await db.execute(
+                    update(SyncOutbox)
+                    .where(SyncOutbox.id == op.id)
+                    .values(
+                        attempts=attempts,
+                        last_error=error[:2000],
+                        next_attempt_at=now + timedelta(seconds=backoff_delay(attempts)),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+
+
+outbox = OutboxWorker()
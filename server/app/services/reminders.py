@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Sequence
+
+from sqlalchemy import delete, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.models.reminder import ReminderJob
+from app.models.task import Task
+from app.utils.scheduler import DueBatch, ReminderDispatcher
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+Notify = Callable[[int, str], Awaitable[None]]
+
+
+async def schedule_reminder(db: AsyncSession, task_id: int, user_id: int, fire_at: datetime) -> None:
+    """Create or move the task's reminder (``fire_at`` is UTC naive); commit with the task change."""
+    await schedule_reminders(db, user_id, [(task_id, fire_at)])
+
+
+async def schedule_reminders(db: AsyncSession, user_id: int, jobs: Sequence[tuple[int, datetime]]) -> None:
+    """``schedule_reminder`` for many ``(task_id, fire_at)`` pairs in one upsert."""
+    if not jobs:
+        return
+    stmt = insert(ReminderJob).values([{"task_id": t, "user_id": user_id, "fire_at": f} for t, f in jobs])
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ReminderJob.task_id],
+            set_={"user_id": stmt.excluded.user_id, "fire_at": stmt.excluded.fire_at,
+                  "lease_until": None, "lease_owner": None},
+        )
+    )
+
+
+async def cancel_reminder(db: AsyncSession, task_id: int) -> None:
+    await cancel_reminders(db, [task_id])
+
+
+async def cancel_reminders(db: AsyncSession, task_ids: Sequence[int]) -> None:
+    if task_ids:
+        await db.execute(delete(ReminderJob).where(ReminderJob.task_id.in_(task_ids)))
+
+
+async def rebuild_reminders(db: AsyncSession) -> int:
+    """Recreate jobs for every future ``Task.remind_at`` (idempotent, safe to run on each worker).
+
+    Past-due jobs that were never fired are still in the table and fire on the
+    next tick; past ``remind_at`` values without a job have already fired.
+    """
+    src = select(Task.id, Task.owner_id, Task.remind_at).where(Task.remind_at > datetime.utcnow())
+    stmt = insert(ReminderJob).from_select(["task_id", "user_id", "fire_at"], src)
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ReminderJob.task_id],
+            set_={"fire_at": stmt.excluded.fire_at, "lease_until": None, "lease_owner": None},
+            where=ReminderJob.fire_at != stmt.excluded.fire_at,
+        )
+    )
+    return result.rowcount or 0
+
+
+def reminder_message(items: list[dict[str, Any]]) -> str:
+    """One ``task.reminder`` message for all of a user's due tasks."""
+    names = "、".join(i["title"] for i in items[:3])
+    message = f"提醒：{names}" if len(items) <= 3 else f"提醒：{names} 等 {len(items)} 项任务"
+    return json.dumps(
+        {"type": "task.reminder", "title": "任务提醒", "message": message, "data": {"tasks": items}},
+        ensure_ascii=False,
+    )
+
+
+def _epoch(fire_at: datetime) -> float:
+    return fire_at.replace(tzinfo=timezone.utc).timestamp()
+
+
+class ReminderWorker:
+    """Fires reminders stored in ``ReminderJob``.
+
+    Jobs due within ``REMINDER_LOOKAHEAD`` seconds are mirrored into an
+    in-process ``ReminderDispatcher`` heap, refreshed every poll interval and
+    updated directly by this process's writes, so a single sleeper wakes
+    exactly when the next reminder is due. Due jobs are then claimed with a
+    lease (``FOR UPDATE SKIP LOCKED``) so each one is fired by a single worker
+    however many processes run; a job is deleted once delivered, and a crashed
+    worker's lease simply expires.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal) -> None:
+        self._session_factory = session_factory
+        self._task: asyncio.Task[None] | None = None
+        self._notify: Notify | None = None
+        self.dispatcher = ReminderDispatcher()
+        self.owner = uuid.uuid4().hex
+        self.fired = 0
+        self.messages = 0
+
+    async def start(self, notify: Notify) -> None:
+        self._notify = notify
+        async with self._session_factory() as db:
+            rebuilt = await rebuild_reminders(db)
+            await db.commit()
+        if rebuilt:
+            logger.info("Rebuilt %s reminder jobs from task.remind_at", rebuilt)
+        self.dispatcher.start(self._fire)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="reminder-refresh")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.dispatcher.stop()
+
+    def track(self, task_id: int, user_id: int, fire_at: datetime) -> None:
+        """Mirror a committed ``schedule_reminder`` so it fires without waiting for the next refresh."""
+        when = _epoch(fire_at)
+        if when <= time.time() + settings.REMINDER_LOOKAHEAD:
+            self.dispatcher.schedule(task_id, user_id, when)
+        else:
+            self.dispatcher.cancel(task_id)
+
+    def untrack(self, task_id: int) -> None:
+        self.dispatcher.cancel(task_id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Reminder refresh failed")
+            await asyncio.sleep(settings.REMINDER_POLL_INTERVAL)
+
+    async def refresh(self) -> int:
+        """Load unleased jobs due within the lookahead window (changes made by other workers)."""
+        now = datetime.utcnow()
+        stmt = select(ReminderJob.task_id, ReminderJob.user_id, ReminderJob.fire_at).where(
+            ReminderJob.fire_at <= now + timedelta(seconds=settings.REMINDER_LOOKAHEAD),
+            or_(ReminderJob.lease_until.is_(None), ReminderJob.lease_until < now),
+        )
+        async with self._session_factory() as db:
+            rows = (await db.execute(stmt)).all()
+        for task_id, user_id, fire_at in rows:
+            self.dispatcher.schedule(task_id, user_id, _epoch(fire_at))
+        return len(rows)
+
+    async def _fire(self, batch: DueBatch) -> None:
+        # coalesce per user, then fan out at most REMINDER_FANOUT_PER_TICK users per tick
+        by_user: dict[int, list[int]] = {}
+        for task_id, user_id, _ in batch:
+            by_user.setdefault(user_id, []).append(task_id)
+        users = list(by_user)
+        step = settings.REMINDER_FANOUT_PER_TICK
+        for i in range(0, len(users), step):
+            if i:
+                await asyncio.sleep(settings.REMINDER_TICK_SECONDS)
+            await self.fire([t for u in users[i:i + step] for t in by_user[u]])
+
+    async def fire(self, task_ids: list[int]) -> int:
+        """Claim, deliver and delete the given jobs if they are (still) due; returns how many fired.
+
+        Heap entries can be stale (moved or fired by another worker), so the
+        claim re-checks ``fire_at`` and the lease in the database. Each user
+        gets a single message listing all of their due tasks.
+        """
+        now = datetime.utcnow()
+        due = (
+            select(ReminderJob.task_id)
+            .where(
+                ReminderJob.task_id.in_(task_ids),
+                ReminderJob.fire_at <= now,
+                or_(ReminderJob.lease_until.is_(None), ReminderJob.lease_until < now),
+            )
+            .with_for_update(skip_locked=True)
+        )
+        claim = (
+            update(ReminderJob)
+            .where(ReminderJob.task_id.in_(due))
+            .values(lease_until=now + timedelta(seconds=settings.REMINDER_LEASE_SECONDS), lease_owner=self.owner)
+            .returning(ReminderJob.task_id, ReminderJob.user_id, ReminderJob.fire_at)
+            .execution_options(synchronize_session=False)
+        )
+        async with self._session_factory() as db:
+            jobs = (await db.execute(claim)).all()
+            await db.commit()
+            if not jobs:
+                return 0
+            titles = dict(
+                (await db.execute(select(Task.id, Task.title).where(Task.id.in_([j.task_id for j in jobs])))).all()
+            )
+            grouped: dict[int, list[Any]] = {}
+            for job in sorted(jobs, key=lambda j: (j.fire_at, j.task_id)):
+                grouped.setdefault(job.user_id, []).append(job)
+            delivered = []
+            for user_id, user_jobs in grouped.items():
+                items = [
+                    {"id": j.task_id, "title": titles[j.task_id], "remind_at": j.fire_at.isoformat() + "Z"}
+                    for j in user_jobs if j.task_id in titles
+                ]
+                if items:
+                    try:
+                        await self._deliver(user_id, reminder_message(items))
+                    except Exception as e:
+                        # lease expiry retries them
+                        logger.warning("Reminders for user %s failed: %s", user_id, e)
+                        continue
+                    self.messages += 1
+                delivered.extend((j.task_id, j.fire_at) for j in user_jobs)
+            if delivered:
+                # a job moved to a new time while it was being fired stays scheduled
+                await db.execute(
+                    delete(ReminderJob).where(
+                        tuple_(ReminderJob.task_id, ReminderJob.fire_at).in_(delivered),
+                        ReminderJob.lease_owner == self.owner,
+                    )
+                )
+                await db.commit()
+        self.fired += len(delivered)
+        return len(delivered)
+
+    async def _deliver(self, user_id: int, message: str) -> None:
+        assert self._notify is not None
+        await self._notify(user_id, message)
+
+    def stats(self) -> dict[str, float | int | None]:
+        return {
+            "tracked": len(self.dispatcher),
+            "next_due": self.dispatcher.next_due(),
+            "fired": self.fired,
+            "messages": self.messages,
+        }
+
+
+reminders = ReminderWorker()
+metrics.register("reminders", reminders.stats)
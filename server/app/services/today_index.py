@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Iterable
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError, WatchError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import AsyncSessionLocal
+from app.models.task import Task
+from app.schemas.project import TaskOut
+from app.utils.response_cache import acquire_lock, json_serializer, release_lock, schema_columns, single_flight
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Present only once the hash holds every Today task of the user
+COMPLETE_FIELD = "_complete"
+# The joined response body, dropped by every change to the hash
+BODY_FIELD = "_body"
+_META = {COMPLETE_FIELD.encode(), BODY_FIELD.encode()}
+# Values starting with this mark a task removed from Today ("-" + version of the removal)
+TOMBSTONE = b"-"
+# Version of a deletion: sorts after every updated_at, so nothing brings the task back
+_DELETED = "~"
+
+# Compare-and-set per task on updated_at, so writes landing out of order (two
+# requests, request vs outbox) never replace a newer entry with an older one.
+# Equal versions do replace: the outbox stores note ids without touching updated_at.
+# KEYS[1]: index hash; ARGV[1]: ttl, then (field, version, value) triples where
+# value is the TaskOut JSON or "-" for a removal (kept as a tombstone).
+_PUT_LUA = f"""
+local function version(v)
+  if string.sub(v, 1, 1) == "-" then return string.sub(v, 2) end
+  return string.match(v, '"updated_at":"([^"]*)"') or ""
+end
+local written = 0
+for i = 2, #ARGV, 3 do
+  local field, ver, value = ARGV[i], ARGV[i + 1], ARGV[i + 2]
+  local current = redis.call("HGET", KEYS[1], field)
+  if not current or version(current) <= ver then
+    if value == "-" then value = "-" .. ver end
+    redis.call("HSET", KEYS[1], field, value)
+    written = written + 1
+  end
+end
+if written > 0 then
+  redis.call("HDEL", KEYS[1], "{BODY_FIELD}")
+  redis.call("EXPIRE", KEYS[1], ARGV[1])
+end
+return written
+"""
+
+_dump = json_serializer(TaskOut)
+_dump_rows = json_serializer(list[TaskOut])
+
+
+def today_index_key(user_id: int) -> str:
+    return f"today:idx:{user_id}"
+
+
+def _join(fields: dict[Any, bytes]) -> bytes:
+    items = sorted((int(k), v) for k, v in fields.items() if k not in _META and not v.startswith(TOMBSTONE))
+    return b"[" + b",".join(v for _, v in items) + b"]"
+
+
+async def read_today(r: aioredis.Redis, db: AsyncSession, user_id: int) -> bytes:
+    """Serialized ``List[TaskOut]`` of the user's Today tasks.
+
+    The index is a hash ``task id -> TaskOut JSON`` (or a tombstone for a
+    task that left Today) kept up to date by the write paths, so it is only
+    (re)built from Postgres when missing. The
+    joined list is kept in ``BODY_FIELD`` until the next change, so a read is
+    a single HGET of one bulk string. ``r`` must be the non-decoding client
+    (``get_redis_raw``): bodies are returned as the stored bytes.
+
+    ``db`` may be a replica session: it only serves reads that are not
+    stored. A rebuild reads the primary, since it is kept for ``TODAY_INDEX_TTL``.
+    """
+    key = today_index_key(user_id)
+    try:
+        body = await r.hget(key, BODY_FIELD)
+        if body is not None:
+            return body
+    except RedisError as e:
+        logger.warning("Today index read failed: %s", e)
+        return await _load_body(db, user_id)
+    # one rebuild per user at a time: coalesced in-process, serialized across workers
+    return await single_flight.do(key, lambda: _rebuild(r, db, user_id))
+
+
+async def _assemble(r: aioredis.Redis, key: str) -> bytes | None:
+    """Join a complete index and store its body; None when the hash is missing or partial.
+
+    Runs under WATCH: if a write lands in between, the body is returned but not stored.
+    """
+    body: bytes | None = None
+    async with r.pipeline(transaction=True) as pipe:
+        await pipe.watch(key)
+        cached = await pipe.hgetall(key)
+        if cached.get(COMPLETE_FIELD.encode()):
+            body = _join(cached)
+            pipe.multi()
+            pipe.hset(key, BODY_FIELD, body)
+            try:
+                await pipe.execute()
+            except WatchError:
+                pass
+    return body
+
+
+async def _rebuild(r: aioredis.Redis, db: AsyncSession, user_id: int) -> bytes:
+    key = today_index_key(user_id)
+    try:
+        body = await _assemble(r, key)
+    except RedisError as e:
+        logger.warning("Today index read failed: %s", e)
+        return await _load_body(db, user_id)
+    if body is not None:
+        return body
+    lock = f"{key}:lock"
+    token = await acquire_lock(lock)
+    if token is None:
+        deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+            try:
+                body = await r.hget(key, BODY_FIELD)
+            except RedisError:
+                break
+            if body is not None:
+                return body
+        return await _load_body(db, user_id)
+    fields: dict[str, bytes] | None = None
+    try:
+        async with r.pipeline(transaction=True) as pipe:
+            await pipe.watch(key)
+            async with AsyncSessionLocal() as primary:
+                fields = await _load(primary, user_id)
+            pipe.multi()
+            pipe.delete(key)
+            pipe.hset(key, mapping={**fields, COMPLETE_FIELD: "1", BODY_FIELD: _join(fields)})
+            pipe.expire(key, settings.TODAY_INDEX_TTL)
+            await pipe.execute()
+    except WatchError:
+        pass
+    except RedisError as e:
+        logger.warning("Today index rebuild failed: %s", e)
+    finally:
+        await release_lock(lock, token)
+    if fields is None:
+        fields = await _load(db, user_id)
+    return _join(fields)
+
+
+def _today_query(user_id: int) -> Any:
+    return select(*schema_columns(Task, TaskOut)).where(Task.is_today == True, Task.owner_id == user_id)  # noqa: E712
+
+
+async def _load(db: AsyncSession, user_id: int) -> dict[str, bytes]:
+    rows = (await db.execute(_today_query(user_id))).all()
+    return {str(row.id): _dump(row) for row in rows}
+
+
+async def _load_body(db: AsyncSession, user_id: int) -> bytes:
+    # Redis unavailable: serialize straight from the query
+    return _dump_rows((await db.execute(_today_query(user_id).order_by(Task.id))).all())
+
+
+async def put_tasks(r: aioredis.Redis, tasks: Iterable[Task]) -> None:
+    """Write committed tasks into their owners' indexes (added, updated, or removed when no longer Today).
+
+    An entry is never replaced by one with an older ``updated_at``, so a late
+    write of an earlier version of the task is dropped.
+    """
+    by_user: dict[int, list[Any]] = {}
+    for task in tasks:
+        value = _dump(task) if task.is_today else TOMBSTONE
+        by_user.setdefault(task.owner_id, []).extend((str(task.id), task.updated_at.isoformat(), value))
+    await _put(r, by_user)
+
+
+async def remove_task(r: aioredis.Redis, user_id: int, task_id: int) -> None:
+    await _put(r, {user_id: [str(task_id), _DELETED, TOMBSTONE]})
+
+
+async def _put(r: aioredis.Redis, by_user: dict[int, list[Any]]) -> None:
+    # on a missing key this leaves a hash without COMPLETE_FIELD, which reads rebuild
+    if not by_user:
+        return
+    script = r.register_script(_PUT_LUA)
+    try:
+        async with r.pipeline(transaction=False) as pipe:
+            for user_id, args in by_user.items():
+                await script(keys=[today_index_key(user_id)], args=[settings.TODAY_INDEX_TTL, *args], client=pipe)
+            await pipe.execute()
+    except RedisError as e:
+        logger.warning("Today index update failed: %s", e)
+        await drop_index(r, *by_user)
+
+
+async def drop_index(r: aioredis.Redis, *user_ids: int) -> None:
+    """Forget whole indexes (bulk deletes); the next read rebuilds them."""
+    if not user_ids:
+        return
+    try:
+        await r.delete(*(today_index_key(u) for u in user_ids))
+    except RedisError as e:
+        logger.warning("Today index drop failed: %s", e)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+
+from redis.exceptions import RedisError
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, object_session
+
+from app.core.config import get_settings
+from app.core.redis import redis
+from app.models.user import User
+from app.utils.cache import MISSING, TTLCache
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass(frozen=True, slots=True)
+class UserPrincipal:
+    """Lightweight, detached view of the authenticated user."""
+
+    id: int
+    email: str
+    is_active: bool
+    is_superuser: bool
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id, email=user.email, is_active=user.is_active,
+            is_superuser=user.is_superuser, created_at=user.created_at,
+        )
+
+
+_local: TTLCache[int, UserPrincipal] = TTLCache(settings.USER_CACHE_SIZE, settings.USER_CACHE_LOCAL_TTL)
+
+
+def user_cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def _dumps(principal: UserPrincipal) -> str:
+    data = asdict(principal)
+    data["created_at"] = principal.created_at.isoformat()
+    return json.dumps(data)
+
+
+def _loads(raw: str) -> UserPrincipal:
+    data = json.loads(raw)
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return UserPrincipal(**data)
+
+
+async def load_principal(db: AsyncSession, user_id: int) -> UserPrincipal | None:
+    """Resolve a user id through the LRU, then Redis, then ``users``."""
+    hit = _local.get(user_id)
+    if hit is not MISSING:
+        return hit  # type: ignore[return-value]
+    if settings.USER_CACHE_REDIS_ENABLED:
+        try:
+            raw = await redis.get(user_cache_key(user_id))
+        except RedisError as e:
+            logger.warning("User cache read failed: %s", e)
+            raw = None
+        if raw is not None:
+            principal = _loads(raw)
+            _local.set(user_id, principal)
+            return principal
+    user = await db.get(User, user_id)
+    if user is None:
+        return None
+    principal = UserPrincipal.from_user(user)
+    _local.set(user_id, principal)
+    if settings.USER_CACHE_REDIS_ENABLED:
+        try:
+            await redis.setex(user_cache_key(user_id), settings.USER_CACHE_REDIS_TTL, _dumps(principal))
+        except RedisError as e:
+            logger.warning("User cache write failed: %s", e)
+    return principal
+
+
+async def invalidate_user(*user_ids: int) -> None:
+    """Forget cached users; runs automatically after a commit that changed them (hooks below)."""
+    for user_id in user_ids:
+        _local.pop(user_id)
+    if settings.USER_CACHE_REDIS_ENABLED and user_ids:
+        try:
+            await redis.delete(*(user_cache_key(u) for u in user_ids))
+        except RedisError as e:
+            logger.warning("User cache invalidation failed: %s", e)
+
+
+async def invalidate_all_users() -> None:
+    """Forget every cached user (after bulk UPDATE/DELETE statements, whose rows are unknown)."""
+    _local.clear()
+    if not settings.USER_CACHE_REDIS_ENABLED:
+        return
+    try:
+        batch: list[str] = []
+        async for key in redis.scan_iter(match=user_cache_key("*"), count=500):  # type: ignore[arg-type]
+            batch.append(key)
+            if len(batch) >= 500:
+                await redis.delete(*batch)
+                batch = []
+        if batch:
+            await redis.delete(*batch)
+    except RedisError as e:
+        logger.warning("User cache invalidation failed: %s", e)
+
+
+# Changed users are collected on the session and forgotten once the transaction
+# commits: dropping them at flush time would let a concurrent request re-cache
+# the old row before the change is visible.
+_CHANGED = "user_cache.changed"
+_CHANGED_ALL = "user_cache.changed_all"
+# Invalidations in flight, referenced until done so none is dropped mid-way
+_tasks: set[asyncio.Task[None]] = set()
+
+
+def _on_user_changed(_mapper, _connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED, set()).add(target.id)
+
+
+def _on_statement(state: ORMExecuteState) -> None:
+    # update(User) / delete(User) through a session bypass the mapper events
+    if (state.is_update or state.is_delete) and any(m.class_ is User for m in state.all_mappers):
+        state.session.info[_CHANGED_ALL] = True
+
+
+def _after_commit(session: Session) -> None:
+    user_ids = session.info.pop(_CHANGED, set())
+    everyone = session.info.pop(_CHANGED_ALL, False)
+    if not user_ids and not everyone:
+        return
+    if everyone:
+        _local.clear()
+    for user_id in user_ids:
+        _local.pop(user_id)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # sync script: Redis entries expire after USER_CACHE_REDIS_TTL
+    task = loop.create_task(invalidate_all_users() if everyone else invalidate_user(*user_ids))
+    _tasks.add(task)
+    task.add_done_callback(_invalidation_done)
+
+
+def _invalidation_done(task: asyncio.Task[None]) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("User cache invalidation failed", exc_info=task.exception())
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED, None)
+    session.info.pop(_CHANGED_ALL, None)
+
+
+event.listen(User, "after_update", _on_user_changed)
+event.listen(User, "after_delete", _on_user_changed)
+event.listen(Session, "do_orm_execute", _on_statement)
+event.listen(Session, "after_commit", _after_commit)
+event.listen(Session, "after_rollback", _after_rollback)
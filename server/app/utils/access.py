@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.models.board import Board
+from app.models.project import Project
+from app.models.subtask import Subtask
+from app.models.task import Task
+from app.utils.cache import TTLCache
+
+
+settings = get_settings()
+
+# board id -> owner id, task id -> owner id (only consulted when ACCESS_CACHE_ENABLED)
+_board_owner: TTLCache[int, int] = TTLCache(settings.ACCESS_CACHE_SIZE, settings.ACCESS_CACHE_TTL)
+_task_owner: TTLCache[int, int] = TTLCache(settings.ACCESS_CACHE_SIZE, settings.ACCESS_CACHE_TTL)
+
+
+def _not_found(what: str) -> HTTPException:
+    # other users' rows are reported exactly like missing ones
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{what} not found")
+
+
+def _remember(cache: TTLCache[int, int], key: int, owner_id: int) -> None:
+    if settings.ACCESS_CACHE_ENABLED:
+        cache.set(key, owner_id)
+
+
+async def owned_project(db: AsyncSession, user_id: int, project_id: int) -> Project:
+    project = await db.scalar(select(Project).where(Project.id == project_id, Project.owner_id == user_id))
+    if project is None:
+        raise _not_found("Project")
+    return project
+
+
+async def owned_board(db: AsyncSession, user_id: int, board_id: int) -> Board:
+    """The board, checked against its project's owner in the same query."""
+    board = await db.scalar(
+        select(Board)
+        .join(Project, Project.id == Board.project_id)
+        .where(Board.id == board_id, Project.owner_id == user_id)
+    )
+    if board is None:
+        raise _not_found("Board")
+    _remember(_board_owner, board.id, user_id)
+    return board
+
+
+async def owned_task(db: AsyncSession, user_id: int, task_id: int, *options: Any) -> Task:
+    task = await db.scalar(select(Task).where(Task.id == task_id, Task.owner_id == user_id).options(*options))
+    if task is None:
+        raise _not_found("Task")
+    _remember(_task_owner, task.id, user_id)
+    return task
+
+
+async def owned_subtask(db: AsyncSession, user_id: int, subtask_id: int) -> tuple[Subtask, Task]:
+    """The subtask and its parent task, loaded and checked in one query."""
+    row = (
+        await db.execute(
+            select(Subtask, Task)
+            .join(Task, Task.id == Subtask.task_id)
+            .where(Subtask.id == subtask_id, Task.owner_id == user_id)
+        )
+    ).first()
+    if row is None:
+        raise _not_found("Subtask")
+    return row.Subtask, row.Task
+
+
+async def check_board(db: AsyncSession, user_id: int, board_id: int) -> None:
+    """Ownership only, for routes that don't need the board row itself."""
+    if settings.ACCESS_CACHE_ENABLED and _board_owner.get(board_id) == user_id:
+        return
+    owner_id = await db.scalar(
+        select(Project.owner_id).join(Board, Board.project_id == Project.id).where(Board.id == board_id)
+    )
+    if owner_id != user_id:
+        raise _not_found("Board")
+    _remember(_board_owner, board_id, user_id)
+
+
+async def check_task(db: AsyncSession, user_id: int, task_id: int) -> None:
+    if settings.ACCESS_CACHE_ENABLED and _task_owner.get(task_id) == user_id:
+        return
+    owner_id = await db.scalar(select(Task.owner_id).where(Task.id == task_id))
+    if owner_id != user_id:
+        raise _not_found("Task")
+    _remember(_task_owner, task_id, user_id)
+
+
+# Owners never change, so deletes are the only thing to forget; rows deleted by
+# another worker stay cached there until ACCESS_CACHE_TTL runs out.
+event.listen(Board, "after_delete", lambda _m, _c, target: _board_owner.pop(target.id))
+event.listen(Task, "after_delete", lambda _m, _c, target: _task_owner.pop(target.id))
@@ -1,39 +1,58 @@
 from __future__ import annotations
 
-from typing import Annotated
-from fastapi import Depends, HTTPException, status
+from typing import Annotated, AsyncGenerator
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.core.config import get_settings
-from app.db.session import get_db
-from app.models.user import User
+from app.db.replica import REPLICA_ERRORS, open_read_session, read_after_write
+from app.db.session import AsyncSessionLocal, get_replica_db
+from app.services.user_cache import UserPrincipal, load_principal
+from app.utils.security import verify_access_token
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 settings = get_settings()
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
 
 
 async def get_current_user(
+    request: Request,
     token: Annotated[str, Depends(oauth2_scheme)],
-    db: AsyncSession = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_replica_db),
+) -> UserPrincipal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        sub: str | None = payload.get("sub")
-        if sub is None:
-            raise credentials_exception
-        user_id = int(sub)
-    except (JWTError, ValueError):
+        user_id = verify_access_token(token)
+    except JWTError:
         raise credentials_exception
-    user = await db.get(User, user_id)
+    user = None
+    if not read_after_write.replica_down:
+        try:
+            user = await load_principal(db, user_id)
+        except REPLICA_ERRORS as e:
+            if not settings.DATABASE_READ_URL:
+                raise
+            read_after_write.replica_failed(e)
+    if not user and settings.DATABASE_READ_URL:
+        # registered moments ago (the replica may not have the row yet), or the replica is down
+        async with AsyncSessionLocal() as primary:
+            user = await load_principal(primary, user_id)
     if not user:
         raise credentials_exception
+    if request.method not in SAFE_METHODS:
+        await read_after_write.mark(user.id)
     return user
+
+
+async def get_read_db(current_user: UserPrincipal = Depends(get_current_user)) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only routes: the replica, or the primary if the user wrote within
+    READ_AFTER_WRITE_SECONDS or the replica can't be reached."""
+    async with await open_read_session(current_user.id) as session:
+        yield session
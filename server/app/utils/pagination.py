@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Sequence
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class ListParams:
+    """``limit`` / ``cursor`` / ``fields`` query parameters shared by the list endpoints.
+
+    Without any of them a list returns every row, as before.
+    """
+
+    def __init__(
+        self,
+        limit: int | None = Query(None, ge=1, le=settings.LIST_MAX_LIMIT, description="Page size; enables cursor pagination"),
+        cursor: str | None = Query(None, description=f"Opaque cursor from the previous page's {NEXT_CURSOR_HEADER} header"),
+        fields: str | None = Query(None, description="Comma-separated fields to return (id is always included)"),
+    ) -> None:
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = fields
+
+    @property
+    def plain(self) -> bool:
+        """Full, unprojected list (the only shape the response cache stores)."""
+        return self.limit is None and self.cursor is None and self.fields is None
+
+
+@dataclass
+class Page:
+    """Rows of one list response, serialized with ``schema`` (the projected item model)."""
+
+    items: Sequence[Any]
+    schema: type[BaseModel]
+    next_cursor: str | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.next_cursor:
+            self.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+
+    def body(self) -> bytes:
+        adapter = _list_adapter(self.schema)
+        return adapter.dump_json(adapter.validate_python(self.items, from_attributes=True))
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[schema])  # type: ignore[valid-type]
+
+
+@lru_cache(maxsize=256)
+def _projection(schema: type[BaseModel], names: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(  # type: ignore[call-overload]
+        schema.__name__,
+        __config__=ConfigDict(from_attributes=True),
+        **{n: (schema.model_fields[n].annotation, schema.model_fields[n]) for n in names},
+    )
+
+
+def _project(schema: type[BaseModel], fields: str | None) -> tuple[type[BaseModel], list[str]]:
+    if fields is None:
+        return schema, list(schema.model_fields)
+    names = ["id"] + [f for f in dict.fromkeys(x.strip() for x in fields.split(",")) if f and f != "id"]
+    unknown = [n for n in names if n not in schema.model_fields]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown fields: {', '.join(unknown)}")
+    return _projection(schema, tuple(names)), names
+
+
+async def fetch_page(db: AsyncSession, entity: Any, schema: type[BaseModel], params: ListParams, *criteria: Any) -> Page:
+    """Select ``schema``'s (or the requested) columns of ``entity`` in ``(created_at, id)`` order.
+
+    With ``limit`` this is a keyset page: rows after the cursor, plus the
+    cursor of the last row when more follow. Only the projected columns are
+    read, so large ``Text`` columns stay in the database unless asked for.
+    """
+    item_schema, names = _project(schema, params.fields)
+    table = entity.__table__
+    order = [table.c.created_at, table.c.id]
+    columns = [table.c[n] for n in names] + [c for c in order if c.name not in names]
+    stmt = select(*columns).where(*criteria).order_by(*order)
+    if params.cursor is not None:
+        stmt = stmt.where(tuple_(*order) > tuple_(*decode_cursor(params.cursor)))
+    if params.limit is not None:
+        stmt = stmt.limit(params.limit + 1)
+    rows = (await db.execute(stmt)).all()
+    next_cursor = None
+    if params.limit is not None and len(rows) > params.limit:
+        rows = rows[: params.limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return Page(rows, item_schema, next_cursor)
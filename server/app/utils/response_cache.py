@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import random
+import time
+import uuid
+from typing import Any, Awaitable, Callable, TypeVar
+
+from fastapi import Request, Response, status
+from pydantic import BaseModel, TypeAdapter
+from redis.exceptions import RedisError, WatchError
+
+from app.core.config import get_settings
+from app.core.metrics import metrics
+from app.core.redis import redis, redis_raw
+from app.utils.pagination import Page
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one execution (per process).
+
+    ``fn`` runs in the first caller's task (it may use that request's
+    session). If that caller is cancelled, e.g. its client disconnected, the
+    waiters don't fail with it: one of them runs ``fn`` again.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Future[Any]] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        while (fut := self._calls.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(fut)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not fut.cancelled() or (task is not None and task.cancelling()):
+                    raise  # this caller was cancelled, not the one running fn
+        fut = asyncio.get_running_loop().create_future()
+        # waiters may be gone by the time it fails; don't warn about an unretrieved exception
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = fut
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is fut:
+                self._calls.pop(key)
+
+
+single_flight = SingleFlight()
+
+
+async def acquire_lock(key: str, ttl: float | None = None) -> str | None:
+    """Best-effort cross-worker lock; returns the token to release it with, or None if held elsewhere."""
+    token = uuid.uuid4().hex
+    try:
+        ok = await redis.set(key, token, nx=True, px=int((ttl or settings.RESPONSE_CACHE_LOCK_TTL) * 1000))
+    except RedisError as e:
+        logger.warning("Cache lock %s unavailable: %s", key, e)
+        return token  # no Redis: behave as if we own it
+    return token if ok else None
+
+
+async def release_lock(key: str, token: str) -> None:
+    try:
+        if await redis.get(key) == token:
+            await redis.delete(key)
+    except RedisError:
+        pass
+
+
+def response_cache_key(user_id: int) -> str:
+    return f"rc:user:{user_id}"
+
+
+def _generation_key(key: str) -> str:
+    # bumped by every invalidation; fills WATCH it (a DEL of a hash that doesn't exist yet wouldn't trip WATCH)
+    return f"{key}:gen"
+
+
+class ResponseCache:
+    """Per-user cache of serialized list responses with stale-while-revalidate.
+
+    All of a user's entries live in one hash (``{field}`` -> JSON body,
+    ``{field}:t`` -> fresh-until epoch), so a write invalidates them with a
+    single DEL (plus a generation bump that aborts fills racing it). Bodies go through the non-decoding client and are returned as
+    the stored bytes. A stale entry is still served while exactly one caller
+    (the one that takes the Redis lock) recomputes it; concurrent misses are
+    coalesced in-process and wait on that lock across workers.
+    """
+
+    def __init__(self) -> None:
+        self.counters: dict[str, dict[str, int]] = {}
+
+    def _count(self, scope: str, name: str) -> None:
+        if settings.RESPONSE_CACHE_STATS:
+            c = self.counters.setdefault(scope, {"hits": 0, "stale": 0, "misses": 0, "errors": 0})
+            c[name] += 1
+
+    @staticmethod
+    def _fresh_ttl(ttl: float | None) -> float:
+        base = settings.RESPONSE_CACHE_TTL if ttl is None else ttl
+        jitter = settings.RESPONSE_CACHE_TTL_JITTER
+        # spread expiries so entries filled together don't all expire together
+        return base * random.uniform(1 - jitter, 1 + jitter)
+
+    async def get_or_compute(
+        self, scope: str, user_id: int, field: str, compute: Callable[[], Awaitable[bytes]], ttl: float | None = None,
+    ) -> bytes:
+        key = response_cache_key(user_id)
+        try:
+            body, fresh_until = await redis_raw.hmget(key, field, f"{field}:t")
+        except RedisError as e:
+            logger.warning("Response cache read failed: %s", e)
+            self._count(scope, "errors")
+            return await compute()
+        now = time.time()
+        if body is not None:
+            fresh_until = float(fresh_until or 0)
+            if now < fresh_until:
+                self._count(scope, "hits")
+                return body
+            if now < fresh_until + settings.RESPONSE_CACHE_STALE_TTL:
+                self._count(scope, "stale")
+                lock = f"{key}:{field}:lock"
+                token = await acquire_lock(lock)
+                if token is None:
+                    return body  # someone else is revalidating
+                try:
+                    return await self._revalidate(key, field, compute, ttl)
+                finally:
+                    await release_lock(lock, token)
+        self._count(scope, "misses")
+        return await single_flight.do(f"{key}:{field}", lambda: self._fill(key, field, compute, ttl))
+
+    async def _revalidate(
+        self, key: str, field: str, compute: Callable[[], Awaitable[bytes]], ttl: float | None,
+    ) -> bytes:
+        # the previous lock holder may have refreshed it since our read
+        try:
+            body, fresh_until = await redis_raw.hmget(key, field, f"{field}:t")
+            if body is not None and time.time() < float(fresh_until or 0):
+                return body
+        except RedisError:
+            pass
+        return await self._compute_and_store(key, field, compute, ttl)
+
+    async def _fill(self, key: str, field: str, compute: Callable[[], Awaitable[bytes]], ttl: float | None) -> bytes:
+        lock = f"{key}:{field}:lock"
+        token = await acquire_lock(lock)
+        if token is None:
+            # another worker is computing it: wait for its result, up to RESPONSE_CACHE_LOCK_WAIT
+            deadline = time.monotonic() + settings.RESPONSE_CACHE_LOCK_WAIT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+                try:
+                    body = await redis_raw.hget(key, field)
+                except RedisError:
+                    break
+                if body is not None:
+                    return body
+            return await compute()
+        try:
+            return await self._compute_and_store(key, field, compute, ttl)
+        finally:
+            await release_lock(lock, token)
+
+    async def _compute_and_store(
+        self, key: str, field: str, compute: Callable[[], Awaitable[bytes]], ttl: float | None,
+    ) -> bytes:
+        # WATCH the generation while computing: an invalidation in between means
+        # the result may predate the write, so it is returned but not stored
+        body: bytes | None = None
+        try:
+            async with redis_raw.pipeline(transaction=True) as pipe:
+                await pipe.watch(_generation_key(key))
+                body = await compute()
+                fresh = self._fresh_ttl(ttl)
+                pipe.multi()
+                pipe.hset(key, mapping={field: body, f"{field}:t": repr(time.time() + fresh)})
+                pipe.expire(key, int(fresh + settings.RESPONSE_CACHE_STALE_TTL) + 1)
+                await pipe.execute()
+        except WatchError:
+            pass
+        except RedisError as e:
+            logger.warning("Response cache write failed: %s", e)
+        if body is None:
+            body = await compute()
+        return body
+
+    async def invalidate(self, *user_ids: int) -> None:
+        if not user_ids:
+            return
+        ttl = int(settings.RESPONSE_CACHE_TTL * (1 + settings.RESPONSE_CACHE_TTL_JITTER) + settings.RESPONSE_CACHE_STALE_TTL) + 1
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                for user_id in user_ids:
+                    key = response_cache_key(user_id)
+                    pipe.incr(_generation_key(key))
+                    pipe.expire(_generation_key(key), ttl)
+                    pipe.delete(key)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+
+    def stats(self) -> dict[str, Any]:
+        return {"scopes": self.counters, "coalesced": single_flight.coalesced}
+
+
+response_cache = ResponseCache()
+metrics.register("response_cache", response_cache.stats)
+
+
+def schema_columns(entity: Any, schema: type[BaseModel]) -> list[Any]:
+    """Columns backing ``schema``'s fields; selecting them skips ORM instances for read-only lists."""
+    return [entity.__table__.c[name] for name in schema.model_fields]
+
+
+def json_serializer(model: Any) -> Callable[[Any], bytes]:
+    """Serialize ORM objects or rows straight to JSON bytes with ``model``'s schema (no jsonable_encoder).
+
+    A ``Page`` is serialized with its own (possibly projected) item schema.
+    """
+    adapter = TypeAdapter(model)
+
+    def dump(value: Any) -> bytes:
+        if isinstance(value, Page):
+            return value.body()
+        return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+    return dump
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def conditional_response(request: Request, body: bytes) -> Response:
+    """JSON response with a strong ETag; 304 without a body when ``If-None-Match`` matches."""
+    tag = etag_for(body)
+    headers = {"ETag": tag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if tag in candidates or "*" in candidates:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _render(result: Any, dump: Callable[[Any], bytes]) -> Response:
+    headers = result.headers if isinstance(result, Page) else None
+    return Response(dump(result), media_type="application/json", headers=headers)
+
+
+def _wrap(fn: Callable[..., Awaitable[Any]], wrapper: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """``update_wrapper`` plus the handler's signature with its annotations already evaluated.
+
+    Route modules use ``from __future__ import annotations`` and older FastAPI
+    releases resolve string annotations against the *wrapper's* globals, which
+    would turn ``ListParams``, ``TaskBatchCreate`` etc. into unresolved
+    ``ForwardRef``s (query params instead of dependencies / bodies).
+    """
+    functools.update_wrapper(wrapper, fn)
+    wrapper.__signature__ = inspect.signature(fn, eval_str=True)  # type: ignore[attr-defined]
+    return wrapper
+
+
+def json_response(model: Any) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Return a handler's result as a ready JSON ``Response`` instead of going through ``response_model``.
+
+    Keep ``response_model=model`` on the route for the OpenAPI schema.
+    """
+    dump = json_serializer(model)
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return _render(await fn(*args, **kwargs), dump)
+
+        return _wrap(fn, wrapper)
+
+    return decorator
+
+
+def cached_response(
+    scope: str,
+    model: Any,
+    key: Callable[[dict[str, Any]], tuple[int, str] | None],
+    ttl: float | None = None,
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Cache a GET handler's JSON body per user.
+
+    ``key`` maps the handler's keyword arguments to ``(user_id, field)``, or
+    None to bypass the cache for this request (e.g. a paginated one); the
+    result is serialized with ``model`` (the route's ``response_model``).
+    Errors raised by the handler (404s, ...) are never cached. Any write by
+    the user must call ``response_cache.invalidate(user_id)``.
+    """
+    dump = json_serializer(model)
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            cache_key = key(kwargs) if settings.RESPONSE_CACHE_ENABLED else None
+            if cache_key is None:
+                return _render(await fn(*args, **kwargs), dump)
+            user_id, field = cache_key
+
+            async def compute() -> bytes:
+                return dump(await fn(*args, **kwargs))
+
+            body = await response_cache.get_or_compute(scope, user_id, f"{scope}:{field}", compute, ttl)
+            return Response(body, media_type="application/json")
+
+        return _wrap(fn, wrapper)
+
+    return decorator
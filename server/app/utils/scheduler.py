@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-from datetime import datetime
+from array import array
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from typing import Callable, Awaitable
+from typing import Callable, Awaitable, Dict, List, Tuple
 from zoneinfo import ZoneInfo
 from app.core.config import get_settings
 import asyncio
+import logging
+import time
 
 
+logger = logging.getLogger(__name__)
 scheduler: AsyncIOScheduler | None = None
 
 
@@ -27,21 +30,150 @@ def start_scheduler() -> AsyncIOScheduler:
 
 def add_daily_job(func, hour: int = 21, minute: int = 0):
     sch = start_scheduler()
-    sch.add_job(func, "cron", hour=hour, minute=minute, id=f"daily-{hour}-{minute}")
+    # replace: every app started in this process registers the same job
+    sch.add_job(func, "cron", hour=hour, minute=minute, id=f"daily-{hour}-{minute}", replace_existing=True)
 
 
-# util to run async callback from scheduler
-def schedule_datetime(job_id: str, when: datetime, coro_factory: Callable[[], Awaitable[None]]):
-    sch = start_scheduler()
-    # Define an async runner so AsyncIOScheduler can await it
-    async def _runner():
-        await coro_factory()
-    # normalize to timezone-aware datetime in configured TZ
-    settings_tz = sch.timezone  # already ZoneInfo
-    if when.tzinfo is None:
-        # interpret naive datetime as settings timezone
-        when = when.replace(tzinfo=settings_tz)
-    else:
-        # convert to scheduler timezone
-        when = when.astimezone(settings_tz)
-    sch.add_job(_runner, 'date', run_date=when, id=job_id, replace_existing=True)
+DueBatch = List[Tuple[int, int, float]]
+
+
+class ReminderDispatcher:
+    """Indexed binary min-heap of reminders with a single sleeper task.
+
+    Entries are kept as parallel ``array`` columns (fire time in epoch seconds,
+    task id, user id) plus a task id -> slot index, so an entry costs a few
+    dozen bytes and ``schedule``/``cancel`` of an existing task are O(log n).
+    The sleeper waits for the earliest entry and hands every due entry to
+    ``on_due`` in one batch.
+    """
+
+    def __init__(self) -> None:
+        self._ts = array("d")
+        self._task = array("q")
+        self._user = array("q")
+        self._pos: Dict[int, int] = {}
+        self._on_due: Callable[[DueBatch], Awaitable[None]] | None = None
+        self._sleeper: asyncio.Task[None] | None = None
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._task)
+
+    def __contains__(self, task_id: int) -> bool:
+        return task_id in self._pos
+
+    def start(self, on_due: Callable[[DueBatch], Awaitable[None]]) -> None:
+        self._on_due = on_due
+        if self._sleeper is None or self._sleeper.done():
+            self._sleeper = asyncio.create_task(self._sleep_loop(), name="reminder-dispatcher")
+
+    async def stop(self) -> None:
+        task, self._sleeper = self._sleeper, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def next_due(self) -> float | None:
+        return self._ts[0] if self._ts else None
+
+    def schedule(self, task_id: int, user_id: int, when: float) -> None:
+        """Add or move the reminder of ``task_id`` to ``when`` (epoch seconds)."""
+        i = self._pos.get(task_id)
+        if i is None:
+            i = len(self._ts)
+            self._ts.append(when)
+            self._task.append(task_id)
+            self._user.append(user_id)
+            self._pos[task_id] = i
+            self._up(i)
+        else:
+            old = self._ts[i]
+            self._ts[i] = when
+            self._user[i] = user_id
+            if when < old:
+                self._up(i)
+            else:
+                self._down(i)
+        if self._pos[task_id] == 0:
+            # new earliest entry: the sleeper has to shorten its wait
+            self._changed.set()
+
+    def cancel(self, task_id: int) -> bool:
+        i = self._pos.pop(task_id, None)
+        if i is None:
+            return False
+        # refill the hole with the last entry, which may need to move either way
+        entry = (self._ts.pop(), self._task.pop(), self._user.pop())
+        if i < len(self._ts):
+            self._down(i, entry)
+            if self._pos[entry[1]] == i:
+                self._up(i)
+        return True
+
+    def pop_due(self, now: float, limit: int | None = None) -> DueBatch:
+        due: DueBatch = []
+        ts, task, user, pos = self._ts, self._task, self._user, self._pos
+        while ts and ts[0] <= now and (limit is None or len(due) < limit):
+            due.append((task[0], user[0], ts[0]))
+            del pos[task[0]]
+            entry = (ts.pop(), task.pop(), user.pop())
+            if ts:
+                self._down(0, entry)
+        return due
+
+    async def _sleep_loop(self) -> None:
+        assert self._on_due is not None
+        while True:
+            self._changed.clear()
+            top = self.next_due()
+            delay = None if top is None else top - time.time()
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            batch = self.pop_due(time.time())
+            try:
+                await self._on_due(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Reminder dispatch failed for %s entries", len(batch))
+
+    # heap internals: sift with a hole, writing the moving entry once at its final slot
+    def _up(self, i: int) -> None:
+        ts, task, user, pos = self._ts, self._task, self._user, self._pos
+        when, tid, uid = ts[i], task[i], user[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if ts[parent] <= when:
+                break
+            ts[i], task[i], user[i] = ts[parent], task[parent], user[parent]
+            pos[task[i]] = i
+            i = parent
+        ts[i], task[i], user[i] = when, tid, uid
+        pos[tid] = i
+
+    def _down(self, i: int, entry: Tuple[float, int, int] | None = None) -> None:
+        """Sift the entry at ``i`` (or ``entry``, placed into the hole at ``i``) down."""
+        ts, task, user, pos = self._ts, self._task, self._user, self._pos
+        when, tid, uid = entry if entry is not None else (ts[i], task[i], user[i])
+        n = len(ts)
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and ts[child + 1] < ts[child]:
+                child += 1
+            if when <= ts[child]:
+                break
+            ts[i], task[i], user[i] = ts[child], task[child], user[child]
+            pos[task[i]] = i
+            i = child
+        ts[i], task[i], user[i] = when, tid, uid
+        pos[tid] = i
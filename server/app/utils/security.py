@@ -1,10 +1,17 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional, TypeVar
 
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import get_settings
+from app.core.metrics import TimingStats, metrics
+from app.utils.cache import MISSING, TTLCache
+
+T = TypeVar("T")
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -19,6 +26,64 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so hashing never blocks the event loop."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self.wait_time = TimingStats()
+        self.run_time = TimingStats()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        enqueued = time.perf_counter()
+
+        def _job() -> tuple[T, float, float]:
+            started = time.perf_counter()
+            result = fn(*args)
+            return result, started, time.perf_counter()
+
+        self._in_flight += 1
+        try:
+            result, started, finished = await loop.run_in_executor(self._get_executor(), _job)
+        finally:
+            self._in_flight -= 1
+        self.wait_time.observe(started - enqueued)
+        self.run_time.observe(finished - started)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_depth": max(self._in_flight - self.workers, 0),
+            "wait": self.wait_time.snapshot(),
+            "run": self.run_time.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS)
+metrics.register("password_hashing", password_hasher.stats)
+
+
 def create_access_token(subject: str | int, expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta is None:
         expires_delta = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -26,3 +91,43 @@ def create_access_token(subject: str | int, expires_delta: Optional[timedelta] =
     to_encode: dict[str, Any] = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
+
+
+class TokenVerifier:
+    """Verifies access tokens, remembering ``token -> (sub, exp)`` until the token expires.
+
+    Repeat requests with the same bearer token skip the signature check and
+    claim parsing. Entries never outlive the ``exp`` claim.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._cache: TTLCache[str, tuple[int, float]] = TTLCache(maxsize, ttl=0)
+
+    def verify(self, token: str) -> int:
+        """Return the user id (``sub``) of a valid token or raise ``JWTError``."""
+        hit = self._cache.get(token)
+        now = time.time()
+        if hit is not MISSING:
+            sub, exp = hit  # type: ignore[misc]
+            if exp > now:
+                return sub
+            self._cache.pop(token)
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        try:
+            sub = int(payload["sub"])
+        except (KeyError, TypeError, ValueError):
+            raise JWTError("Invalid subject")
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)) and exp > now:
+            self._cache.set(token, (sub, float(exp)), ttl=exp - now)
+        return sub
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+token_verifier = TokenVerifier(settings.TOKEN_CACHE_SIZE)
+
+
+def verify_access_token(token: str) -> int:
+    return token_verifier.verify(token)
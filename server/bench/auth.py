@@ -0,0 +1,52 @@
+"""Micro-benchmark of the auth dependency (``get_current_user``) with and without the token cache.
+
+The user principal is pre-cached in process, so the numbers isolate bearer-token
+verification; no database or Redis is touched. Run from ``server/``::
+
+    python -m bench.auth            # 50k calls per mode
+    python -m bench.auth -n 200000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+
+from starlette.requests import Request  # noqa: E402
+
+from app.services import user_cache  # noqa: E402
+from app.services.user_cache import UserPrincipal  # noqa: E402
+from app.utils.deps import get_current_user  # noqa: E402
+from app.utils.security import create_access_token, token_verifier  # noqa: E402
+
+USER_ID = 1
+
+
+async def run(n: int, cached: bool) -> float:
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+    token = create_access_token(USER_ID)
+    started = time.perf_counter()
+    for _ in range(n):
+        if not cached:
+            token_verifier.clear()
+        await get_current_user(request, token, db=None)
+    return n / (time.perf_counter() - started)
+
+
+async def main(n: int) -> None:
+    principal = UserPrincipal(USER_ID, "bench@example.com", True, False, datetime.now(timezone.utc))
+    user_cache._local.set(USER_ID, principal, ttl=3600)
+    for cached in (False, True):
+        await run(min(n, 2000), cached)  # warm up
+        rate = await run(n, cached)
+        print(f"{'token cache' if cached else 'jwt.decode every call':<24}{rate:>12,.0f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=50_000, help="calls per mode")
+    asyncio.run(main(parser.parse_args().n))
@@ -0,0 +1,65 @@
+"""Helpers shared by the benchmarks that drive the app in process.
+
+These need the configured ``DATABASE_URL`` (PostgreSQL; tables are created by
+the app lifespan) and ``REDIS_URL``. Use a scratch database: benchmark users
+and their rows are left behind.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import httpx
+
+
+@asynccontextmanager
+async def app_client() -> AsyncIterator[httpx.AsyncClient]:
+    """The app with its lifespan running, behind an in-process HTTP client."""
+    from app.db.session import engine, read_engine
+    from app.main import app
+
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                yield client
+    finally:
+        # close pooled connections while the loop is still running
+        await engine.dispose()
+        await read_engine.dispose()
+
+
+async def register(client: httpx.AsyncClient) -> dict[str, str]:
+    """Register a fresh user; returns its auth headers."""
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    r = await client.post("/auth/register", json={"email": email, "password": "bench"})
+    r.raise_for_status()
+    r = await client.post("/auth/login", data={"username": email, "password": "bench"})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def create_board(client: httpx.AsyncClient, headers: dict[str, str]) -> dict[str, Any]:
+    p = (await client.post("/projects/", json={"name": "bench"}, headers=headers)).json()
+    r = await client.post(f"/projects/{p['id']}/boards", json={"name": "bench", "project_id": p["id"]}, headers=headers)
+    r.raise_for_status()
+    return r.json()
+
+
+async def throughput(call: Callable[[], Awaitable[Any]], seconds: float, concurrency: int) -> float:
+    """Calls per second of ``call`` run back to back by ``concurrency`` workers for ``seconds``."""
+    done = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        nonlocal done
+        while time.perf_counter() < deadline:
+            await call()
+            done += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / (time.perf_counter() - started)
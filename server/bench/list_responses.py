@@ -0,0 +1,114 @@
+"""Responses per second of the list endpoints on 1,000-item lists, with the response cache off and on.
+
+Also times serializing the same 1,000 tasks the old way (``model_validate`` ->
+``jsonable_encoder`` -> ``json.dumps``, and the old cache hit that decoded
+and re-validated the stored JSON) against ``json_serializer``.
+Needs ``DATABASE_URL``/``REDIS_URL`` (see ``bench/common.py``). Run from ``server/``::
+
+    python -m bench.list_responses
+    python -m bench.list_responses --seconds 10 --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert, select
+
+from app.core.config import get_settings
+from app.schemas.project import TaskOut
+from app.utils.response_cache import json_serializer
+from bench.common import app_client, create_board, register, throughput
+
+N = 1000
+settings = get_settings()
+
+
+async def seed(client, headers) -> tuple[int, int]:
+    """One board with N Today tasks, the first of which has N subtasks; returns (board id, task id)."""
+    from app.db.session import AsyncSessionLocal
+    from app.models.subtask import Subtask
+
+    board = await create_board(client, headers)
+    url = f"/projects/boards/{board['id']}/tasks:batch"
+    task_ids: list[int] = []
+    for start in range(0, N, 500):
+        items = [
+            {"title": f"task {i}", "description": f"some description text {i}", "is_today": True, "board_id": board["id"]}
+            for i in range(start, min(start + 500, N))
+        ]
+        r = await client.post(url, json={"items": items}, headers=headers)
+        r.raise_for_status()
+        task_ids += [t["id"] for t in r.json()]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Subtask), [{"title": f"sub {i}", "done": i % 2 == 0, "task_id": task_ids[0]} for i in range(N)])
+        await db.commit()
+    return board["id"], task_ids[0]
+
+
+def per_call_ms(fn: Callable[[], Any], repeat: int = 20) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+async def serialization(board_id: int) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.models.task import Task
+
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(Task).where(Task.board_id == board_id))).scalars().all()
+    dump = json_serializer(List[TaskOut])
+
+    def old_serialize() -> bytes:
+        return json.dumps(jsonable_encoder([TaskOut.model_validate(t) for t in rows])).encode()
+
+    stored = old_serialize()
+
+    def old_hit() -> bytes:
+        return json.dumps(jsonable_encoder([TaskOut.model_validate(t) for t in json.loads(stored)])).encode()
+
+    print(f"\nserialize {len(rows):,} tasks")
+    for label, fn in (
+        ("model_validate + jsonable_encoder + dumps", old_serialize),
+        ("old cache hit: loads + validate + encode", old_hit),
+        ("json_serializer (TypeAdapter.dump_json)", lambda: dump(rows)),
+    ):
+        print(f"  {label:<44}{per_call_ms(fn):>8.2f} ms")
+
+
+async def main(seconds: float, concurrency: int) -> None:
+    async with app_client() as client:
+        headers = await register(client)
+        board_id, task_id = await seed(client, headers)
+
+        async def get(url: str) -> None:
+            r = await client.get(url, headers=headers)
+            r.raise_for_status()
+
+        tasks = f"/projects/boards/{board_id}/tasks"
+        print(f"{format(N, ',')}-item lists, {concurrency} concurrent requests")
+        for label, url, cache in (
+            ("board tasks, response cache off", tasks, False),
+            ("board tasks, response cache hit", tasks, True),
+            ("subtasks (serialized, not cached)", f"/projects/tasks/{task_id}/subtasks", True),
+            ("today (Redis index)", "/projects/today", True),
+        ):
+            settings.RESPONSE_CACHE_ENABLED = cache
+            await get(url)  # warm up (and fill the cache)
+            print(f"  {label:<44}{await throughput(lambda: get(url), seconds, concurrency):>8,.0f} req/s")
+        await serialization(board_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=4.0, help="duration of each measurement")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent requests")
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.concurrency))
@@ -0,0 +1,95 @@
+"""Latency of ``GET /users/me`` while ``/auth/login`` bursts are being hashed, bcrypt inline versus on the thread pool.
+
+Each measurement times ``/users/me`` back to back from ``--probes`` clients
+while ``--logins`` concurrent logins run again and again. Run inline, every
+bcrypt round blocks the event loop and the probes queue up behind it.
+Needs ``DATABASE_URL``/``REDIS_URL`` (see ``bench/common.py``). Run from ``server/``::
+
+    python -m bench.passwords
+    python -m bench.passwords --seconds 10 --logins 32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.utils.security import get_password_hash, password_hasher, verify_password
+from bench.common import app_client, register
+
+
+async def inline_hash(password: str) -> str:
+    return get_password_hash(password)
+
+
+async def inline_verify(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    """(p50, p99) in milliseconds."""
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return cuts[49] * 1000, cuts[98] * 1000
+
+
+async def measure(client: httpx.AsyncClient, headers: dict[str, str], email: str, seconds: float, logins: int, probes: int) -> tuple[float, float, float]:
+    """(p50 ms, p99 ms, logins/s)."""
+    latencies: list[float] = []
+    logged_in = 0
+    deadline = time.perf_counter() + seconds
+
+    async def probe() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            r = await client.get("/users/me", headers=headers)
+            latencies.append(time.perf_counter() - started)
+            r.raise_for_status()
+
+    async def login() -> None:
+        nonlocal logged_in
+        r = await client.post("/auth/login", data={"username": email, "password": "bench"})
+        r.raise_for_status()
+        logged_in += 1
+
+    async def bursts() -> None:
+        while time.perf_counter() < deadline:
+            await asyncio.gather(*(login() for _ in range(logins)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(probe() for _ in range(probes)), *([bursts()] if logins else []))
+    elapsed = time.perf_counter() - started
+    p50, p99 = percentiles(latencies)
+    return p50, p99, logged_in / elapsed
+
+
+async def main(seconds: float, logins: int, probes: int) -> None:
+    async with app_client() as client:
+        headers = await register(client)
+        email = (await client.get("/users/me", headers=headers)).json()["email"]
+
+        print(f"GET /users/me from {probes} clients, bursts of {logins} logins, {password_hasher.workers} hash workers")
+        print(f"  {'':<30}{'p50 ms':>9}{'p99 ms':>9}{'logins/s':>10}")
+        for label, n, inline in (
+            ("no logins", 0, False),
+            ("bcrypt inline", logins, True),
+            ("PasswordHasher thread pool", logins, False),
+        ):
+            if inline:
+                password_hasher.hash, password_hasher.verify = inline_hash, inline_verify
+            else:
+                password_hasher.__dict__.pop("hash", None)
+                password_hasher.__dict__.pop("verify", None)
+            p50, p99, rate = await measure(client, headers, email, seconds, n, probes)
+            print(f"  {label:<30}{p50:>9.1f}{p99:>9.1f}{rate:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each measurement")
+    parser.add_argument("--logins", type=int, default=16, help="concurrent logins per burst")
+    parser.add_argument("--probes", type=int, default=4, help="concurrent /users/me clients")
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.logins, args.probes))
@@ -0,0 +1,125 @@
+"""Benchmark of ``ReminderDispatcher``: schedule, reschedule, cancel and fire N reminders.
+
+Pure in-process; no database or Redis is touched. Run from ``server/``::
+
+    python -m bench.reminders                  # 1M reminders
+    python -m bench.reminders -n 100000 --apscheduler
+        # also time one APScheduler ``date`` job per reminder (the previous scheme)
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+
+from app.utils.scheduler import DueBatch, ReminderDispatcher  # noqa: E402
+
+USERS = 5000
+DAY = 86400.0
+
+
+@contextmanager
+def timed(label: str, n: int) -> Iterator[None]:
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28}{n:>10,}{elapsed:>9.2f}s{n / elapsed:>14,.0f}/s")
+
+
+def bench_dispatcher(n: int) -> None:
+    rng = random.Random(1)
+    base = time.time() + 3600
+    d = ReminderDispatcher()
+    with timed("schedule", n):
+        for i in range(n):
+            d.schedule(i, i % USERS, base + rng.random() * DAY)
+    with timed("reschedule", n):
+        for i in range(n):
+            d.schedule(i, i % USERS, base + rng.random() * DAY)
+    with timed("cancel (every 10th)", n // 10):
+        for i in range(0, n, 10):
+            d.cancel(i)
+    remaining = len(d)
+    with timed("fire", remaining):
+        fired = d.pop_due(base + 2 * DAY)
+    assert len(fired) == remaining and all(a[2] <= b[2] for a, b in zip(fired, fired[1:]))
+
+    tracemalloc.start()
+    d = ReminderDispatcher()
+    for i in range(n):
+        d.schedule(i, i % USERS, base + i)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"memory: {size / 1e6:.0f} MB for {n:,} reminders ({size / n:.0f} B each)")
+
+
+async def bench_sleeper(n: int) -> None:
+    """Fire ``n`` reminders due within the next second through the sleeper task; report lateness."""
+    d = ReminderDispatcher()
+    lateness: list[float] = []
+
+    async def on_due(batch: DueBatch) -> None:
+        now = time.time()
+        lateness.extend(now - when for _, _, when in batch)
+
+    d.start(on_due)
+    rng = random.Random(2)
+    start = time.time() + 0.5
+    for i in range(n):
+        d.schedule(i, i % USERS, start + rng.random())
+    while len(lateness) < n and time.time() < start + 5:
+        await asyncio.sleep(0.05)
+    await d.stop()
+    lateness.sort()
+    p50, p99 = lateness[len(lateness) // 2], lateness[int(len(lateness) * 0.99)]
+    print(f"sleeper fired {len(lateness):,}/{n:,}; lateness p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms")
+
+
+async def bench_apscheduler(n: int) -> None:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    async def remind() -> None:
+        pass
+
+    rng = random.Random(1)
+    s = AsyncIOScheduler(timezone=timezone.utc)
+    s.start()
+    base = datetime.now(timezone.utc) + timedelta(hours=1)
+    tracemalloc.start()
+    with timed("apscheduler add (traced)", n):
+        for i in range(n):
+            s.add_job(remind, "date", run_date=base + timedelta(seconds=rng.random() * DAY), id=f"remind-task-{i}")
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    with timed("apscheduler get/remove/add", n // 10):
+        for i in range(0, n, 10):
+            job_id = f"remind-task-{i}"
+            if s.get_job(job_id):
+                s.remove_job(job_id)
+            s.add_job(remind, "date", run_date=base + timedelta(seconds=rng.random() * DAY), id=job_id)
+    s.shutdown(wait=False)
+    print(f"apscheduler memory: {size / 1e6:.0f} MB for {n:,} jobs ({size / n:.0f} B each, traced)")
+
+
+async def main(n: int, apscheduler: bool) -> None:
+    print(f"{'operation':<28}{'count':>10}{'time':>10}{'rate':>15}")
+    bench_dispatcher(n)
+    await bench_sleeper(min(n, 10_000))
+    if apscheduler:
+        await bench_apscheduler(n)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=1_000_000, help="number of reminders")
+    parser.add_argument("--apscheduler", action="store_true", help="also benchmark APScheduler date jobs")
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.apscheduler))
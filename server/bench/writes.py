@@ -0,0 +1,129 @@
+"""Writes per second against PostgreSQL: ``commit`` + ``refresh`` versus ``INSERT/UPDATE ... RETURNING``.
+
+Each write is one session and one transaction, ``--concurrency`` at a time.
+The last section drives the task write endpoints through the app.
+Needs ``DATABASE_URL``/``REDIS_URL`` (see ``bench/common.py``). Run from ``server/``::
+
+    python -m bench.writes
+    python -m bench.writes -n 10000 --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.returning import insert_many_returning, insert_returning, update_returning
+from app.db.session import AsyncSessionLocal
+from bench.common import app_client, create_board, register
+
+
+async def drive(label: str, n: int, concurrency: int, write: Callable[[AsyncSession, int], Awaitable[Any]]) -> list[Any]:
+    """Run ``write(db, i)`` for i in range(n), each in its own session; print writes/s."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> Any:
+        async with sem, AsyncSessionLocal() as db:
+            return await write(db, i)
+
+    started = time.perf_counter()
+    out = await asyncio.gather(*(one(i) for i in range(n)))
+    print(f"  {label:<40}{n / (time.perf_counter() - started):>9,.0f} writes/s")
+    return out
+
+
+async def helpers(n: int, concurrency: int) -> None:
+    from app.models.board import Board
+    from app.models.project import Project
+    from app.models.task import Task
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        user = await insert_returning(db, User, {"email": f"bench-{uuid.uuid4().hex[:12]}@example.com", "hashed_password": "x"})
+        project = await insert_returning(db, Project, {"name": "bench", "owner_id": user.id})
+        board = await insert_returning(db, Board, {"name": "bench", "project_id": project.id})
+        await db.commit()
+
+    def values(i: int) -> dict[str, Any]:
+        return {"title": f"t{i}", "status": "todo", "priority": "normal", "board_id": board.id, "owner_id": user.id}
+
+    async def add_commit_refresh(db: AsyncSession, i: int) -> int:
+        task = Task(**values(i))
+        db.add(task)
+        await db.commit()
+        await db.refresh(task)
+        return task.id
+
+    async def insert_commit(db: AsyncSession, i: int) -> int:
+        task = await insert_returning(db, Task, values(i))
+        await db.commit()
+        return task.id
+
+    async def get_commit_refresh(db: AsyncSession, i: int) -> None:
+        task = await db.get(Task, ids[i])
+        assert task is not None and task.owner_id == user.id
+        task.title = f"u{i}"
+        await db.commit()
+        await db.refresh(task)
+
+    async def update_commit(db: AsyncSession, i: int) -> None:
+        task = await update_returning(db, Task, {"title": f"v{i}"}, Task.id == ids[i], Task.owner_id == user.id)
+        assert task is not None
+        await db.commit()
+
+    print(f"{n:,} writes per row, {concurrency} concurrent sessions")
+    ids = await drive("create: add + commit + refresh", n, concurrency, add_commit_refresh)
+    await drive("create: INSERT ... RETURNING + commit", n, concurrency, insert_commit)
+    await drive("update: get + commit + refresh", n, concurrency, get_commit_refresh)
+    await drive("update: UPDATE ... RETURNING + commit", n, concurrency, update_commit)
+
+    async def bulk(db: AsyncSession, _: int) -> None:
+        await insert_many_returning(db, Task, [values(i) for i in range(100)], Task.id)
+        await db.commit()
+
+    batches = max(n // 100, 1)
+    started = time.perf_counter()
+    await drive("(bulk INSERT ... RETURNING, 100 rows)", batches, concurrency, bulk)
+    print(f"  {'  = rows':<40}{batches * 100 / (time.perf_counter() - started):>9,.0f} rows/s")
+
+
+async def endpoints(client: httpx.AsyncClient, n: int, concurrency: int) -> None:
+    headers = await register(client)
+    board = await create_board(client, headers)
+    sem = asyncio.Semaphore(concurrency)
+
+    async def call(method: str, url: str, body: dict[str, Any]) -> Any:
+        async with sem:
+            r = await client.request(method, url, json=body, headers=headers)
+            r.raise_for_status()
+            return r.json()
+
+    async def run(label: str, requests: list[tuple[str, str, dict[str, Any]]]) -> list[Any]:
+        started = time.perf_counter()
+        out = await asyncio.gather(*(call(*req) for req in requests))
+        print(f"  {label:<40}{len(requests) / (time.perf_counter() - started):>9,.0f} writes/s")
+        return out
+
+    print(f"\nendpoints ({n:,} requests each)")
+    url = f"/projects/boards/{board['id']}/tasks"
+    tasks = await run("POST /projects/boards/{id}/tasks", [("POST", url, {"title": f"t{i}", "board_id": board["id"]}) for i in range(n)])
+    await run("PATCH /projects/tasks/{id}", [("PATCH", f"/projects/tasks/{t['id']}", {"status": "done"}) for t in tasks])
+
+
+async def main(n: int, concurrency: int) -> None:
+    async with app_client() as client:  # the lifespan creates the tables
+        await helpers(n, concurrency)
+        await endpoints(client, min(n, 1000), concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=3000, help="writes per measurement")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent sessions / requests")
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.concurrency))
@@ -0,0 +1,111 @@
+"""Shared fixtures.
+
+Redis is replaced by fakeredis for every test. Tests that go through the
+HTTP app or the ORM need PostgreSQL: set ``TEST_DATABASE_URL`` to a scratch
+database (its tables are dropped and recreated once per run), otherwise they
+are skipped. Run from the repository root::
+
+    uv run --frozen pytest
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+# Settings are read once at import: never let tests touch the configured DATABASE_URL
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+asyncpg://postgres@localhost/notify_test"
+os.environ["REDIS_URL"] = "redis://localhost:6379/15"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+import fakeredis  # noqa: E402
+import httpx  # noqa: E402
+
+import app.core.redis as core_redis  # noqa: E402
+from app.main import app  # noqa: E402  (imports every route and model)
+
+_REAL_CLIENTS = {"redis": core_redis.redis, "redis_raw": core_redis.redis_raw}
+
+requires_db = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL not set")
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> fakeredis.FakeAsyncRedis:
+    """One fake server per test, swapped in wherever a module imported the shared clients."""
+    server = fakeredis.FakeServer()
+    fakes = {
+        "redis": fakeredis.FakeAsyncRedis(server=server, decode_responses=True),
+        "redis_raw": fakeredis.FakeAsyncRedis(server=server),
+    }
+    for name, module in list(sys.modules.items()):
+        if name != "app" and not name.startswith("app."):
+            continue
+        for attr, real in _REAL_CLIENTS.items():
+            if getattr(module, attr, None) is real:
+                monkeypatch.setattr(module, attr, fakes[attr])
+    return fakes["redis"]
+
+
+@pytest.fixture(scope="session")
+def _schema() -> None:
+    from app.db.base import Base
+    from app.db.session import engine
+
+    async def create() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(create())
+
+
+@pytest.fixture
+async def db_ready(_schema: None) -> AsyncIterator[None]:
+    """Schema in place; pooled connections are bound to this test's loop, so drop them afterwards."""
+    from app.db.session import engine, read_engine
+
+    yield
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+@pytest.fixture
+async def client(db_ready: None) -> AsyncIterator[httpx.AsyncClient]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest.fixture
+def login(client: httpx.AsyncClient) -> Callable[[], Awaitable[dict[str, str]]]:
+    """Register a fresh user and return its auth headers (ids never repeat across tests)."""
+
+    async def _login() -> dict[str, str]:
+        email = f"{uuid.uuid4().hex[:12]}@example.com"
+        r = await client.post("/auth/register", json={"email": email, "password": "secret"})
+        assert r.status_code in (200, 201), r.text
+        r = await client.post("/auth/login", data={"username": email, "password": "secret"})
+        assert r.status_code == 200, r.text
+        return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    return _login
+
+
+@pytest.fixture
+def board(client: httpx.AsyncClient) -> Callable[[dict[str, str]], Awaitable[dict[str, Any]]]:
+    """Create a project with one board for the given user; returns the board."""
+
+    async def _board(headers: dict[str, str]) -> dict[str, Any]:
+        p = (await client.post("/projects/", json={"name": "P"}, headers=headers)).json()
+        r = await client.post(f"/projects/{p['id']}/boards", json={"name": "B", "project_id": p["id"]}, headers=headers)
+        assert r.status_code in (200, 201), r.text
+        return r.json()
+
+    return _board
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from app.main import app
+
+
+def _params(path: str, method: str = "get") -> dict[str, str]:
+    op = app.openapi()["paths"][path][method]
+    return {p["name"]: p["in"] for p in op.get("parameters", [])}
+
+
+def test_list_params_resolve_through_decorators() -> None:
+    # ListParams is only a forward reference in the route module; the
+    # decorators must hand FastAPI the evaluated signature (fastapi 0.116)
+    for path in ("/projects/", "/projects/boards/{board_id}/tasks", "/projects/tasks/{task_id}/subtasks"):
+        params = _params(path)
+        assert {"limit", "cursor", "fields"} <= params.keys(), path
+        assert "params" not in params, path
+
+
+def test_path_and_dependency_params_keep_their_meaning() -> None:
+    params = _params("/projects/boards/{board_id}/tasks")
+    assert params["board_id"] == "path"
+    assert "current_user" not in params and "db" not in params
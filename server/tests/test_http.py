@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import httpx
+
+from app.services.http import HttpClientPool
+
+
+async def test_cookie_from_one_users_response_is_not_sent_for_another() -> None:
+    seen: list[str | None] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("cookie"))
+        return httpx.Response(200, headers={"Set-Cookie": "session=user-a; Path=/"}, json={})
+
+    pool = HttpClientPool(transport=httpx.MockTransport(handler))
+    client = pool.get("http://blinko.local/api")
+    try:
+        await client.post("http://blinko.local/api/v1/note/upsert", headers={"Authorization": "Bearer a"})
+        await client.post("http://blinko.local/api/v1/note/upsert", headers={"Authorization": "Bearer b"})
+    finally:
+        await pool.aclose()
+
+    assert seen == [None, None]
+    assert not client.cookies
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+import app.core.redis as core_redis
+from app.services import integration_settings
+from app.services.integration_settings import (
+    IntegrationConfig, get_integration, integration_cache_key, invalidate_integration,
+)
+
+USER = 11
+CFG = IntegrationConfig(
+    id=1, user_id=USER, provider="blinko", base_url="http://blinko", token="t", created_at=datetime(2026, 1, 1),
+)
+
+
+class Table:
+    """Stands in for the integrationsetting table and counts queries."""
+
+    def __init__(self) -> None:
+        self.rows: dict[int, IntegrationConfig] = {}
+        self.queries = 0
+
+    async def load(self, _db, user_id: int, _provider: str) -> IntegrationConfig | None:
+        self.queries += 1
+        return self.rows.get(user_id)
+
+
+@pytest.fixture
+def table(monkeypatch: pytest.MonkeyPatch) -> Table:
+    t = Table()
+    monkeypatch.setattr(integration_settings, "_load", t.load)
+    integration_settings._local.clear()
+    return t
+
+
+async def cached_in_redis() -> str | None:
+    return await core_redis.redis.get(integration_cache_key(USER, "blinko"))
+
+
+async def test_miss_is_not_cached_in_process(table: Table) -> None:
+    assert await get_integration(None, USER) is None
+    assert await cached_in_redis() == "null"
+
+    # the user configures Blinko through another worker: only Redis is invalidated here
+    table.rows[USER] = CFG
+    await core_redis.redis.delete(integration_cache_key(USER, "blinko"))
+
+    assert await get_integration(None, USER) == CFG
+
+
+async def test_configured_integration_is_served_from_memory(table: Table) -> None:
+    table.rows[USER] = CFG
+    assert await get_integration(None, USER) == CFG
+    await core_redis.redis.delete(integration_cache_key(USER, "blinko"))
+
+    assert await get_integration(None, USER) == CFG
+    assert table.queries == 1
+
+
+async def test_fill_racing_an_invalidation_is_not_stored(table: Table, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def load_then_write(_db, user_id: int, _provider: str) -> IntegrationConfig | None:
+        stale = table.rows.get(user_id)
+        table.rows[user_id] = CFG  # the user saves settings while this read is in flight
+        await invalidate_integration(user_id)
+        return stale
+
+    monkeypatch.setattr(integration_settings, "_load", load_then_write)
+    assert await get_integration(None, USER) is None  # what this request read
+    assert await cached_in_redis() is None  # ... but it was not cached
+
+    monkeypatch.setattr(integration_settings, "_load", table.load)
+    assert await get_integration(None, USER) == CFG
+    assert await cached_in_redis() is not None
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import update
+
+from app.api.routes import metrics as metrics_route
+from app.main import app
+from tests.conftest import requires_db
+
+
+@pytest.fixture
+async def metrics_client(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(metrics_route.settings, "METRICS_TOKEN", "scrape-me")
+    app_with_metrics = FastAPI()
+    app_with_metrics.include_router(metrics_route.router)
+    transport = httpx.ASGITransport(app=app_with_metrics)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def test_metrics_are_off_by_default() -> None:
+    assert "/metrics" not in app.openapi()["paths"]
+
+
+async def test_metrics_token_grants_access(metrics_client: httpx.AsyncClient) -> None:
+    r = await metrics_client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert r.status_code == 200
+    assert isinstance(r.json(), dict)
+
+
+async def test_metrics_reject_anonymous_and_wrong_token(metrics_client: httpx.AsyncClient) -> None:
+    assert (await metrics_client.get("/metrics")).status_code == 401
+    assert (await metrics_client.get("/metrics", headers={"Authorization": "Bearer nope"})).status_code == 401
+
+
+@requires_db
+async def test_metrics_need_a_superuser(metrics_client, client, login) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.models.user import User
+    from app.services.user_cache import invalidate_user
+
+    headers = await login()
+    assert (await metrics_client.get("/metrics", headers=headers)).status_code == 403
+
+    me = (await client.get("/users/me", headers=headers)).json()
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(User).where(User.id == me["id"]).values(is_superuser=True))
+        await db.commit()
+    await invalidate_user(me["id"])
+    assert (await metrics_client.get("/metrics", headers=headers)).status_code == 200
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from app.services import blinko_sync
+from app.services.outbox import outbox, task_push_lock_key
+from app.utils.response_cache import acquire_lock
+from tests.conftest import requires_db
+
+pytestmark = requires_db
+
+
+class FakeBlinko:
+    """Records upserts and how many pooled DB connections were checked out during each."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.calls: list[tuple[str | None, int]] = []
+        self.fail = fail
+
+    async def upsert_todo(self, base_url: str, token: str, content: str, note_id: str | None = None, title: str | None = None):
+        from app.db.session import engine
+
+        self.calls.append((note_id, engine.sync_engine.pool.checkedout()))
+        if self.fail:
+            raise RuntimeError("blinko down")
+        return note_id or f"note-{len(self.calls)}"
+
+
+@pytest.fixture
+def blinko(monkeypatch: pytest.MonkeyPatch) -> FakeBlinko:
+    fake = FakeBlinko()
+    monkeypatch.setattr(blinko_sync, "upsert_todo", fake.upsert_todo)
+    return fake
+
+
+@pytest.fixture
+async def queued_task(client, login, board) -> int:
+    """A task whose creation queued a Blinko upsert."""
+    headers = await login()
+    r = await client.post("/integrations/blinko", json={"provider": "blinko", "base_url": "http://blinko", "token": "t"}, headers=headers)
+    assert r.status_code == 200, r.text
+    b = await board(headers)
+    task = (await client.post(f"/projects/boards/{b['id']}/tasks", json={"title": "t", "board_id": b["id"]}, headers=headers)).json()
+    return task["id"]
+
+
+async def outbox_rows(task_id: int):
+    from app.db.session import AsyncSessionLocal
+    from app.models.outbox import SyncOutbox
+
+    async with AsyncSessionLocal() as db:
+        return (await db.execute(select(SyncOutbox).where(SyncOutbox.task_id == task_id))).scalars().all()
+
+
+async def note_id(task_id: int) -> str | None:
+    from app.db.session import AsyncSessionLocal
+    from app.models.task import Task
+
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(Task.blinko_note_id).where(Task.id == task_id))
+
+
+async def test_blinko_is_called_without_holding_a_connection(blinko: FakeBlinko, queued_task: int) -> None:
+    await outbox.drain_once()
+
+    assert blinko.calls == [(None, 0)]
+    assert await note_id(queued_task) == "note-1"
+    assert await outbox_rows(queued_task) == []
+
+
+async def test_task_pushed_by_another_worker_is_deferred(blinko: FakeBlinko, queued_task: int) -> None:
+    assert await acquire_lock(task_push_lock_key(queued_task), 60)
+
+    await outbox.drain_once()
+
+    assert blinko.calls == []
+    [row] = await outbox_rows(queued_task)
+    assert row.attempts == 0
+
+
+async def test_failed_push_is_recorded_for_retry(blinko: FakeBlinko, queued_task: int) -> None:
+    blinko.fail = True
+
+    await outbox.drain_once()
+
+    [row] = await outbox_rows(queued_task)
+    assert row.attempts == 1 and "blinko down" in row.last_error
+    assert await note_id(queued_task) is None
+    # the push lock was released with the outcome
+    assert await acquire_lock(task_push_lock_key(queued_task), 60)
+
+
+# --- manual sync routes ---------------------------------------------------------------------------
+
+
+async def test_manual_sync_calls_blinko_without_holding_a_connection(client, login, board, blinko: FakeBlinko) -> None:
+    headers = await login()
+    await client.post("/integrations/blinko", json={"provider": "blinko", "base_url": "http://blinko", "token": "t"}, headers=headers)
+    b = await board(headers)
+    task = (await client.post(f"/projects/boards/{b['id']}/tasks", json={"title": "t", "board_id": b["id"]}, headers=headers)).json()
+
+    r = await client.post(f"/integrations/blinko/sync/{task['id']}", headers=headers)
+
+    assert r.status_code == 200, r.text
+    assert blinko.calls == [(None, 0)]
+    assert r.json() == {"note_id": "note-1"} and await note_id(task["id"]) == "note-1"
+
+
+async def test_manual_sync_skips_a_task_the_worker_is_pushing(client, login, board, blinko: FakeBlinko) -> None:
+    headers = await login()
+    await client.post("/integrations/blinko", json={"provider": "blinko", "base_url": "http://blinko", "token": "t"}, headers=headers)
+    b = await board(headers)
+    items = [{"title": f"t{i}", "board_id": b["id"]} for i in range(2)]
+    busy, free = [t["id"] for t in (await client.post(f"/projects/boards/{b['id']}/tasks:batch", json={"items": items}, headers=headers)).json()]
+    assert await acquire_lock(task_push_lock_key(busy), 60)
+
+    r = await client.post(f"/integrations/blinko/sync/{busy}", headers=headers)
+    assert r.status_code == 409
+    r = await client.post("/integrations/blinko/sync", json={"board_id": b["id"]}, headers=headers)
+
+    assert r.status_code == 200, r.text
+    assert r.json()["synced"] == 1 and r.json()["skipped"] == 1
+    assert len(blinko.calls) == 1
+    assert await note_id(free) == "note-1" and await note_id(busy) is None
+    # the manual sync released its own lock
+    assert await acquire_lock(task_push_lock_key(free), 60)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+from typing import Iterator
+
+import httpx
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+import app.core.redis as core_redis
+from app.db import replica, session as db_session
+from app.db.replica import ReadAfterWrite, read_after_write, recent_write_key
+from app.services import user_cache
+from tests.conftest import requires_db
+
+
+@pytest.fixture(autouse=True)
+def replica_configured(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(replica.settings, "DATABASE_READ_URL", "postgresql+asyncpg://replica/db")
+    read_after_write._local.clear()
+    read_after_write._replica_down_until = 0.0
+    yield
+    read_after_write._local.clear()
+    read_after_write._replica_down_until = 0.0
+
+
+async def test_writer_is_pinned_to_the_primary_in_process() -> None:
+    await read_after_write.mark(1)
+
+    assert await read_after_write.use_primary(1)
+    assert not await read_after_write.use_primary(2)
+
+
+async def test_write_on_another_worker_pins_through_redis() -> None:
+    other_worker = ReadAfterWrite()
+    await other_worker.mark(1)
+
+    assert await read_after_write.use_primary(1)
+    ttl_ms = await core_redis.redis.pttl(recent_write_key(1))
+    assert 0 < ttl_ms <= replica.settings.READ_AFTER_WRITE_SECONDS * 1000
+
+
+async def test_unknown_write_state_falls_back_to_the_primary(monkeypatch: pytest.MonkeyPatch) -> None:
+    class DownRedis:
+        async def exists(self, *_):
+            raise RedisConnectionError("down")
+
+    monkeypatch.setattr(replica, "redis", DownRedis())
+    assert await read_after_write.use_primary(1)
+
+
+async def test_failed_replica_is_skipped_until_retry(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(replica.settings, "REPLICA_RETRY_SECONDS", 60.0)
+    read_after_write.replica_failed(OSError("refused"))
+
+    assert await read_after_write.use_primary(2)
+    read_after_write._replica_down_until = 0.0
+    assert not await read_after_write.use_primary(2)
+
+
+# --- through the app: which engine serves the reads --------------------------------------------
+
+
+def use_replica_engine(monkeypatch: pytest.MonkeyPatch, url: str) -> list[int]:
+    """Route replica sessions to their own engine at ``url``; returns a list counting its checkouts."""
+    replica_engine = db_session.make_engine(url, "test_read_pool")
+    checkouts: list[int] = []
+    event.listen(replica_engine.sync_engine, "checkout", lambda *_: checkouts.append(1))
+    factory = async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(db_session, "ReadSessionLocal", factory)
+    monkeypatch.setattr(replica, "ReadSessionLocal", factory)
+    return checkouts
+
+
+async def me(client: httpx.AsyncClient, headers: dict[str, str]) -> int:
+    return (await client.get("/users/me", headers=headers)).json()["id"]
+
+
+@requires_db
+async def test_reads_follow_recent_writes_through_the_app(client, login, monkeypatch: pytest.MonkeyPatch) -> None:
+    checkouts = use_replica_engine(monkeypatch, os.environ["DATABASE_URL"])
+    headers = await login()
+    user_id = await me(client, headers)
+    await client.post("/projects/", json={"name": "P"}, headers=headers)
+
+    checkouts.clear()
+    assert (await client.get("/projects/", headers=headers)).status_code == 200
+    assert checkouts == []  # just wrote: primary
+
+    read_after_write._local.clear()
+    await core_redis.redis.delete(recent_write_key(user_id))
+    assert [p["name"] for p in (await client.get("/projects/", headers=headers)).json()] == ["P"]
+    assert checkouts  # window over: replica
+
+    checkouts.clear()
+    await core_redis.redis.set(recent_write_key(user_id), 1, px=5000)  # written through another worker
+    assert (await client.get("/projects/", headers=headers)).status_code == 200
+    assert checkouts == []
+
+
+@requires_db
+async def test_unreachable_replica_falls_back_to_the_primary(client, login, monkeypatch: pytest.MonkeyPatch) -> None:
+    headers = await login()
+    await client.post("/projects/", json={"name": "P"}, headers=headers)
+    read_after_write._local.clear()
+    await core_redis.redis.flushdb()
+    user_cache._local.clear()  # the principal must come from a read, not the cache
+    use_replica_engine(monkeypatch, "postgresql+asyncpg://postgres@127.0.0.1:1/replica")
+    failures = read_after_write.counters["replica_failures"]
+
+    r = await client.get("/projects/", headers=headers)
+
+    assert r.status_code == 200 and [p["name"] for p in r.json()] == ["P"]
+    assert read_after_write.counters["replica_failures"] == failures + 1
+    assert read_after_write.replica_down
+    # skipped while down: no new connection attempts
+    assert (await client.get("/projects/", headers=headers)).status_code == 200
+    assert read_after_write.counters["replica_failures"] == failures + 1
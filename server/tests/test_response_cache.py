@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+import app.core.redis as core_redis
+from app.utils import response_cache as rc
+from app.utils.response_cache import (
+    ResponseCache, SingleFlight, acquire_lock, release_lock, response_cache_key,
+)
+
+USER = 7
+FIELD = "tasks:1"
+LOCK = f"{response_cache_key(USER)}:{FIELD}:lock"
+
+
+class Compute:
+    """A list body computation that counts calls and can be held open."""
+
+    def __init__(self, body: bytes = b"[1]") -> None:
+        self.body = body
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self) -> bytes:
+        self.calls += 1
+        await self.release.wait()
+        return self.body
+
+
+@pytest.fixture
+def cache() -> ResponseCache:
+    return ResponseCache()
+
+
+async def stored(field: str = FIELD) -> bytes | None:
+    return await core_redis.redis_raw.hget(response_cache_key(USER), field)
+
+
+async def make_stale(field: str = FIELD) -> None:
+    await core_redis.redis_raw.hset(response_cache_key(USER), f"{field}:t", repr(time.time() - 1))
+
+
+# --- single flight and the lock ------------------------------------------------------------------
+
+
+async def test_single_flight_runs_concurrent_calls_once() -> None:
+    sf = SingleFlight()
+    compute = Compute()
+    compute.release.clear()
+
+    calls = [asyncio.create_task(sf.do("k", compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    compute.release.set()
+
+    assert await asyncio.gather(*calls) == [b"[1]"] * 5
+    assert compute.calls == 1 and sf.coalesced == 4
+    assert await sf.do("k", compute) == b"[1]" and compute.calls == 2  # nothing in flight: runs again
+
+
+async def test_single_flight_shares_the_failure() -> None:
+    sf = SingleFlight()
+    gate = asyncio.Event()
+
+    async def fail() -> bytes:
+        await gate.wait()
+        raise RuntimeError("db down")
+
+    calls = [asyncio.create_task(sf.do("k", fail)) for _ in range(3)]
+    await asyncio.sleep(0)
+    gate.set()
+
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_cancelled_leader_does_not_fail_its_waiters() -> None:
+    sf = SingleFlight()
+    compute = Compute()
+    compute.release.clear()
+
+    leader = asyncio.create_task(sf.do("k", compute))
+    await asyncio.sleep(0)
+    waiters = [asyncio.create_task(sf.do("k", compute)) for _ in range(3)]
+    await asyncio.sleep(0)
+    leader.cancel()  # its client went away
+    await asyncio.sleep(0.01)  # a waiter takes over; the others coalesce on it
+    compute.release.set()
+
+    assert await asyncio.gather(*waiters) == [b"[1]"] * 3
+    assert leader.cancelled()
+    assert compute.calls == 2  # the cancelled run, then one waiter's
+
+
+async def test_cancelled_waiter_leaves_the_others_alone() -> None:
+    sf = SingleFlight()
+    compute = Compute()
+    compute.release.clear()
+
+    leader = asyncio.create_task(sf.do("k", compute))
+    await asyncio.sleep(0)
+    waiter, other = asyncio.create_task(sf.do("k", compute)), asyncio.create_task(sf.do("k", compute))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    compute.release.set()
+
+    assert await leader == b"[1]" and await other == b"[1]"
+    assert waiter.cancelled() and compute.calls == 1
+
+
+async def test_lock_is_exclusive_and_released_only_by_its_owner() -> None:
+    token = await acquire_lock("lock:x", 60)
+    assert token is not None
+    assert await acquire_lock("lock:x", 60) is None
+
+    await release_lock("lock:x", "someone-else")
+    assert await acquire_lock("lock:x", 60) is None
+    await release_lock("lock:x", token)
+    assert await acquire_lock("lock:x", 60) is not None
+
+
+async def test_lock_is_owned_when_redis_is_down(monkeypatch: pytest.MonkeyPatch) -> None:
+    class DownRedis:
+        async def set(self, *_, **__):
+            raise RedisConnectionError("down")
+
+    monkeypatch.setattr(rc, "redis", DownRedis())
+    assert await acquire_lock("lock:x") is not None
+
+
+# --- ResponseCache ------------------------------------------------------------------------------
+
+
+async def test_hit_is_served_without_computing(cache: ResponseCache) -> None:
+    compute = Compute()
+    assert await cache.get_or_compute("tasks", USER, FIELD, compute) == b"[1]"
+    assert await cache.get_or_compute("tasks", USER, FIELD, compute) == b"[1]"
+
+    assert compute.calls == 1
+    assert await stored() == b"[1]"
+    assert cache.counters["tasks"]["misses"] == 1 and cache.counters["tasks"]["hits"] == 1
+
+
+async def test_concurrent_misses_compute_once(cache: ResponseCache) -> None:
+    compute = Compute()
+    compute.release.clear()
+
+    calls = [asyncio.create_task(cache.get_or_compute("tasks", USER, FIELD, compute)) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    compute.release.set()
+
+    assert await asyncio.gather(*calls) == [b"[1]"] * 5
+    assert compute.calls == 1
+
+
+async def test_miss_waits_for_the_worker_holding_the_lock(cache: ResponseCache) -> None:
+    assert await acquire_lock(LOCK, 60)  # another worker is computing this entry
+    compute = Compute(b"[mine]")
+
+    call = asyncio.create_task(cache.get_or_compute("tasks", USER, FIELD, compute))
+    await asyncio.sleep(0.05)
+    await core_redis.redis_raw.hset(response_cache_key(USER), FIELD, b"[theirs]")
+
+    assert await call == b"[theirs]"
+    assert compute.calls == 0
+
+
+async def test_stale_entry_is_served_while_one_caller_revalidates(cache: ResponseCache) -> None:
+    await cache.get_or_compute("tasks", USER, FIELD, Compute(b"[old]"))
+    await make_stale()
+    compute = Compute(b"[new]")
+    compute.release.clear()
+
+    revalidating = asyncio.create_task(cache.get_or_compute("tasks", USER, FIELD, compute))
+    await asyncio.sleep(0.01)
+    # the lock is taken: everyone else gets the stale body at once
+    assert await cache.get_or_compute("tasks", USER, FIELD, compute) == b"[old]"
+    assert await cache.get_or_compute("tasks", USER, FIELD, compute) == b"[old]"
+    compute.release.set()
+
+    assert await revalidating == b"[new]"
+    assert compute.calls == 1 and cache.counters["tasks"]["stale"] == 3
+    assert await cache.get_or_compute("tasks", USER, FIELD, compute) == b"[new]"
+    assert await acquire_lock(LOCK, 60)  # released after revalidating
+
+
+async def test_result_computed_across_an_invalidation_is_not_stored(cache: ResponseCache) -> None:
+    async def compute() -> bytes:
+        body = b"[before the write]"
+        await cache.invalidate(USER)  # a write lands while the list is being read
+        return body
+
+    assert await cache.get_or_compute("tasks", USER, FIELD, compute) == b"[before the write]"
+    assert await stored() is None
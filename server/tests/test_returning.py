@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import random
+import uuid
+from typing import Any, AsyncIterator
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.returning import insert_many_returning, insert_returning, update_returning
+from app.models.board import Board
+from app.models.project import Project
+from app.models.task import Task
+from app.models.user import User
+from tests.conftest import requires_db
+
+pytestmark = requires_db
+
+
+@pytest.fixture
+async def db(db_ready) -> AsyncIterator[AsyncSession]:
+    from app.db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def owned_board(db: AsyncSession) -> tuple[int, int]:
+    """(user id, board id), committed."""
+    user = await insert_returning(db, User, {"email": f"{uuid.uuid4().hex[:12]}@example.com", "hashed_password": "x"})
+    project = await insert_returning(db, Project, {"name": "p", "owner_id": user.id})
+    board = await insert_returning(db, Board, {"name": "b", "project_id": project.id})
+    await db.commit()
+    return user.id, board.id
+
+
+def task_values(user_id: int, board_id: int, title: str) -> dict[str, Any]:
+    return {"title": title, "status": "todo", "priority": "normal", "board_id": board_id, "owner_id": user_id}
+
+
+async def test_insert_returns_the_persisted_row(db: AsyncSession, owned_board: tuple[int, int]) -> None:
+    task = await insert_returning(db, Task, task_values(*owned_board, "t"))
+
+    assert task.id is not None
+    assert task.created_at is not None and task.updated_at is not None
+    assert task.is_today is False  # column default
+
+
+async def test_update_returns_the_row_only_for_its_owner(db: AsyncSession, owned_board: tuple[int, int]) -> None:
+    user_id, board_id = owned_board
+    task = await insert_returning(db, Task, task_values(user_id, board_id, "t"))
+    await db.commit()
+
+    updated = await update_returning(db, Task, {"title": "renamed"}, Task.id == task.id, Task.owner_id == user_id)
+    assert updated.title == "renamed" and updated.updated_at >= task.updated_at
+    assert await update_returning(db, Task, {"title": "x"}, Task.id == task.id, Task.owner_id == user_id + 1) is None
+    assert (await update_returning(db, Task, {}, Task.id == task.id, Task.owner_id == user_id)).title == "renamed"
+
+
+@pytest.mark.parametrize("count", [3, 2500])  # 2500 spans several insertmanyvalues batches
+async def test_bulk_insert_returns_rows_in_input_order(db: AsyncSession, owned_board: tuple[int, int], count: int) -> None:
+    titles = [f"t{i}" for i in range(count)]
+    random.Random(count).shuffle(titles)
+
+    rows = await insert_many_returning(db, Task, [task_values(*owned_board, t) for t in titles], Task.id, Task.title)
+
+    assert [row.title for row in rows] == titles
+    assert len({row.id for row in rows}) == count
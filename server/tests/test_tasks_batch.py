@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+
+from app.main import app
+from tests.conftest import requires_db
+
+
+@pytest.mark.parametrize(
+    ("path", "method"),
+    [("/projects/tasks:batch", "patch"), ("/projects/boards/{board_id}/tasks:batch", "post")],
+)
+def test_batch_payload_is_the_request_body(path: str, method: str) -> None:
+    op = app.openapi()["paths"][path][method]
+    assert "requestBody" in op
+    assert "data" not in {p["name"] for p in op.get("parameters", [])}
+
+
+@requires_db
+async def test_create_batch_returns_tasks_in_input_order(client, login, board) -> None:
+    headers = await login()
+    b = await board(headers)
+    titles = [f"t{i}" for i in range(5)]
+    items = [{"title": t, "board_id": b["id"], "is_today": i % 2 == 0} for i, t in enumerate(titles)]
+
+    r = await client.post(f"/projects/boards/{b['id']}/tasks:batch", json={"items": items}, headers=headers)
+
+    assert r.status_code == 200, r.text
+    created = r.json()
+    assert [t["title"] for t in created] == titles
+    assert all(t["board_id"] == b["id"] and t["status"] == "todo" for t in created)
+    listed = (await client.get(f"/projects/boards/{b['id']}/tasks", headers=headers)).json()
+    assert sorted(t["id"] for t in listed) == sorted(t["id"] for t in created)
+
+
+@requires_db
+async def test_update_batch_applies_each_item(client, login, board) -> None:
+    headers = await login()
+    b = await board(headers)
+    items = [{"title": f"t{i}", "board_id": b["id"]} for i in range(3)]
+    created = (await client.post(f"/projects/boards/{b['id']}/tasks:batch", json={"items": items}, headers=headers)).json()
+    ids = [t["id"] for t in created]
+
+    patch = [
+        {"id": ids[2], "status": "done"},
+        {"id": ids[0], "status": "done"},
+        {"id": ids[1], "title": "renamed"},
+    ]
+    r = await client.patch("/projects/tasks:batch", json={"items": patch}, headers=headers)
+
+    assert r.status_code == 200, r.text
+    out = r.json()
+    assert [t["id"] for t in out] == [ids[2], ids[0], ids[1]]
+    assert [t["status"] for t in out] == ["done", "done", "todo"]
+    assert out[2]["title"] == "renamed"
+
+
+@requires_db
+async def test_update_batch_is_all_or_nothing(client, login, board) -> None:
+    mine, theirs = await login(), await login()
+    b_mine, b_theirs = await board(mine), await board(theirs)
+    own = (await client.post(f"/projects/boards/{b_mine['id']}/tasks", json={"title": "a", "board_id": b_mine["id"]}, headers=mine)).json()
+    other = (await client.post(f"/projects/boards/{b_theirs['id']}/tasks", json={"title": "b", "board_id": b_theirs["id"]}, headers=theirs)).json()
+
+    r = await client.patch(
+        "/projects/tasks:batch",
+        json={"items": [{"id": own["id"], "status": "done"}, {"id": other["id"], "status": "done"}]},
+        headers=mine,
+    )
+    assert r.status_code == 404
+
+    dup = await client.patch(
+        "/projects/tasks:batch",
+        json={"items": [{"id": own["id"], "status": "done"}, {"id": own["id"], "title": "x"}]},
+        headers=mine,
+    )
+    assert dup.status_code == 400
+    listed = (await client.get(f"/projects/boards/{b_mine['id']}/tasks", headers=mine)).json()
+    assert [t["status"] for t in listed] == ["todo"]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+import app.core.redis as core_redis
+from app.services import today_index
+from app.services.today_index import BODY_FIELD, COMPLETE_FIELD, today_index_key
+from tests.conftest import requires_db
+
+T0 = datetime(2026, 10, 18, 8, 0, 0)
+USER = 7
+
+
+def task(id: int, title: str, at: datetime, is_today: bool = True) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=id, title=title, description=None, status="todo", priority="normal", due_date=None,
+        remind_at=None, is_today=is_today, board_id=1, owner_id=USER, created_at=T0, updated_at=at,
+        blinko_note_id=None,
+    )
+
+
+@pytest.fixture
+async def r():
+    raw = core_redis.redis_raw  # fakeredis, see conftest
+    # a complete index, as left by a rebuild
+    await raw.hset(today_index_key(USER), mapping={COMPLETE_FIELD: "1", BODY_FIELD: b"[]"})
+    return raw
+
+
+async def titles(r) -> list[str]:
+    fields = await r.hgetall(today_index_key(USER))
+    return [t["title"] for t in json.loads(today_index._join(fields))]
+
+
+async def test_newer_write_replaces_entry_and_drops_body(r) -> None:
+    await today_index.put_tasks(r, [task(1, "a", T0)])
+    await today_index.put_tasks(r, [task(1, "b", T0 + timedelta(microseconds=1))])
+
+    assert await titles(r) == ["b"]
+    assert await r.hget(today_index_key(USER), BODY_FIELD) is None
+    assert await r.hget(today_index_key(USER), COMPLETE_FIELD) == b"1"
+
+
+async def test_same_version_write_lands(r) -> None:
+    # the outbox stores a new note id without bumping updated_at
+    await today_index.put_tasks(r, [task(1, "a", T0)])
+    synced = task(1, "a", T0)
+    synced.blinko_note_id = "n1"
+    await today_index.put_tasks(r, [synced])
+
+    fields = await r.hgetall(today_index_key(USER))
+    assert [t["blinko_note_id"] for t in json.loads(today_index._join(fields))] == ["n1"]
+
+
+async def test_late_older_write_is_ignored(r) -> None:
+    await today_index.put_tasks(r, [task(1, "new", T0 + timedelta(seconds=1))])
+    await today_index.put_tasks(r, [task(1, "old", T0)])
+
+    assert await titles(r) == ["new"]
+
+
+async def test_late_add_does_not_undo_a_newer_removal(r) -> None:
+    await today_index.put_tasks(r, [task(1, "a", T0)])
+    await today_index.put_tasks(r, [task(1, "a", T0 + timedelta(seconds=2), is_today=False)])
+    await today_index.put_tasks(r, [task(1, "a", T0 + timedelta(seconds=1))])
+
+    assert await titles(r) == []
+    # a later change that puts it back on Today still wins
+    await today_index.put_tasks(r, [task(1, "again", T0 + timedelta(seconds=3))])
+    assert await titles(r) == ["again"]
+
+
+async def test_deleted_task_stays_deleted(r) -> None:
+    await today_index.put_tasks(r, [task(1, "a", T0), task(2, "b", T0)])
+    await today_index.remove_task(r, USER, 1)
+    await today_index.put_tasks(r, [task(1, "a", T0 + timedelta(days=1))])
+
+    assert await titles(r) == ["b"]
+
+
+async def test_assemble_skips_tombstones(r) -> None:
+    await today_index.put_tasks(r, [task(2, "b", T0), task(1, "a", T0)])
+    await today_index.put_tasks(r, [task(2, "b", T0 + timedelta(seconds=1), is_today=False)])
+
+    body = await today_index._assemble(r, today_index_key(USER))
+
+    assert [t["title"] for t in json.loads(body)] == ["a"]
+    assert await r.hget(today_index_key(USER), BODY_FIELD) == body
+
+
+async def test_write_to_missing_index_leaves_it_incomplete(r) -> None:
+    await r.delete(today_index_key(USER))
+    await today_index.put_tasks(r, [task(1, "a", T0)])
+
+    assert await today_index._assemble(r, today_index_key(USER)) is None
+    assert await r.ttl(today_index_key(USER)) > 0
+
+
+@requires_db
+async def test_today_endpoint_follows_task_changes(client, login, board) -> None:
+    headers = await login()
+    b = await board(headers)
+    items = [{"title": f"t{i}", "board_id": b["id"], "is_today": True} for i in range(3)]
+    ids = [t["id"] for t in (await client.post(f"/projects/boards/{b['id']}/tasks:batch", json={"items": items}, headers=headers)).json()]
+
+    assert [t["id"] for t in (await client.get("/projects/today", headers=headers)).json()] == ids
+    await client.patch(f"/projects/tasks/{ids[0]}", json={"is_today": False}, headers=headers)
+    await client.patch(f"/projects/tasks/{ids[1]}", json={"title": "renamed"}, headers=headers)
+    await client.delete(f"/projects/tasks/{ids[2]}", headers=headers)
+
+    today = (await client.get("/projects/today", headers=headers)).json()
+    assert [(t["id"], t["title"]) for t in today] == [(ids[1], "renamed")]
+
+
+class LaggingReplica:
+    """A read session that must not be used to build what gets stored."""
+
+    async def execute(self, *_, **__):
+        raise AssertionError("index rebuilt from the replica")
+
+
+@requires_db
+async def test_index_is_rebuilt_from_the_primary(client, login, board) -> None:
+    headers = await login()
+    b = await board(headers)
+    created = (await client.post(f"/projects/boards/{b['id']}/tasks", json={"title": "t", "board_id": b["id"], "is_today": True}, headers=headers)).json()
+    raw = core_redis.redis_raw
+    await raw.delete(today_index_key(created["owner_id"]))
+
+    body = await today_index.read_today(raw, LaggingReplica(), created["owner_id"])
+
+    assert [t["id"] for t in json.loads(body)] == [created["id"]]
+    assert await raw.hget(today_index_key(created["owner_id"]), COMPLETE_FIELD) == b"1"
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+import app.core.redis as core_redis
+from app.services import user_cache
+from app.services.user_cache import load_principal, user_cache_key
+from tests.conftest import requires_db
+
+pytestmark = requires_db
+
+
+@pytest.fixture
+async def user_id(db_ready) -> int:
+    from app.db.returning import insert_returning
+    from app.db.session import AsyncSessionLocal
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        user = await insert_returning(db, User, {"email": f"{uuid.uuid4().hex[:12]}@example.com", "hashed_password": "x"})
+        await db.commit()
+        # cached in-process and in Redis
+        assert (await load_principal(db, user.id)).is_active
+    assert await core_redis.redis.exists(user_cache_key(user.id))
+    return user.id
+
+
+async def settled() -> None:
+    await asyncio.gather(*user_cache._tasks)
+
+
+async def cached(user_id: int) -> bool:
+    local = user_cache._local.get(user_id) is not user_cache.MISSING
+    return local or bool(await core_redis.redis.exists(user_cache_key(user_id)))
+
+
+async def test_orm_change_is_forgotten_only_after_commit(user_id: int) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        user.is_active = False
+        await db.flush()
+        await settled()
+        assert await cached(user_id)  # not committed yet: other requests still see the old row
+        await db.commit()
+        await settled()
+        assert not await cached(user_id)
+        assert (await load_principal(db, user_id)).is_active is False
+
+
+async def test_rolled_back_change_keeps_the_entry(user_id: int) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, user_id)
+        user.is_active = False
+        await db.flush()
+        await db.rollback()
+        await db.commit()
+    await settled()
+    assert await cached(user_id)
+
+
+async def test_bulk_statement_forgets_every_user(user_id: int) -> None:
+    from app.db.session import AsyncSessionLocal
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(User).where(User.id == user_id).values(is_superuser=True))
+        await db.commit()
+    await settled()
+    assert not await cached(user_id)
+    async with AsyncSessionLocal() as db:
+        assert (await load_principal(db, user_id)).is_superuser
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable
+
+import httpx
+import pytest
+from fastapi import FastAPI, status
+
+from app.api.routes import ws as ws_routes
+from app.api.routes.ws import ConnectionManager
+from app.main import create_app
+from app.services.reminders import ReminderWorker, schedule_reminder
+from app.utils import scheduler as scheduler_module
+from app.utils.security import create_access_token
+from tests.conftest import requires_db
+
+
+class FakeSocket:
+    def __init__(self, block: bool = False) -> None:
+        self.sent: list[str] = []
+        self.closed_with: int | None = None
+        self._block = block
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        if self._block:
+            await asyncio.Event().wait()
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+class ClientSocket(FakeSocket):
+    """A socket of ``app`` for driving ``websocket_endpoint``: ``say`` queues a frame from the client."""
+
+    def __init__(self, user_id: int, app: FastAPI) -> None:
+        super().__init__()
+        self.app = app
+        self.query_params = {"token": create_access_token(user_id)}
+        self.headers: dict[str, str] = {}
+        self._incoming: asyncio.Queue[dict] = asyncio.Queue()
+
+    def say(self, text: str) -> None:
+        self._incoming.put_nowait({"type": "websocket.receive", "text": text})
+
+    def hang_up(self) -> None:
+        self._incoming.put_nowait({"type": "websocket.disconnect", "code": 1000})
+
+    async def receive(self) -> dict:
+        return await self._incoming.get()
+
+
+async def eventually(check: Callable[[], bool], timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not check():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+async def workers() -> AsyncIterator[tuple[ConnectionManager, ConnectionManager]]:
+    """Two distributed managers (two workers) sharing the test's fake Redis."""
+    a, b = ConnectionManager(distributed=True), ConnectionManager(distributed=True)
+    await a.start()
+    await b.start()
+    yield a, b
+    await a.stop()
+    await b.stop()
+
+
+async def test_message_sent_on_one_worker_reaches_sockets_on_the_other(workers) -> None:
+    a, b = workers
+    on_a, on_b = FakeSocket(), FakeSocket()
+    await a.connect(5, on_a)
+    await b.connect(5, on_b)
+    other_user = FakeSocket()
+    await b.connect(6, other_user)
+
+    await a.send_to_user(5, "hello")
+
+    await eventually(lambda: on_a.sent == ["hello"] and on_b.sent == ["hello"])
+    assert other_user.sent == []
+
+
+async def test_worker_stops_receiving_after_last_socket_leaves(workers) -> None:
+    a, b = workers
+    ws = FakeSocket()
+    await b.connect(5, ws)
+    b.disconnect(5, ws)
+    await eventually(lambda: not b._background)
+
+    await a.send_to_user(5, "gone")
+    await asyncio.sleep(0.1)
+    assert ws.sent == []
+    assert b.stats()["connections"] == 0
+
+
+async def test_slow_socket_is_closed_by_a_tracked_task() -> None:
+    m = ConnectionManager(queue_size=1, full_policy="disconnect")
+    ws = FakeSocket(block=True)
+    conn = await m.connect(5, ws)
+    m.enqueue(conn, "1")
+    await asyncio.sleep(0)  # writer picks "1" up and blocks on it
+    m.enqueue(conn, "2")
+    m.enqueue(conn, "3")  # queue full: disconnect
+
+    assert len(m._background) == 1
+    await m.stop()
+    assert ws.closed_with == status.WS_1013_TRY_AGAIN_LATER
+    assert m.slow_disconnects == 1 and not m._background
+
+
+async def test_ping_is_answered_on_the_sending_socket_only() -> None:
+    m = ConnectionManager()
+    app = create_app(m)
+    tab, other_tab = ClientSocket(5, app), ClientSocket(5, app)
+    handlers = [asyncio.create_task(ws_routes.websocket_endpoint(s)) for s in (tab, other_tab)]
+    await eventually(lambda: m.stats()["connections"] == 2)
+
+    tab.say("ping")
+    tab.say('{"type":"ping"}')
+
+    await eventually(lambda: tab.sent == ["pong", '{"type":"pong"}'])
+    await asyncio.sleep(0.05)
+    assert other_tab.sent == [] and m.pongs_sent == 2
+    for s in (tab, other_tab):
+        s.hang_up()
+    await asyncio.gather(*handlers)
+    assert m.stats()["connections"] == 0
+
+
+async def test_idle_socket_that_sent_heartbeats_is_reaped_and_closed() -> None:
+    m = ConnectionManager(idle_timeout=0.05, reap_interval=0.02)
+    await m.start()
+    ws, protocol_pings_only = FakeSocket(), FakeSocket()
+    m.pong(await m.connect(5, ws))
+    await m.connect(5, protocol_pings_only)
+
+    await eventually(lambda: ws.closed_with == status.WS_1001_GOING_AWAY)
+    await asyncio.sleep(0.1)
+    # uvicorn answers protocol pings itself: without app-level heartbeats it does the reaping
+    assert protocol_pings_only.closed_with is None
+    await m.stop()
+    assert m.reaped == 1 and not m._background
+
+
+@requires_db
+async def test_reminder_fired_by_one_app_reaches_a_socket_on_another(db_ready, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.db.session import AsyncSessionLocal
+
+    monkeypatch.setattr(scheduler_module, "scheduler", None)  # the lifespans start one on this test's loop
+    # two workers: separate apps, managers and reminder workers, one (fake) Redis server
+    first, second = (create_app(ConnectionManager(distributed=True), ReminderWorker()) for _ in range(2))
+    async with AsyncExitStack() as stack:
+        for app in (first, second):
+            await stack.enter_async_context(app.router.lifespan_context(app))
+        client = await stack.enter_async_context(
+            httpx.AsyncClient(transport=httpx.ASGITransport(app=first), base_url="http://test")
+        )
+        email = f"{uuid.uuid4().hex[:12]}@example.com"
+        await client.post("/auth/register", json={"email": email, "password": "secret"})
+        token = (await client.post("/auth/login", data={"username": email, "password": "secret"})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        user_id = (await client.get("/users/me", headers=headers)).json()["id"]
+        p = (await client.post("/projects/", json={"name": "P"}, headers=headers)).json()
+        b = (await client.post(f"/projects/{p['id']}/boards", json={"name": "B", "project_id": p["id"]}, headers=headers)).json()
+        task = (await client.post(f"/projects/boards/{b['id']}/tasks", json={"title": "call mum", "board_id": b["id"]}, headers=headers)).json()
+        async with AsyncSessionLocal() as db:
+            await schedule_reminder(db, task["id"], user_id, datetime.utcnow() - timedelta(seconds=1))
+            await db.commit()
+
+        socket = ClientSocket(user_id, second)
+        handler = asyncio.create_task(ws_routes.websocket_endpoint(socket))
+        await eventually(lambda: second.state.ws_manager.stats()["connections"] == 1)
+
+        assert await first.state.reminders.fire([task["id"]]) == 1
+
+        await eventually(lambda: len(socket.sent) == 1)
+        message = json.loads(socket.sent[0])
+        assert message["type"] == "task.reminder" and message["data"]["tasks"][0]["id"] == task["id"]
+        assert first.state.ws_manager.stats()["connections"] == 0
+        socket.hang_up()
+        await handler
+    scheduler_module.scheduler.shutdown(wait=False)